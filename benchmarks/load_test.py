@@ -0,0 +1,389 @@
+"""Throughput and latency of the router under load, without GPUs or a network.
+
+Three processes take part:
+- a stub upstream that answers OpenAI chat completions, streamed (SSE) or
+  not, after a configurable latency;
+- the router, whose classifier model is replaced by a deterministic stand-in
+  that takes a configurable time per prompt;
+- this process, which replays JSONL traffic either at a fixed request rate
+  (open loop) or with a fixed number of concurrent clients (closed loop).
+
+The same traffic is sent straight to the stub first and then through the
+router; the difference between the two is the overhead routing adds.
+
+    python -m benchmarks.load_test [--traffic requests.jsonl] [--requests 500]
+        [--rate 200 | --concurrency 32] [--classifier-ms 5] [--upstream-ms 20]
+
+Run from the repository root, so the package imports without installing it.
+
+Each traffic line is either a request body or {"path": ..., "body": ...}.
+Without --traffic, synthetic chat requests are used, a quarter of them streamed.
+"""
+
+import argparse
+import asyncio
+import contextlib
+import json
+import logging
+import multiprocessing
+import os
+import socket
+import time
+import zlib
+from dataclasses import dataclass, field
+from typing import Any
+
+from aiohttp import ClientSession, ClientTimeout, TCPConnector, web
+
+from nano_semantic_router.config.config import (
+    ClassifierConfig,
+    ComplexitySignalConfig,
+    Condition,
+    DecisionConfig,
+    Model,
+    RouterConfig,
+    SignalOperator,
+    UseCaseSignalConfig,
+)
+from nano_semantic_router.semantic_router.classification.base_classifier import (
+    set_batcher,
+)
+from nano_semantic_router.semantic_router.server.router import Router
+from nano_semantic_router.semantic_router.server.server import Config, Server
+from nano_semantic_router.semantic_router.signal.signal import (
+    ComplexitySignal,
+    UseCaseSignal,
+)
+
+_HOST = "127.0.0.1"
+_CLASSIFIER_PATH = "stub-classifier.gguf"  # never opened
+_USE_CASES = ["code_generation", "question_answering", "summarization"]
+
+
+@dataclass
+class Options:
+    requests: int = 500
+    rate: float = 0.0  # requests per second; 0 uses `concurrency` instead
+    concurrency: int = 32
+    classifier_ms: float = 5.0
+    classifier_concurrency: int = 1
+    upstream_ms: float = 20.0
+    stream_chunks: int = 8
+    stream_chunk_ms: float = 2.0
+
+
+@dataclass
+class Sample:
+    latency: float  # until the whole response was read
+    first_byte: float
+    ok: bool
+
+
+@dataclass
+class Run:
+    samples: list[Sample] = field(default_factory=list)
+    elapsed: float = 0.0
+
+
+class StubClassifierModel:
+    """Deterministic stand-in for the classifier's llama.cpp model.
+
+    It is installed through the completion hook (`set_batcher`), so classifier
+    prompts reach it instead of llama.cpp. Each prompt sleeps for the
+    inference time and then gets an answer derived from a hash of the prompt.
+    """
+
+    def __init__(self, inference_ms: float) -> None:
+        self.inference_seconds = inference_ms / 1000
+
+    def complete(
+        self, prompt: str, max_tokens: int, stop: list[str], prefix: str = ""
+    ) -> str:
+        time.sleep(self.inference_seconds)
+        digest = zlib.crc32(prompt.encode("utf-8"))
+        labels = [line[2:] for line in prefix.splitlines() if line.startswith("- ")]
+        if labels:
+            return labels[digest % len(labels)]
+        return str(digest % 11)
+
+
+def router_config(upstream: str) -> RouterConfig:
+    """Two signals on one classifier model and decisions that use both."""
+    classifier = ClassifierConfig(model_ref="classifier")
+    models = {
+        "small": Model("small", upstream, "sk-small", "openai", is_default=True),
+        "large": Model("large", upstream, "sk-large", "openai"),
+        "classifier": Model("classifier", "", "", "local", path=_CLASSIFIER_PATH),
+    }
+    return RouterConfig(
+        models=models,
+        signals=[
+            # Windowing needs a real tokenizer; the stand-in has none.
+            ComplexitySignalConfig(classifier=classifier, max_content_tokens=0),
+            UseCaseSignalConfig(
+                classifier=classifier, use_cases=_USE_CASES, max_content_tokens=0
+            ),
+        ],
+        decisions=[
+            DecisionConfig(
+                name="hard-code",
+                model_ref="large",
+                rules=[
+                    Condition(ComplexitySignal(6), SignalOperator.GT),
+                    Condition(UseCaseSignal("code_generation"), SignalOperator.EQ),
+                ],
+            ),
+        ],
+    )
+
+
+def serve_upstream(port: int, options: Options) -> None:
+    async def complete(request: web.Request) -> web.StreamResponse:
+        payload = await request.json()
+        await asyncio.sleep(options.upstream_ms / 1000)
+        if not payload.get("stream"):
+            return web.json_response(
+                {
+                    "id": "chatcmpl-stub",
+                    "object": "chat.completion",
+                    "model": payload.get("model"),
+                    "choices": [
+                        {
+                            "index": 0,
+                            "message": {"role": "assistant", "content": "ok"},
+                            "finish_reason": "stop",
+                        }
+                    ],
+                }
+            )
+        response = web.StreamResponse(headers={"Content-Type": "text/event-stream"})
+        await response.prepare(request)
+        for _ in range(options.stream_chunks):
+            chunk = {"object": "chat.completion.chunk", "choices": [{"delta": {}}]}
+            await response.write(f"data: {json.dumps(chunk)}\n\n".encode())
+            await asyncio.sleep(options.stream_chunk_ms / 1000)
+        await response.write(b"data: [DONE]\n\n")
+        await response.write_eof()
+        return response
+
+    app = web.Application()
+    app.router.add_route("POST", "/{tail:.*}", complete)
+    web.run_app(app, host=_HOST, port=port, print=None, access_log=None)
+
+
+def serve_router(port: int, upstream: str, options: Options) -> None:
+    # The router logs every request; keep that out of the measurement.
+    logging.disable(logging.WARNING)
+    set_batcher(_CLASSIFIER_PATH, StubClassifierModel(options.classifier_ms))  # type: ignore[arg-type]
+    config = Config(
+        upstream_base=upstream,
+        port=port,
+        classifier_concurrency=options.classifier_concurrency,
+        classifier_queue_size=max(64, options.concurrency * 2),
+        # The stub classifier has no model file to load.
+        preload_classifiers=False,
+    )
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        asyncio.run(Server(config, Router(router_config(upstream))).start())
+
+
+def load_traffic(path: str, count: int) -> list[tuple[str, bytes]]:
+    """`count` (path, body) pairs, cycling through the file if it is shorter."""
+    entries: list[tuple[str, Any]] = []
+    if path:
+        with open(path, encoding="utf-8") as file:
+            for line in file:
+                if not line.strip():
+                    continue
+                item = json.loads(line)
+                if "body" in item:
+                    entries.append(
+                        (item.get("path", "/v1/chat/completions"), item["body"])
+                    )
+                else:
+                    entries.append(("/v1/chat/completions", item))
+    else:
+        for i in range(min(count, 64)):
+            content = f"Request {i}: " + "explain the trade-offs of this design " * (
+                1 + i % 8
+            )
+            entries.append(
+                (
+                    "/v1/chat/completions",
+                    {
+                        "model": "client-model",
+                        "stream": i % 4 == 0,
+                        "messages": [{"role": "user", "content": content}],
+                    },
+                )
+            )
+    if not entries:
+        raise SystemExit(f"no requests in {path}")
+    return [
+        (
+            entries[i % len(entries)][0],
+            json.dumps(entries[i % len(entries)][1]).encode(),
+        )
+        for i in range(count)
+    ]
+
+
+async def send(session: ClientSession, url: str, body: bytes) -> Sample:
+    start = time.perf_counter()
+    first_byte = 0.0
+    try:
+        async with session.post(
+            url, data=body, headers={"Content-Type": "application/json"}
+        ) as response:
+            async for _ in response.content.iter_any():
+                if not first_byte:
+                    first_byte = time.perf_counter() - start
+            ok = response.status == 200
+    except Exception:  # noqa: BLE001
+        ok = False
+    latency = time.perf_counter() - start
+    return Sample(latency=latency, first_byte=first_byte or latency, ok=ok)
+
+
+async def replay(base: str, traffic: list[tuple[str, bytes]], options: Options) -> Run:
+    run = Run()
+    connector = TCPConnector(limit=0)
+    async with ClientSession(
+        connector=connector, timeout=ClientTimeout(total=60)
+    ) as session:
+        start = time.perf_counter()
+        if options.rate > 0:
+            tasks = []
+            for i, (path, body) in enumerate(traffic):
+                delay = start + i / options.rate - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                tasks.append(asyncio.create_task(send(session, base + path, body)))
+            run.samples = list(await asyncio.gather(*tasks))
+        else:
+            pending = iter(traffic)
+
+            async def client() -> None:
+                for path, body in pending:
+                    run.samples.append(await send(session, base + path, body))
+
+            await asyncio.gather(*(client() for _ in range(options.concurrency)))
+        run.elapsed = time.perf_counter() - start
+    return run
+
+
+def percentile(values: list[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q / 100 * len(ordered)))]
+
+
+def report(name: str, run: Run) -> dict[str, float]:
+    latencies = [s.latency for s in run.samples if s.ok]
+    errors = sum(not s.ok for s in run.samples)
+    stats = {"throughput": len(latencies) / run.elapsed}
+    for q in (50, 95, 99):
+        stats[f"p{q}"] = percentile(latencies, q) * 1000 if latencies else 0.0
+    stats["ttfb_p50"] = (
+        percentile([s.first_byte for s in run.samples if s.ok], 50) * 1000
+        if latencies
+        else 0.0
+    )
+    print(
+        f"{name:>8} {stats['throughput']:>10.1f} {stats['p50']:>8.1f} "
+        f"{stats['p95']:>8.1f} {stats['p99']:>8.1f} {stats['ttfb_p50']:>9.1f} "
+        f"{errors:>7}"
+    )
+    return stats
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind((_HOST, 0))
+        return sock.getsockname()[1]
+
+
+async def wait_for_port(port: int, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while True:
+        with contextlib.suppress(OSError):
+            _, writer = await asyncio.open_connection(_HOST, port)
+            writer.close()
+            return
+        if time.monotonic() > deadline:
+            raise SystemExit(f"nothing listening on port {port}")
+        await asyncio.sleep(0.05)
+
+
+async def measure(traffic: list[tuple[str, bytes]], options: Options) -> None:
+    upstream_port, router_port = free_port(), free_port()
+    upstream = f"http://{_HOST}:{upstream_port}"
+    context = multiprocessing.get_context("spawn")
+    processes = [
+        context.Process(target=serve_upstream, args=(upstream_port, options)),
+        context.Process(target=serve_router, args=(router_port, upstream, options)),
+    ]
+    for process in processes:
+        process.start()
+    try:
+        await wait_for_port(upstream_port)
+        await wait_for_port(router_port)
+        mode = (
+            f"{options.rate:g} req/s"
+            if options.rate
+            else f"{options.concurrency} clients"
+        )
+        print(
+            f"{len(traffic)} requests, {mode}, classifier {options.classifier_ms:g}ms, "
+            f"upstream {options.upstream_ms:g}ms"
+        )
+        print(
+            f"{'target':>8} {'req/s':>10} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+            f"{'ttfb ms':>9} {'errors':>7}"
+        )
+        direct = report("direct", await replay(upstream, traffic, options))
+        routed = report(
+            "router", await replay(f"http://{_HOST}:{router_port}", traffic, options)
+        )
+        print(
+            f"{'overhead':>8} {'':>10} "
+            + " ".join(f"{routed[q] - direct[q]:>8.1f}" for q in ("p50", "p95", "p99"))
+        )
+    finally:
+        for process in processes:
+            process.terminate()
+            process.join()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    defaults = Options()
+    parser.add_argument("--traffic", default="", help="JSONL file of requests")
+    parser.add_argument("--requests", type=int, default=defaults.requests)
+    parser.add_argument("--rate", type=float, default=defaults.rate)
+    parser.add_argument("--concurrency", type=int, default=defaults.concurrency)
+    parser.add_argument("--classifier-ms", type=float, default=defaults.classifier_ms)
+    parser.add_argument(
+        "--classifier-concurrency", type=int, default=defaults.classifier_concurrency
+    )
+    parser.add_argument("--upstream-ms", type=float, default=defaults.upstream_ms)
+    parser.add_argument("--stream-chunks", type=int, default=defaults.stream_chunks)
+    parser.add_argument(
+        "--stream-chunk-ms", type=float, default=defaults.stream_chunk_ms
+    )
+    args = parser.parse_args()
+
+    options = Options(
+        requests=args.requests,
+        rate=args.rate,
+        concurrency=args.concurrency,
+        classifier_ms=args.classifier_ms,
+        classifier_concurrency=args.classifier_concurrency,
+        upstream_ms=args.upstream_ms,
+        stream_chunks=args.stream_chunks,
+        stream_chunk_ms=args.stream_chunk_ms,
+    )
+    asyncio.run(measure(load_traffic(args.traffic, options.requests), options))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,261 @@
+"""Microbenchmarks of the functions that run on every routed request.
+
+Covers request parsing, user-content extraction, the model rewrite and the
+rest of `_apply_routing`, routing decisions (the per-request
+`make_routing_decision` scan and the compiled `DecisionTable`), and parsing
+of classifier answers. Inputs are synthetic and seeded: chats from a few
+bytes to several megabytes, multimodal content lists, and rule sets of up to
+a thousand decisions. No model is loaded.
+
+    python -m benchmarks.micro [--filter decide] [--json results.json]
+        [--baseline baseline.json] [--threshold 0.2]
+
+Run from the repository root, so the package imports without installing it.
+
+With --baseline, each case is compared with the saved timing and the run
+exits with status 1 if any case got slower by more than --threshold.
+"""
+
+import argparse
+import json
+import platform
+import random
+import re
+import sys
+import timeit
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, cast
+
+from multidict import CIMultiDict
+
+from nano_semantic_router.config.config import (
+    Condition,
+    ConditionOperator,
+    DecisionConfig,
+    Model,
+    SignalOperator,
+)
+from nano_semantic_router.semantic_router.classification.complexity_classifier import (
+    _extract_score,
+)
+from nano_semantic_router.semantic_router.classification.use_case_classifier import (
+    _extract_use_case,
+)
+from nano_semantic_router.semantic_router.decision.decision import (
+    make_routing_decision,
+)
+from nano_semantic_router.semantic_router.decision.table import DecisionTable
+from nano_semantic_router.semantic_router.server.context import RouterContext
+from nano_semantic_router.semantic_router.server.process import (
+    _apply_routing,
+    extract_user_content,
+    parse_openai_request,
+)
+from nano_semantic_router.semantic_router.server.rewrite import rewrite_model
+from nano_semantic_router.semantic_router.signal.signal import (
+    ComplexitySignal,
+    Signal,
+    UseCaseSignal,
+)
+
+_SEED = 1234
+_USE_CASES = [f"use_case_{i}" for i in range(12)]
+# Content sizes in bytes for the chat payloads.
+_SIZES = {"tiny": 50, "10kb": 10_000, "1mb": 1_000_000, "4mb": 4_000_000}
+
+
+@dataclass
+class Result:
+    name: str
+    seconds: float  # best per-call time over the repeats
+    calls: int  # calls per repeat
+
+
+def _text(rng: random.Random, size: int) -> str:
+    words = ["route", "model", "token", "latency", "prompt", "vector", "cache"]
+    parts: list[str] = []
+    length = 0
+    while length < size:
+        word = rng.choice(words)
+        parts.append(word)
+        length += len(word) + 1
+    return " ".join(parts)
+
+
+def chat_body(rng: random.Random, size: int, turns: int = 20) -> bytes:
+    """A chat of about `size` bytes of content split over `turns` messages."""
+    messages: list[dict[str, Any]] = [{"role": "system", "content": "Be concise."}]
+    for i in range(turns):
+        role = "user" if i % 2 == 0 else "assistant"
+        messages.append({"role": role, "content": _text(rng, max(1, size // turns))})
+    return json.dumps({"messages": messages, "model": "client-model"}).encode()
+
+
+def multimodal_body(rng: random.Random, size: int, images: int = 4) -> bytes:
+    """One user turn mixing text parts with inline base64 images."""
+    parts: list[dict[str, Any]] = []
+    for _ in range(images):
+        parts.append({"type": "text", "text": _text(rng, size // (2 * images))})
+        image = "A" * (size // (2 * images))
+        parts.append(
+            {
+                "type": "image_url",
+                "image_url": {"url": f"data:image/png;base64,{image}"},
+            }
+        )
+    payload = {
+        "model": "client-model",
+        "messages": [{"role": "user", "content": parts}],
+    }
+    return json.dumps(payload).encode()
+
+
+def decisions(rng: random.Random, count: int) -> list[DecisionConfig]:
+    """`count` decisions of one to three rules each, half AND and half OR."""
+    result: list[DecisionConfig] = []
+    operators = list(SignalOperator)
+    for i in range(count):
+        rules: list[Condition] = []
+        for _ in range(rng.randint(1, 3)):
+            if rng.random() < 0.5:
+                target: Signal = ComplexitySignal(rng.uniform(0, 10))
+                operator = rng.choice(operators)
+            else:
+                target = UseCaseSignal(rng.choice(_USE_CASES))
+                operator = rng.choice([SignalOperator.EQ, SignalOperator.NEQ])
+            rules.append(Condition(signal=target, operator=operator))
+        result.append(
+            DecisionConfig(
+                name=f"decision-{i}",
+                model_ref="large",
+                rules=rules,
+                operator=ConditionOperator.AND if i % 2 else ConditionOperator.OR,
+            )
+        )
+    return result
+
+
+def cases() -> dict[str, Callable[[], object]]:
+    rng = random.Random(_SEED)
+    benchmarks: dict[str, Callable[[], object]] = {}
+
+    bodies = {name: chat_body(rng, size) for name, size in _SIZES.items()}
+    bodies["multimodal-1mb"] = multimodal_body(rng, 1_000_000)
+    model = Model("routed-model", "http://upstream", "sk-router", "openai")
+    for name, body in bodies.items():
+        parsed = parse_openai_request(body)
+        benchmarks[f"parse_openai_request[{name}]"] = lambda body=body: (
+            parse_openai_request(body)
+        )
+        benchmarks[f"extract_user_content[{name}]"] = lambda parsed=parsed: (
+            extract_user_content(parsed)
+        )
+        benchmarks[f"rewrite_model[{name}]"] = lambda body=body, parsed=parsed: (
+            rewrite_model(body, cast(dict, parsed), model.name)
+        )
+        benchmarks[f"apply_routing[{name}]"] = lambda body=body, parsed=parsed: (
+            _apply_routing(
+                body,
+                CIMultiDict({"Content-Length": str(len(body))}),
+                parsed,
+                model,
+                "/v1/chat/completions",
+                RouterContext(upstream_base="", pool=None, classifier=None),  # type: ignore[arg-type]
+            )
+        )
+
+    signals: list[Signal] = [ComplexitySignal(6.5), UseCaseSignal(_USE_CASES[3])]
+    for count in (10, 100, 1000):
+        rules = decisions(rng, count)
+        table = DecisionTable(rules)
+        benchmarks[f"make_routing_decision[{count}]"] = lambda rules=rules: (
+            make_routing_decision(signals, rules)
+        )
+        benchmarks[f"DecisionTable.decide[{count}]"] = lambda table=table: table.decide(
+            signals
+        )
+
+    answers = {
+        "exact": "use_case_7",
+        "fuzzy": " Use-Case 7.",
+        "miss": "something else entirely",
+    }
+    for name, answer in answers.items():
+        benchmarks[f"_extract_use_case[{name}]"] = lambda answer=answer: (
+            _extract_use_case(answer, _USE_CASES)
+        )
+    for name, answer in {"clean": "7", "noisy": "Score: about 7, maybe"}.items():
+        benchmarks[f"_extract_score[{name}]"] = lambda answer=answer: _extract_score(
+            answer
+        )
+    return benchmarks
+
+
+def measure(fn: Callable[[], object], repeat: int) -> Result:
+    timer = timeit.Timer(fn)
+    calls, _ = timer.autorange()  # enough calls for a repeat to take 0.2s
+    best = min(timer.repeat(repeat=repeat, number=calls))
+    return Result(name="", seconds=best / calls, calls=calls)
+
+
+def _format_time(seconds: float) -> str:
+    for unit, scale in (("s", 1.0), ("ms", 1e-3), ("us", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.2f}{unit}"
+    return f"{seconds / 1e-9:.0f}ns"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--filter", default="", help="regex on case names")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--json", default="", help="write results to this file")
+    parser.add_argument("--baseline", default="", help="results file to compare to")
+    parser.add_argument("--threshold", type=float, default=0.2)
+    args = parser.parse_args()
+
+    baseline: dict[str, float] = {}
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as file:
+            baseline = {r["name"]: r["seconds"] for r in json.load(file)["results"]}
+
+    pattern = re.compile(args.filter)
+    results: list[Result] = []
+    regressions: list[str] = []
+    for name, fn in cases().items():
+        if not pattern.search(name):
+            continue
+        result = measure(fn, args.repeat)
+        result.name = name
+        results.append(result)
+
+        line = f"{name:<44} {_format_time(result.seconds):>10}"
+        previous = baseline.get(name)
+        if previous:
+            change = result.seconds / previous - 1
+            line += f" {change:>+8.1%}"
+            if change > args.threshold:
+                line += "  REGRESSION"
+                regressions.append(name)
+        print(line, flush=True)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as file:
+            json.dump(
+                {
+                    "python": platform.python_version(),
+                    "machine": platform.machine(),
+                    "results": [asdict(r) for r in results],
+                },
+                file,
+                indent=2,
+            )
+    if regressions:
+        print(
+            f"{len(regressions)} cases slower than the baseline by over {args.threshold:.0%}"
+        )
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""Bytes allocated and time spent rewriting the model of one request.
+
+Compares the previous rewrite path (decode, json.loads, deepcopy, json.dumps,
+three header copies) with the current one (one json.loads of the bytes, a
+byte splice of the model value, one header copy) for growing conversations.
+"request" is the whole path; "rewrite" is everything after parsing, which is
+the part the two paths do differently.
+
+    python -m benchmarks.rewrite_alloc [--sizes 1000 10000 100000] [--repeat 20]
+
+Run from the repository root, so the package imports without installing it.
+"""
+
+import argparse
+import copy
+import json
+import time
+import tracemalloc
+from typing import Any, Callable
+
+from multidict import CIMultiDict
+
+from nano_semantic_router.semantic_router.server.process import (
+    extract_user_content,
+    parse_openai_request,
+)
+from nano_semantic_router.semantic_router.server.rewrite import rewrite_model
+
+_HEADERS = {
+    "Content-Type": "application/json",
+    "Content-Length": "0",
+    "Authorization": "Bearer sk-client",
+    "User-Agent": "bench/1.0",
+    "Accept": "application/json",
+}
+
+
+def make_body(tokens: int) -> bytes:
+    """A chat request of roughly `tokens` tokens (4 characters each) over 20 turns.
+
+    "model" comes after "messages", the order the OpenAI SDK sends.
+    """
+    turns = 20
+    words = max(1, tokens * 4 // turns // 6)
+    messages: list[dict[str, Any]] = [{"role": "system", "content": "Be concise."}]
+    for i in range(turns):
+        text = " ".join(f"w{i}x{j % 97}" for j in range(words))
+        messages.append(
+            {"role": "user" if i % 2 == 0 else "assistant", "content": text}
+        )
+    return json.dumps({"messages": messages, "model": "client-model"}).encode("utf-8")
+
+
+def legacy_rewrite(body: bytes, payload: dict[str, Any]) -> bytes:
+    headers = CIMultiDict(_HEADERS)
+    new_headers = CIMultiDict(headers)
+    new_headers["Authorization"] = "Bearer sk-router"
+    updated = copy.deepcopy(payload)
+    updated["model"] = "routed-model"
+    rewritten = json.dumps(updated).encode("utf-8")
+    CIMultiDict(new_headers)["Host"] = "upstream"
+    return rewritten
+
+
+def current_rewrite(body: bytes, payload: dict[str, Any]) -> bytes:
+    headers = CIMultiDict(_HEADERS)
+    headers["Authorization"] = "Bearer sk-router"
+    rewritten = rewrite_model(body, payload, "routed-model")
+    headers.popall("Content-Length", None)
+    headers["Host"] = "upstream"
+    return rewritten
+
+
+def legacy_request(body: bytes) -> bytes:
+    payload = json.loads(body.decode("utf-8"))
+    extract_user_content(payload)
+    return legacy_rewrite(body, payload)
+
+
+def current_request(body: bytes) -> bytes:
+    payload = parse_openai_request(body)
+    extract_user_content(payload)
+    return current_rewrite(body, payload)
+
+
+def peak_bytes(fn: Callable[..., bytes], *args: Any) -> int:
+    """Peak bytes traced while `fn` runs, including its result."""
+    fn(*args)  # warm up caches so they are not counted
+    tracemalloc.start()
+    fn(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+def seconds_per_call(fn: Callable[..., bytes], repeat: int, *args: Any) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn(*args)
+    return (time.perf_counter() - start) / repeat
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000]
+    )
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    print(
+        f"{'tokens':>8} {'body':>9} {'path':>8} "
+        f"{'request peak':>13} {'rewrite peak':>13} {'request time':>13}"
+    )
+    for tokens in args.sizes:
+        body = make_body(tokens)
+        payload = json.loads(body)
+        assert json.loads(legacy_request(body)) == json.loads(current_request(body))
+        for name, request, rewrite in (
+            ("legacy", legacy_request, legacy_rewrite),
+            ("current", current_request, current_rewrite),
+        ):
+            print(
+                f"{tokens:>8} {len(body):>9} {name:>8} "
+                f"{peak_bytes(request, body):>13} "
+                f"{peak_bytes(rewrite, body, payload):>13} "
+                f"{seconds_per_call(request, args.repeat, body) * 1000:>11.2f}ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,220 @@
+"""How long the router takes to start: imports, then until it can serve traffic.
+
+Each run starts a fresh interpreter, so nothing is cached in-process:
+- import: `import nano_semantic_router.__main__`, what every CLI start and
+  spawned worker pays before doing anything;
+- healthz: from spawning a router process until /healthz answers;
+- readyz: until /readyz answers 200, i.e. classifier models are loaded and
+  warmed up.
+
+Without --classifier the router has no classifier signals and is ready as
+soon as it listens. With --classifier, a complexity signal on that GGUF
+model is configured so preloading and warmup are part of the measurement.
+
+    python -m benchmarks.startup [--runs 5] [--classifier model.gguf]
+        [--instances 2] [--importtime 15] [--forbid openai,llama_cpp]
+
+Run from the repository root, so the package imports without installing it.
+
+--importtime lists the slowest top-level packages imported at startup.
+--forbid exits with status 1 if any of the given packages is imported at
+startup, to catch heavy imports creeping back in.
+"""
+
+import argparse
+import asyncio
+import contextlib
+import multiprocessing
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+
+from aiohttp import ClientError, ClientSession, ClientTimeout
+
+from nano_semantic_router.config.config import (
+    ClassifierConfig,
+    ComplexitySignalConfig,
+    Model,
+    RouterConfig,
+)
+from nano_semantic_router.semantic_router.server.router import Router
+from nano_semantic_router.semantic_router.server.server import Config, Server
+
+_HOST = "127.0.0.1"
+_MAIN = "nano_semantic_router.__main__"
+
+
+def import_seconds() -> tuple[float, set[str]]:
+    """Import time of the entry point in a fresh interpreter, and the packages loaded."""
+    script = (
+        "import sys, time\n"
+        "started = time.perf_counter()\n"
+        f"import {_MAIN}\n"
+        "print(time.perf_counter() - started)\n"
+        "print(' '.join(sorted({name.split('.')[0] for name in sys.modules})))\n"
+    )
+    out = subprocess.run(
+        [sys.executable, "-c", script], check=True, capture_output=True, text=True
+    ).stdout.splitlines()
+    return float(out[0]), set(out[1].split())
+
+
+def slowest_packages(limit: int) -> list[tuple[str, float]]:
+    """Top-level packages by cumulative import time, from `python -X importtime`."""
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {_MAIN}"],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stderr
+    totals: dict[str, float] = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        name = name.strip()
+        if "." in name or not cumulative.strip().isdigit():
+            continue
+        totals[name] = max(totals.get(name, 0.0), int(cumulative) / 1e6)
+    return sorted(totals.items(), key=lambda item: item[1], reverse=True)[:limit]
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind((_HOST, 0))
+        return sock.getsockname()[1]
+
+
+def serve_router(port: int, classifier: str, instances: int) -> None:
+    router = Router(router_config(classifier, instances)) if classifier else Router()
+    config = Config(upstream_base=f"http://{_HOST}:9", port=port)
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        asyncio.run(Server(config, router).start())
+
+
+def router_config(classifier: str, instances: int) -> RouterConfig:
+    return RouterConfig(
+        models={
+            "default": Model(
+                name="default",
+                endpoint="",
+                access_key="",
+                model_type="openai",
+                is_default=True,
+            ),
+            "classifier": Model(
+                name="classifier",
+                endpoint="",
+                access_key="",
+                model_type="local",
+                path=classifier,
+                instances=instances,
+            ),
+        },
+        signals=[
+            ComplexitySignalConfig(classifier=ClassifierConfig(model_ref="classifier"))
+        ],
+    )
+
+
+async def wait_until(session: ClientSession, url: str, timeout: float) -> None:
+    deadline = time.monotonic() + timeout
+    while True:
+        with contextlib.suppress(ClientError, OSError):
+            async with session.get(url) as response:
+                if response.status == 200:
+                    return
+        if time.monotonic() > deadline:
+            raise SystemExit(f"{url} did not answer 200 within {timeout:g}s")
+        await asyncio.sleep(0.005)
+
+
+async def serving_seconds(
+    classifier: str, instances: int, timeout: float
+) -> tuple[float, float]:
+    """Seconds from spawning a router process until /healthz and /readyz answer."""
+    port = free_port()
+    base = f"http://{_HOST}:{port}"
+    process = multiprocessing.get_context("spawn").Process(
+        target=serve_router, args=(port, classifier, instances)
+    )
+    started = time.perf_counter()
+    process.start()
+    try:
+        async with ClientSession(timeout=ClientTimeout(total=1)) as session:
+            await wait_until(session, f"{base}/healthz", timeout)
+            healthz = time.perf_counter() - started
+            await wait_until(session, f"{base}/readyz", timeout)
+            readyz = time.perf_counter() - started
+    finally:
+        process.terminate()
+        process.join()
+    return healthz, readyz
+
+
+def summary(label: str, seconds: list[float]) -> str:
+    return (
+        f"{label:>8} {statistics.median(seconds) * 1000:>10.1f} "
+        f"{min(seconds) * 1000:>10.1f} {max(seconds) * 1000:>10.1f}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument(
+        "--classifier", default="", help="GGUF model to preload as a classifier"
+    )
+    parser.add_argument("--instances", type=int, default=1)
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument(
+        "--importtime",
+        type=int,
+        default=0,
+        metavar="N",
+        help="list the N slowest top-level packages imported at startup",
+    )
+    parser.add_argument(
+        "--forbid",
+        default="",
+        help="comma-separated packages that must not be imported at startup",
+    )
+    args = parser.parse_args()
+
+    imports: list[float] = []
+    healthz: list[float] = []
+    readyz: list[float] = []
+    loaded: set[str] = set()
+    for _ in range(args.runs):
+        seconds, loaded = import_seconds()
+        imports.append(seconds)
+        health, ready = asyncio.run(
+            serving_seconds(args.classifier, args.instances, args.timeout)
+        )
+        healthz.append(health)
+        readyz.append(ready)
+
+    print(f"{args.runs} runs, classifier: {args.classifier or 'none'}")
+    print(f"{'':>8} {'median ms':>10} {'min ms':>10} {'max ms':>10}")
+    print(summary("import", imports))
+    print(summary("healthz", healthz))
+    print(summary("readyz", readyz))
+
+    if args.importtime:
+        print("\nslowest top-level packages (cumulative, nested ones overlap):")
+        for name, seconds in slowest_packages(args.importtime):
+            print(f"  {seconds * 1000:>8.1f} ms  {name}")
+
+    forbidden = sorted(
+        name for name in args.forbid.split(",") if name and name in loaded
+    )
+    if forbidden:
+        print(f"\nimported at startup: {', '.join(forbidden)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,12 @@
 """Enable `python -m nano_semantic_router` to start the server."""
 
-import asyncio
+import argparse
 import logging
+import os
 import sys
 
-from nano_semantic_router.semantic_router.server.server import Server
+from nano_semantic_router.semantic_router.server.server import Config
+from nano_semantic_router.semantic_router.server.workers import serve
 
 
 def configure_logging() -> None:
@@ -12,16 +14,54 @@ def configure_logging() -> None:
 
     logging.basicConfig(
         level=logging.INFO,
-        format="%(asctime)s | %(levelname)-8s | %(name)s | %(message)s",
+        format="%(asctime)s | %(levelname)-8s | %(process)d | %(name)s | %(message)s",
         handlers=[logging.StreamHandler(sys.stdout)],
         force=True,
     )
     logging.getLogger("aiohttp.access").setLevel(logging.WARNING)
 
 
+def parse_args(argv: list[str] | None = None) -> Config:
+    defaults = Config()
+    parser = argparse.ArgumentParser(prog="nano-semantic-router")
+    parser.add_argument("--port", type=int, default=defaults.port)
+    parser.add_argument("--upstream", default=defaults.upstream_base)
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=defaults.workers,
+        help="number of worker processes sharing the port (SO_REUSEPORT)",
+    )
+    parser.add_argument(
+        "--preload-classifiers",
+        action=argparse.BooleanOptionalAction,
+        default=defaults.preload_classifiers,
+        help="load and warm up classifier models and embedding heads at startup; with workers, weights load before forking",
+    )
+    parser.add_argument(
+        "--request-timing",
+        action="store_true",
+        help="add Server-Timing and x-router-* headers and log a trace per request",
+    )
+    parser.add_argument(
+        "--admin-token",
+        default=os.environ.get("ROUTER_ADMIN_TOKEN", defaults.admin_token),
+        help="bearer token enabling the /admin endpoints (default: $ROUTER_ADMIN_TOKEN)",
+    )
+    args = parser.parse_args(argv)
+    return Config(
+        upstream_base=args.upstream,
+        port=args.port,
+        workers=max(1, args.workers),
+        preload_classifiers=args.preload_classifiers,
+        request_timing=args.request_timing,
+        admin_token=args.admin_token,
+    )
+
+
 def main() -> None:
     configure_logging()
-    asyncio.run(Server().start())
+    serve(parse_args())
 
 
 if __name__ == "__main__":
@@ -1,5 +1,6 @@
 from nano_semantic_router.config.config import (
     CacheConfig,
+    ClassificationCacheConfig,
     ClassifierConfig,
     DecisionConfig,
     RouterConfig,
@@ -8,6 +9,7 @@ from nano_semantic_router.config.config import (
 
 __all__ = [
     "CacheConfig",
+    "ClassificationCacheConfig",
     "ClassifierConfig",
     "DecisionConfig",
     "RouterConfig",
@@ -11,9 +11,15 @@ if TYPE_CHECKING:
     )
 
 
+class ClassifierType(StrEnum):
+    GENERATIVE = "generative"  # prompt a generative model
+    EMBEDDING = "embedding"  # nearest centroid / anchor regression over embeddings
+
+
 @dataclass
 class ClassifierConfig:
     model_ref: str = ""
+    classifier_type: ClassifierType = ClassifierType.GENERATIVE
 
 
 class SignalType(StrEnum):
@@ -22,11 +28,21 @@ class SignalType(StrEnum):
     UNKNOWN = "unknown"
 
 
+class ContentWindow(StrEnum):
+    HEAD = "head"  # keep the start of the text
+    TAIL = "tail"  # keep the end of the text
+    HEAD_TAIL = "head_tail"  # keep half the budget from each end
+
+
 @dataclass
 class SignalConfig:
     signal_type: SignalType = SignalType.UNKNOWN
     confidence_threshold: float = 0.0
     classifier: ClassifierConfig = field(default_factory=ClassifierConfig)
+    # Longest text, in classifier tokens, handed to the classifier; longer user
+    # content is cut down with `window`. 0 disables the limit.
+    max_content_tokens: int = 1024
+    window: ContentWindow = ContentWindow.HEAD_TAIL
 
 
 @dataclass
@@ -34,6 +50,14 @@ class ComplexitySignalConfig(SignalConfig):
     """0-10 complexity score, where 0 is simple and 10 is complex."""
 
     signal_type: Literal[SignalType.COMPLEXITY] = SignalType.COMPLEXITY
+    # Embedding classifier only: example texts keyed by their 0-10 score.
+    # Empty uses a small built-in set.
+    anchors: dict[float, List[str]] = field(default_factory=dict)
+
+
+class UseCaseScoring(StrEnum):
+    GENERATE = "generate"  # decode a label, then fuzzy-match it to the list
+    LOGPROB = "logprob"  # softmax over the labels' token log-probabilities
 
 
 @dataclass
@@ -42,6 +66,10 @@ class UseCaseSignalConfig(SignalConfig):
 
     signal_type: Literal[SignalType.USE_CASE] = SignalType.USE_CASE
     use_cases: List[str] = field(default_factory=list)
+    scoring: UseCaseScoring = UseCaseScoring.GENERATE
+    # Embedding classifier only: example utterances per label, averaged with
+    # the label itself into the label's centroid.
+    examples: dict[str, List[str]] = field(default_factory=dict)
 
 
 class SignalOperator(StrEnum):
@@ -62,6 +90,19 @@ class ConditionOperator(StrEnum):
     OR = "OR"
 
 
+class BalanceStrategy(StrEnum):
+    LEAST_OUTSTANDING = "least_outstanding"  # fewest requests in flight per weight
+    EWMA = "ewma"  # lowest decaying peak latency times requests in flight, per weight
+
+
+@dataclass
+class Endpoint:
+    """One replica serving a model."""
+
+    url: str
+    weight: float = 1.0
+
+
 @dataclass
 class Model:
     name: str
@@ -70,6 +111,28 @@ class Model:
     model_type: str  # e.g. "openai", "anthropic", "local". Only support openai and local for now.
     is_default: bool = False
     path: str = ""  # optional local path for local models
+    # Identical replicas of this model; when set, each request goes to one of
+    # them, picked with `balance`, instead of to `endpoint`.
+    endpoints: List[Endpoint] = field(default_factory=list)
+    balance: BalanceStrategy = BalanceStrategy.LEAST_OUTSTANDING
+    # Classifier prompts for this model are decoded together in batches of up to
+    # max_batch_size, collected for at most batch_wait_ms. 1 disables batching.
+    max_batch_size: int = 1
+    batch_wait_ms: float = 5.0
+    # Signals that share this classifier model are answered by one JSON prompt
+    # instead of one prompt per signal. Signals with a confidence_threshold
+    # are still classified on their own, since a combined answer has no
+    # confidence of its own to compare against it.
+    combine_signals: bool = False
+    # llama.cpp instances of this classifier model, each serving one
+    # classification at a time; concurrent classifications beyond this wait.
+    # Instances share the weights when mmapped and add a KV cache each.
+    instances: int = 1
+    n_threads: int = 0  # 0 leaves the choice to llama.cpp
+    n_batch: int = 512
+    use_mmap: bool = True
+    # Lock the weights in RAM so they are never paged out.
+    use_mlock: bool = False
 
 
 @dataclass
@@ -80,8 +143,40 @@ class DecisionConfig:
     operator: ConditionOperator = ConditionOperator.AND
 
 
+@dataclass
+class CacheConfig:
+    """Semantic response cache: serve a stored response for near-duplicate user content."""
+
+    enabled: bool = False
+    embedding_model_ref: str = ""  # local model used to embed the user content
+    similarity_threshold: float = 0.95  # cosine similarity needed for a hit
+    ttl_seconds: float = 300.0
+    max_entries: int = 10_000
+    max_bytes: int = 64 * 1024 * 1024  # responses plus their vectors
+    # Also cache sampled requests (temperature not 0, including the default,
+    # or n > 1), replaying one sample to every similar request.
+    cache_sampled: bool = False
+
+
+@dataclass
+class ClassificationCacheConfig:
+    """Memoized classifier outputs keyed by a hash of the normalized user content."""
+
+    enabled: bool = False
+    max_entries: int = 100_000
+    ttl_seconds: float = 3600.0
+    disk_path: str = ""  # optional sqlite file that survives restarts
+
+
 @dataclass
 class RouterConfig:
     models: dict[str, Model]
     decisions: list[DecisionConfig] = field(default_factory=list)
     signals: list[SignalConfig] = field(default_factory=list)
+    cache: CacheConfig = field(default_factory=CacheConfig)
+    # Compute signals one classifier call at a time, cheapest first, and stop
+    # once no remaining signal can change the routing decision.
+    lazy_signals: bool = False
+    classification_cache: ClassificationCacheConfig = field(
+        default_factory=ClassificationCacheConfig
+    )
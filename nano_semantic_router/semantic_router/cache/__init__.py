@@ -1 +1,21 @@
-# Cache implementations live here. Empty stub to mirror Rust layout.
+from nano_semantic_router.semantic_router.cache.classification_cache import (
+    ClassificationCache,
+    ClassificationCacheStats,
+    classification_cache_key,
+)
+from nano_semantic_router.semantic_router.cache.semantic_cache import (
+    CachedResponse,
+    CacheKey,
+    CacheStats,
+    SemanticCache,
+)
+
+__all__ = [
+    "CachedResponse",
+    "ClassificationCache",
+    "ClassificationCacheStats",
+    "CacheKey",
+    "CacheStats",
+    "SemanticCache",
+    "classification_cache_key",
+]
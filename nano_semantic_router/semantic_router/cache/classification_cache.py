@@ -0,0 +1,173 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+
+from nano_semantic_router.config.config import ClassificationCacheConfig
+from nano_semantic_router.semantic_router.classification.base_classifier import (
+    ClassificationOutput,
+)
+from nano_semantic_router.semantic_router.classification.complexity_classifier import (
+    ComplexitySignalOutput,
+)
+from nano_semantic_router.semantic_router.classification.use_case_classifier import (
+    UseCaseSignalOutput,
+)
+
+_OUTPUT_TYPES: dict[str, type[ClassificationOutput]] = {
+    "base": ClassificationOutput,
+    "complexity": ComplexitySignalOutput,
+    "use_case": UseCaseSignalOutput,
+}
+
+# Expired rows are purged from the disk tier once every this many writes.
+_DISK_PURGE_INTERVAL = 1000
+
+
+@dataclass
+class ClassificationCacheStats:
+    hits: int = 0
+    disk_hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    entries: int = 0
+
+
+def classification_cache_key(
+    user_content: str,
+    signal_type: str,
+    labels: list[str],
+    model_path: str,
+    mode: str = "single",
+) -> str:
+    """Stable key for one classification; whitespace differences do not matter."""
+    normalized = " ".join(user_content.split())
+    material = json.dumps(
+        [normalized, signal_type, sorted(labels), model_path, mode],
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+class ClassificationCache:
+    """LRU/TTL cache of classifier outputs with an optional sqlite tier.
+
+    The in-memory tier is bounded by `max_entries`. When `disk_path` is set,
+    every stored output is also written to sqlite and memory misses fall back
+    to it, so a restarted router starts warm. The sqlite connection is opened
+    lazily in the process that uses it, since the router is built before
+    workers fork.
+    """
+
+    def __init__(self, config: ClassificationCacheConfig) -> None:
+        self.config = config
+        self.stats = ClassificationCacheStats()
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, tuple[float, ClassificationOutput]] = (
+            OrderedDict()
+        )
+        self._db: sqlite3.Connection | None = None
+        self._db_pid = 0
+        self._writes = 0
+
+    def get(self, key: str) -> ClassificationOutput | None:
+        now = time.time()
+        with self._lock:
+            item = self._entries.get(key)
+            if item is not None:
+                expires_at, output = item
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                    self.stats.hits += 1
+                    return output
+                del self._entries[key]
+
+            db = self._disk()
+            if db is not None:
+                row = db.execute(
+                    "SELECT value, expires_at FROM classifications WHERE key = ?",
+                    (key,),
+                ).fetchone()
+                if row is not None and row[1] > now:
+                    output = _decode(row[0])
+                    self._remember(key, row[1], output)
+                    self.stats.disk_hits += 1
+                    return output
+
+            self.stats.misses += 1
+            return None
+
+    def put(self, key: str, output: ClassificationOutput) -> None:
+        expires_at = time.time() + self.config.ttl_seconds
+        with self._lock:
+            self._remember(key, expires_at, output)
+            db = self._disk()
+            if db is None:
+                return
+            try:
+                db.execute(
+                    "INSERT OR REPLACE INTO classifications VALUES (?, ?, ?)",
+                    (key, _encode(output), expires_at),
+                )
+                self._writes += 1
+                if self._writes % _DISK_PURGE_INTERVAL == 0:
+                    db.execute(
+                        "DELETE FROM classifications WHERE expires_at <= ?",
+                        (time.time(),),
+                    )
+                db.commit()
+            except sqlite3.Error as err:
+                logging.warning(f"classification cache write failed: {err}")
+
+    def close(self) -> None:
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    def _disk(self) -> sqlite3.Connection | None:
+        if not self.config.disk_path:
+            return None
+        if self._db is None or self._db_pid != os.getpid():
+            # A connection inherited across fork must not be used; open our own.
+            self._db = _open_db(self.config.disk_path)
+            self._db_pid = os.getpid()
+        return self._db
+
+    def _remember(
+        self, key: str, expires_at: float, output: ClassificationOutput
+    ) -> None:
+        self._entries[key] = (expires_at, output)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.config.max_entries:
+            self._entries.popitem(last=False)
+            self.stats.evictions += 1
+        self.stats.entries = len(self._entries)
+
+
+def _open_db(path: str) -> sqlite3.Connection:
+    db = sqlite3.connect(path, check_same_thread=False)
+    db.execute("PRAGMA journal_mode=WAL")
+    db.execute("PRAGMA synchronous=NORMAL")
+    db.execute(
+        "CREATE TABLE IF NOT EXISTS classifications "
+        "(key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+    )
+    db.execute("DELETE FROM classifications WHERE expires_at <= ?", (time.time(),))
+    db.commit()
+    return db
+
+
+def _encode(output: ClassificationOutput) -> str:
+    kind = next(name for name, cls in _OUTPUT_TYPES.items() if type(output) is cls)
+    return json.dumps({"kind": kind, "fields": asdict(output)})
+
+
+def _decode(value: str) -> ClassificationOutput:
+    data = json.loads(value)
+    return _OUTPUT_TYPES[data["kind"]](**data["fields"])
@@ -0,0 +1,169 @@
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+import numpy as np
+from multidict import CIMultiDict
+
+from nano_semantic_router.config.config import CacheConfig
+
+
+@dataclass
+class CachedResponse:
+    status: int
+    headers: CIMultiDict[str]
+    body: bytes
+
+
+@dataclass
+class CacheKey:
+    """Where a response would live in the cache: the request path and the content embedding."""
+
+    namespace: str
+    embedding: np.ndarray
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    stores: int = 0
+    evictions: int = 0
+    entries: int = 0
+    bytes: int = 0
+
+
+@dataclass
+class _Entry:
+    slot: int
+    namespace: int
+    namespace_key: str
+    response: CachedResponse
+    expires_at: float
+    size: int
+
+
+class SemanticCache:
+    """In-memory response cache searched by embedding similarity.
+
+    Embeddings sit in one float32 matrix so a lookup is a single matrix-vector
+    product. Entries expire after `ttl_seconds`; beyond `max_entries` or
+    `max_bytes` the least recently used entries are evicted first.
+    """
+
+    def __init__(self, config: CacheConfig) -> None:
+        self.config = config
+        self.stats = CacheStats()
+        self._lock = threading.Lock()
+        self._vectors: np.ndarray | None = None
+        self._namespaces = np.zeros(0, dtype=np.int32)  # -1 marks a free slot
+        self._free_slots: list[int] = []
+        self._entries: OrderedDict[int, _Entry] = (
+            OrderedDict()
+        )  # slot -> entry, LRU first
+        # Namespaces with live entries: their ids and how many slots they hold.
+        # An id is freed with the namespace's last entry and reused, so both
+        # stay bounded by max_entries however many namespaces come and go.
+        self._namespace_ids: dict[str, int] = {}
+        self._namespace_slots: dict[str, int] = {}
+        self._free_namespace_ids: list[int] = []
+
+    def lookup(self, key: CacheKey) -> CachedResponse | None:
+        with self._lock:
+            namespace = self._namespace_ids.get(key.namespace)
+            if namespace is None or self._vectors is None or not self._entries:
+                self.stats.misses += 1
+                return None
+
+            similarities = self._vectors @ key.embedding
+            similarities[self._namespaces != namespace] = -np.inf
+            slot = int(np.argmax(similarities))
+            if similarities[slot] < self.config.similarity_threshold:
+                self.stats.misses += 1
+                return None
+
+            entry = self._entries[slot]
+            if entry.expires_at <= time.monotonic():
+                self._evict(slot)
+                self.stats.misses += 1
+                return None
+
+            self._entries.move_to_end(slot)
+            self.stats.hits += 1
+            return entry.response
+
+    def store(self, key: CacheKey, response: CachedResponse) -> None:
+        # The namespace is charged to every entry of it, though shared.
+        size = len(response.body) + key.embedding.nbytes + len(key.namespace)
+        size += sum(len(name) + len(value) for name, value in response.headers.items())
+        if size > self.config.max_bytes:
+            return
+
+        with self._lock:
+            while self._entries and (
+                len(self._entries) >= self.config.max_entries
+                or self.stats.bytes + size > self.config.max_bytes
+            ):
+                self._evict(next(iter(self._entries)))
+
+            slot = self._allocate_slot(key.embedding.shape[0])
+            namespace = self._acquire_namespace(key.namespace)
+            self._vectors[slot] = key.embedding
+            self._namespaces[slot] = namespace
+            self._entries[slot] = _Entry(
+                slot=slot,
+                namespace=namespace,
+                namespace_key=key.namespace,
+                response=response,
+                expires_at=time.monotonic() + self.config.ttl_seconds,
+                size=size,
+            )
+            self.stats.stores += 1
+            self.stats.entries = len(self._entries)
+            self.stats.bytes += size
+
+    def _acquire_namespace(self, name: str) -> int:
+        namespace = self._namespace_ids.get(name)
+        if namespace is None:
+            # With no free ids, the ids in use are exactly 0..len-1.
+            namespace = (
+                self._free_namespace_ids.pop()
+                if self._free_namespace_ids
+                else len(self._namespace_ids)
+            )
+            self._namespace_ids[name] = namespace
+            self._namespace_slots[name] = 0
+        self._namespace_slots[name] += 1
+        return namespace
+
+    def _release_namespace(self, name: str) -> None:
+        self._namespace_slots[name] -= 1
+        if self._namespace_slots[name] == 0:
+            del self._namespace_slots[name]
+            self._free_namespace_ids.append(self._namespace_ids.pop(name))
+
+    def _allocate_slot(self, dim: int) -> int:
+        if self._vectors is None:
+            self._vectors = np.zeros((0, dim), dtype=np.float32)
+        if not self._free_slots:
+            # Grow geometrically; the matrix never exceeds max_entries rows.
+            old = self._vectors.shape[0]
+            new = min(max(64, old * 2), self.config.max_entries)
+            vectors = np.zeros((new, dim), dtype=np.float32)
+            vectors[:old] = self._vectors
+            namespaces = np.full(new, -1, dtype=np.int32)
+            namespaces[:old] = self._namespaces
+            self._vectors, self._namespaces = vectors, namespaces
+            self._free_slots.extend(range(new - 1, old - 1, -1))
+        return self._free_slots.pop()
+
+    def _evict(self, slot: int) -> None:
+        entry = self._entries.pop(slot)
+        self._release_namespace(entry.namespace_key)
+        self._namespaces[slot] = -1
+        self._vectors[slot] = 0.0
+        self._free_slots.append(slot)
+        self.stats.evictions += 1
+        self.stats.entries = len(self._entries)
+        self.stats.bytes -= entry.size
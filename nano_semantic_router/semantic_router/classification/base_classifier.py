@@ -1,7 +1,18 @@
+from __future__ import annotations
+
 from dataclasses import dataclass
-from functools import lru_cache
+from typing import TYPE_CHECKING, Any
+
+
+from .model_pool import model_pool
+from .prefix_cache import get_prefix_state, restore_prefix
+
+if TYPE_CHECKING:
+    from llama_cpp import LlamaGrammar
 
-from llama_cpp import Llama
+    from nano_semantic_router.semantic_router.classification.batching import (
+        PromptBatcher,
+    )
 
 
 @dataclass
@@ -20,10 +31,49 @@ class ClassificationOutput:
     confidence: float
 
 
-@lru_cache(maxsize=2)
-def get_model(model_path: str) -> Llama:
-    """Load and cache a llama.cpp model to avoid repeated disk reads."""
-    return Llama(model_path=model_path, n_ctx=2048, verbose=False)
+_batchers: dict[str, "PromptBatcher"] = {}
+
+
+def set_batcher(model_path: str, batcher: "PromptBatcher | None") -> None:
+    """Route completions for `model_path` through a micro-batcher (or stop doing so)."""
+    if batcher is None:
+        _batchers.pop(model_path, None)
+    else:
+        _batchers[model_path] = batcher
+
+
+def complete(
+    model_path: str,
+    prompt: str,
+    max_tokens: int,
+    stop: list[str],
+    grammar: LlamaGrammar | None = None,
+    prefix: str = "",
+) -> str:
+    """Greedy completion for a classifier prompt; returns the generated text.
+
+    `prompt` starts with the static `prefix`, whose KV state is evaluated once
+    per model and restored for every later prompt instead of prefilled again.
+    """
+    batcher = _batchers.get(model_path)
+    # The batcher decodes without sampling constraints, so grammar-constrained
+    # prompts always take the single-sequence path.
+    if batcher is not None and grammar is None:
+        return batcher.complete(prompt, max_tokens=max_tokens, stop=stop, prefix=prefix)
+
+    with model_pool.checkout(model_path) as model:
+        tokens = model.tokenize(prompt.encode("utf-8"))
+        if prefix:
+            state = get_prefix_state(model, model_path, prefix)
+            restore_prefix(model, state, tokens)
+        completion: dict[str, Any] = model.create_completion(
+            prompt=tokens,
+            max_tokens=max_tokens,
+            temperature=0.0,
+            stop=stop,
+            grammar=grammar,
+        )
+    return completion.get("choices", [{}])[0].get("text", "")
 
 
 class Classifier:
@@ -35,6 +85,11 @@ class Classifier:
             "Classifier subclasses must implement the _build_prompt method."
         )
 
+    @staticmethod
+    def _prompt_prefix(*args, **kwargs) -> str:
+        """Static start of every prompt, shared across requests; empty if none."""
+        return ""
+
     @staticmethod
     def classify(input: ClassificationInput) -> ClassificationOutput:
         raise NotImplementedError(
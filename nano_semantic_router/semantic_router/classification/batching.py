@@ -0,0 +1,364 @@
+from __future__ import annotations
+
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from nano_semantic_router.config.config import Model, RouterConfig
+from nano_semantic_router.config.utils import get_model_by_ref
+from nano_semantic_router.semantic_router.classification.base_classifier import (
+    set_batcher,
+)
+from nano_semantic_router.semantic_router.classification.model_pool import model_pool
+from nano_semantic_router.semantic_router.classification.prefix_cache import (
+    PrefixState,
+    PrefixStore,
+    capture_sequence,
+    load_prefix_into_sequence,
+)
+
+if TYPE_CHECKING:
+    from llama_cpp import Llama, _internals
+
+
+@dataclass
+class _PendingPrompt:
+    prompt: str
+    max_tokens: int
+    stop: list[str]
+    prefix: str = ""
+    future: Future = field(default_factory=Future)
+
+
+@dataclass
+class _Sequence:
+    """Decoding state of one prompt inside a batch."""
+
+    tokens: list[int]
+    max_tokens: int
+    stop: list[str]
+    prefix: PrefixState | None = None
+    n_past: int = 0
+    generated: list[int] = field(default_factory=list)
+    text: str = ""
+    done: bool = False
+
+
+class PromptBatcher:
+    """Collect classifier prompts for one model and decode them together.
+
+    Callers block in `complete()`. A background thread waits for the first
+    prompt, keeps collecting for up to `max_wait_ms` or `max_batch_size` prompts,
+    then prefills all of them as separate sequences of one llama.cpp batch and
+    decodes greedily in lockstep. Batched prefill keeps the CPU's matrix units
+    busy, which a single short prompt does not.
+    """
+
+    def __init__(
+        self, model_path: str, max_batch_size: int, max_wait_ms: float
+    ) -> None:
+        self.model_path = model_path
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self._queue: queue.Queue[_PendingPrompt | None] = queue.Queue()
+        self._context: _internals.LlamaContext | None = None
+        self._batch: _internals.LlamaBatch | None = None
+        self._prefixes = PrefixStore()
+        self._thread = threading.Thread(
+            target=self._loop, name=f"batcher:{model_path}", daemon=True
+        )
+        self._thread.start()
+
+    def complete(
+        self, prompt: str, max_tokens: int, stop: list[str], prefix: str = ""
+    ) -> str:
+        pending = _PendingPrompt(prompt, max_tokens, stop, prefix)
+        self._queue.put(pending)
+        return pending.future.result()
+
+    def close(self) -> None:
+        self._queue.put(None)
+
+    def _loop(self) -> None:
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+            pending = [first]
+            deadline = time.monotonic() + self.max_wait
+            closing = False
+            while len(pending) < self.max_batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                if item is None:
+                    closing = True
+                    break
+                pending.append(item)
+
+            try:
+                self._run(pending)
+            except Exception as err:  # noqa: BLE001
+                for item in pending:
+                    if not item.future.done():
+                        item.future.set_exception(err)
+            if closing:
+                return
+
+    def _run(self, pending: list[_PendingPrompt]) -> None:
+        """Decode `pending` together and resolve each prompt's future.
+
+        A prompt that cannot be decoded fails alone: it is rejected before
+        joining the batch if it does not fit a sequence, and if the batched
+        decode fails, the prompts are retried one at a time.
+        """
+        # Decoding runs on the batcher's own context; the model is only needed
+        # for its weights and vocabulary, so no instance is checked out.
+        model = model_pool.vocab(self.model_path)
+        context = self._ensure_context(model)
+        admitted: list[tuple[_PendingPrompt, _Sequence]] = []
+        for item in pending:
+            try:
+                admitted.append((item, self._sequence(model, item)))
+            except Exception as err:  # noqa: BLE001
+                item.future.set_exception(err)
+        if not admitted:
+            return
+
+        try:
+            _decode_greedy(model, context, self._batch, [seq for _, seq in admitted])
+        except Exception as err:  # noqa: BLE001
+            if len(admitted) <= 1:
+                for item, _ in admitted:
+                    item.future.set_exception(err)
+                return
+            logging.warning(
+                f"Batched decode of {len(admitted)} prompts failed ({err!r}); "
+                "retrying them one at a time"
+            )
+            for item, seq in admitted:
+                retry = _Sequence(seq.tokens, seq.max_tokens, seq.stop, seq.prefix)
+                try:
+                    _decode_greedy(model, context, self._batch, [retry])
+                except Exception as single_err:  # noqa: BLE001
+                    item.future.set_exception(single_err)
+                else:
+                    item.future.set_result(retry.text)
+            return
+
+        for item, seq in admitted:
+            item.future.set_result(seq.text)
+
+    def _sequence(self, model: Llama, item: _PendingPrompt) -> _Sequence:
+        tokens = model.tokenize(item.prompt.encode("utf-8"))
+        # Every sequence gets the model's own context size in the batch context.
+        n_ctx = model.n_ctx()
+        if len(tokens) >= n_ctx:
+            raise ValueError(
+                f"Prompt of {len(tokens)} tokens does not fit the classifier "
+                f"context of {n_ctx} tokens"
+            )
+        return _Sequence(
+            tokens=tokens,
+            # Like Llama.create_completion, stop generating at the context end.
+            max_tokens=min(item.max_tokens, n_ctx - len(tokens)),
+            stop=item.stop,
+            prefix=self._prefix_state(model, item.prefix),
+        )
+
+    def _prefix_state(self, model: Llama, prefix: str) -> PrefixState | None:
+        if not prefix:
+            return None
+
+        def evaluate() -> PrefixState:
+            tokens = model.tokenize(prefix.encode("utf-8"))
+            self._context.kv_cache_clear()
+            for start in range(0, len(tokens), model.n_batch):
+                chunk = tokens[start : start + model.n_batch]
+                _fill_batch(
+                    self._batch,
+                    [(0, token, start + i, False) for i, token in enumerate(chunk)],
+                )
+                self._context.decode(self._batch)
+            state = capture_sequence(self._context, 0, tokens)
+            self._context.kv_cache_clear()
+            return state
+
+        return self._prefixes.get(prefix, evaluate)
+
+    def _ensure_context(self, model: Llama) -> _internals.LlamaContext:
+        # Llama's own context only holds one sequence, so the batcher keeps a
+        # second context on the same weights sized for a full batch.
+        if self._context is None:
+            import llama_cpp
+            from llama_cpp import _internals
+
+            params = llama_cpp.llama_context_default_params()
+            params.n_ctx = model.n_ctx() * self.max_batch_size
+            params.n_batch = model.n_batch
+            params.n_ubatch = model.context_params.n_ubatch
+            params.n_seq_max = self.max_batch_size
+            params.n_threads = model.context_params.n_threads
+            params.n_threads_batch = model.context_params.n_threads_batch
+            self._context = _internals.LlamaContext(
+                model=model._model, params=params, verbose=False
+            )
+            self._batch = _internals.LlamaBatch(
+                n_tokens=model.n_batch,
+                embd=0,
+                n_seq_max=self.max_batch_size,
+                verbose=False,
+            )
+        return self._context
+
+
+def _decode_greedy(
+    model: Llama,
+    context: _internals.LlamaContext,
+    batch: _internals.LlamaBatch,
+    sequences: list[_Sequence],
+) -> None:
+    """Prefill every sequence, then take one greedy step for all of them per decode."""
+    context.kv_cache_clear()
+    capacity = model.n_batch
+    n_vocab = model.n_vocab()
+    eos = model.token_eos()
+
+    # Static prompt prefixes are copied in from their saved KV state.
+    for seq_id, seq in enumerate(sequences):
+        if seq.prefix is not None:
+            seq.n_past = load_prefix_into_sequence(
+                context, seq.prefix, seq_id, seq.tokens
+            )
+
+    # Prefill: pack the remaining prompt tokens from all sequences into as few
+    # decodes as the batch size allows, asking for logits only at each prompt's
+    # last token.
+    entries = [
+        (seq_id, seq.tokens[pos], pos, pos == len(seq.tokens) - 1)
+        for seq_id, seq in enumerate(sequences)
+        for pos in range(seq.n_past, len(seq.tokens))
+    ]
+    for start in range(0, len(entries), capacity):
+        chunk = entries[start : start + capacity]
+        _fill_batch(batch, chunk)
+        context.decode(batch)
+        for idx, (seq_id, _, _, wants_logits) in enumerate(chunk):
+            if wants_logits:
+                _accept(model, sequences[seq_id], context, idx, n_vocab, eos)
+        for seq_id, _, pos, _ in chunk:
+            sequences[seq_id].n_past = pos + 1
+
+    # Decode: every unfinished sequence feeds back its last token.
+    while True:
+        active = [seq_id for seq_id, seq in enumerate(sequences) if not seq.done]
+        if not active:
+            break
+        chunk = [
+            (seq_id, sequences[seq_id].generated[-1], sequences[seq_id].n_past, True)
+            for seq_id in active
+        ]
+        _fill_batch(batch, chunk)
+        context.decode(batch)
+        for idx, seq_id in enumerate(active):
+            seq = sequences[seq_id]
+            seq.n_past += 1
+            _accept(model, seq, context, idx, n_vocab, eos)
+
+    context.kv_cache_clear()
+
+
+def _fill_batch(
+    batch: _internals.LlamaBatch, entries: list[tuple[int, int, int, bool]]
+) -> None:
+    raw = batch.batch
+    raw.n_tokens = len(entries)
+    for i, (seq_id, token, pos, wants_logits) in enumerate(entries):
+        raw.token[i] = token
+        raw.pos[i] = pos
+        raw.seq_id[i][0] = seq_id
+        raw.n_seq_id[i] = 1
+        raw.logits[i] = wants_logits
+
+
+def _accept(
+    model: Llama,
+    seq: _Sequence,
+    context: _internals.LlamaContext,
+    batch_index: int,
+    n_vocab: int,
+    eos: int,
+) -> None:
+    logits = np.ctypeslib.as_array(
+        context.get_logits_ith(batch_index), shape=(n_vocab,)
+    )
+    token = int(np.argmax(logits))
+    if token == eos:
+        seq.done = True
+        return
+
+    seq.generated.append(token)
+    seq.text = model.detokenize(seq.generated).decode("utf-8", errors="ignore")
+    for stop in seq.stop:
+        cut = seq.text.find(stop)
+        if cut != -1:
+            seq.text = seq.text[:cut]
+            seq.done = True
+            return
+    if len(seq.generated) >= seq.max_tokens:
+        seq.done = True
+
+
+def _batched_models(router_config: RouterConfig) -> list[Model]:
+    """Classifier models configured with `max_batch_size > 1`, one per path."""
+    models: dict[str, Model] = {}
+    for signal in router_config.signals:
+        model = get_model_by_ref(signal.classifier.model_ref, router_config)
+        if model.max_batch_size > 1 and model.path:
+            models.setdefault(model.path, model)
+    return list(models.values())
+
+
+def batch_concurrency(router_config: RouterConfig) -> int:
+    """Classifier calls that must run at once for every batch to be able to fill.
+
+    Each call blocks its executor thread until its batch is decoded, so a
+    batch never holds more prompts than there are calls in flight.
+    """
+    return max(
+        (
+            model.max_batch_size * model.instances
+            for model in _batched_models(router_config)
+        ),
+        default=1,
+    )
+
+
+def start_batchers(router_config: RouterConfig) -> list[PromptBatcher]:
+    """Start a batcher for every classifier model configured with `max_batch_size > 1`."""
+    batchers: list[PromptBatcher] = []
+    for model in _batched_models(router_config):
+        batcher = PromptBatcher(model.path, model.max_batch_size, model.batch_wait_ms)
+        set_batcher(model.path, batcher)
+        batchers.append(batcher)
+        logging.info(
+            f"Batching classifier prompts for {model.name}: up to "
+            f"{model.max_batch_size} prompts or {model.batch_wait_ms}ms"
+        )
+    return batchers
+
+
+def stop_batchers(batchers: list[PromptBatcher]) -> None:
+    for batcher in batchers:
+        set_batcher(batcher.model_path, None)
+        batcher.close()
@@ -1,8 +1,7 @@
-from typing import Any
 from .base_classifier import (
     ClassificationInput,
     ClassificationOutput,
-    get_model,
+    complete,
     Classifier,
 )
 from dataclasses import dataclass
@@ -15,27 +14,29 @@ class ComplexitySignalOutput(ClassificationOutput):
 
 class ComplexityClassifier(Classifier):
     @staticmethod
-    def _build_prompt(user_prompt: str) -> str:
+    def _prompt_prefix() -> str:
         return (
             "You are a strict complexity rater. "
             "Given the text, return a single number between 0 and 10 where 0 is simple and 10 is complex. "
             "Respond with only the number.\n\n"
-            f"Text:\n{user_prompt}\n\nScore:"
+            "Text:\n"
         )
 
+    @staticmethod
+    def _build_prompt(user_prompt: str) -> str:
+        return f"{ComplexityClassifier._prompt_prefix()}{user_prompt}\n\nScore:"
+
     @staticmethod
     def classify(input: ClassificationInput) -> ClassificationOutput:
         """Returns a complexity score from 0 to 10, where 0 is simple and 10 is complex."""
 
-        model = get_model(input.model_path)
-        completion: dict[str, Any] = model.create_completion(
-            prompt=ComplexityClassifier._build_prompt(input.user_content),
+        raw_text = complete(
+            input.model_path,
+            ComplexityClassifier._build_prompt(input.user_content),
             max_tokens=8,
-            temperature=0.0,
             stop=["\n"],
+            prefix=ComplexityClassifier._prompt_prefix(),
         )
-
-        raw_text = completion.get("choices", [{}])[0].get("text", "")
         score = _extract_score(raw_text)
         confidence = _score_confidence(raw_text)
 
@@ -0,0 +1,28 @@
+import numpy as np
+
+from .model_pool import model_pool
+
+
+def embed(model_path: str, text: str) -> np.ndarray:
+    """Return the L2-normalised embedding of `text` as a float32 vector."""
+    with model_pool.checkout(model_path, embedding=True) as model:
+        raw = model.embed(text)
+    return _normalize(raw)
+
+
+def embed_many(model_path: str, texts: list[str]) -> np.ndarray:
+    """Embed several texts on one checked-out instance; one L2-normalised row per text."""
+    with model_pool.checkout(model_path, embedding=True) as model:
+        # One call per text: the context holds a single sequence, which
+        # Llama.embed's multi-input packing would overflow.
+        raw = [model.embed(text) for text in texts]
+    return np.stack([_normalize(item) for item in raw])
+
+
+def _normalize(raw: list) -> np.ndarray:
+    vector = np.asarray(raw, dtype=np.float32)
+    if vector.ndim == 2:
+        # Models without a pooling head return one vector per token.
+        vector = vector.mean(axis=0)
+    norm = float(np.linalg.norm(vector))
+    return vector / norm if norm > 0 else vector
@@ -0,0 +1,180 @@
+import json
+import threading
+from dataclasses import dataclass
+from typing import Callable
+
+import numpy as np
+
+from .base_classifier import ClassificationInput, ClassificationOutput, Classifier
+from .complexity_classifier import ComplexitySignalOutput
+from .embedding import embed, embed_many
+from .use_case_classifier import UseCaseSignalOutput
+
+# Cosine similarities are multiplied by this before the softmax; embeddings of
+# related texts sit within a few hundredths of each other.
+_SIMILARITY_SCALE = 20.0
+
+_DEFAULT_COMPLEXITY_ANCHORS: dict[float, list[str]] = {
+    0.0: [
+        "hi",
+        "thanks!",
+        "what time is it in Tokyo?",
+        "translate 'good morning' to French",
+    ],
+    5.0: [
+        "write a Python function that parses a CSV file and returns the rows as dicts",
+        "summarize this article in three bullet points",
+        "explain the difference between TCP and UDP",
+    ],
+    10.0: [
+        "design a fault-tolerant distributed job scheduler and prove its scheduling guarantees",
+        "derive the gradient of the attention layer and implement a fused CUDA kernel for it",
+        "refactor this multi-module codebase to remove the circular dependencies and keep the public API stable",
+    ],
+}
+
+
+@dataclass
+class EmbeddingHead:
+    """Normalised reference embeddings, one row each, with the value each row stands for."""
+
+    vectors: np.ndarray  # (rows, dim) float32
+    values: list  # label per row for centroids, score per row for anchors
+
+
+_heads: dict[str, EmbeddingHead] = {}
+_heads_guard = threading.Lock()
+
+
+def get_centroid_head(
+    model_path: str, use_cases: list[str], examples: dict[str, list[str]]
+) -> EmbeddingHead:
+    """One centroid per label: the mean of the label text and its examples."""
+    key = json.dumps(["centroid", model_path, use_cases, examples], sort_keys=True)
+
+    def build() -> EmbeddingHead:
+        texts: list[str] = []
+        owners: list[int] = []
+        for index, case in enumerate(use_cases):
+            for text in [case.replace("_", " "), *examples.get(case, [])]:
+                texts.append(text)
+                owners.append(index)
+        vectors = embed_many(model_path, texts)
+        centroids = np.zeros((len(use_cases), vectors.shape[1]), dtype=np.float32)
+        np.add.at(centroids, owners, vectors)
+        centroids /= np.linalg.norm(centroids, axis=1, keepdims=True)
+        return EmbeddingHead(vectors=centroids, values=list(use_cases))
+
+    return _get_head(key, build)
+
+
+def get_anchor_head(model_path: str, anchors: dict[float, list[str]]) -> EmbeddingHead:
+    """One row per anchor text, valued at its complexity score."""
+    anchors = anchors or _DEFAULT_COMPLEXITY_ANCHORS
+    key = json.dumps(["anchor", model_path, anchors], sort_keys=True)
+
+    def build() -> EmbeddingHead:
+        pairs = [
+            (float(score), text) for score, texts in anchors.items() for text in texts
+        ]
+        vectors = embed_many(model_path, [text for _, text in pairs])
+        return EmbeddingHead(vectors=vectors, values=[score for score, _ in pairs])
+
+    return _get_head(key, build)
+
+
+def _get_head(key: str, build: Callable[[], EmbeddingHead]) -> EmbeddingHead:
+    with _heads_guard:
+        head = _heads.get(key)
+    if head is None:
+        head = build()
+        with _heads_guard:
+            head = _heads.setdefault(key, head)
+    return head
+
+
+def _softmax(similarities: np.ndarray) -> np.ndarray:
+    logits = similarities * _SIMILARITY_SCALE
+    weights = np.exp(logits - logits.max())
+    return weights / weights.sum()
+
+
+class EmbeddingUseCaseClassifier(Classifier):
+    """Nearest-centroid use case classifier: one embedding and one matrix product."""
+
+    @staticmethod
+    def classify(
+        input: ClassificationInput,
+        use_cases: list[str],
+        examples: dict[str, list[str]] | None = None,
+    ) -> ClassificationOutput:
+        """Returns the label whose centroid is closest, with its softmax weight as confidence."""
+
+        if not use_cases:
+            raise ValueError("use_cases must be a non-empty list")
+
+        head = get_centroid_head(input.model_path, use_cases, examples or {})
+        weights = _softmax(head.vectors @ embed(input.model_path, input.user_content))
+        best = int(np.argmax(weights))
+        return ClassificationOutput(
+            raw_result=head.values[best], confidence=float(weights[best])
+        )
+
+
+class EmbeddingComplexityClassifier(Classifier):
+    """Complexity regression over scored anchor texts.
+
+    The score is the similarity-weighted mean of the anchor scores; confidence
+    falls as the weighted anchors disagree with each other.
+    """
+
+    @staticmethod
+    def classify(
+        input: ClassificationInput, anchors: dict[float, list[str]] | None = None
+    ) -> ClassificationOutput:
+        """Returns a complexity score from 0 to 10, where 0 is simple and 10 is complex."""
+
+        head = get_anchor_head(input.model_path, anchors or {})
+        weights = _softmax(head.vectors @ embed(input.model_path, input.user_content))
+        scores = np.asarray(head.values, dtype=np.float64)
+        score = float(weights @ scores)
+        spread = float(np.sqrt(weights @ (scores - score) ** 2))
+        return ClassificationOutput(
+            raw_result=f"{score}", confidence=max(0.0, 1.0 - spread / 5.0)
+        )
+
+
+def compute_embedding_use_case_signal(
+    model_path: str,
+    use_cases: list[str],
+    user_content: str,
+    examples: dict[str, list[str]] | None = None,
+) -> UseCaseSignalOutput:
+    """Helper to compute use case signal with the embedding classifier."""
+    model_output = EmbeddingUseCaseClassifier.classify(
+        ClassificationInput(model_path=model_path, user_content=user_content),
+        use_cases=use_cases,
+        examples=examples,
+    )
+    return UseCaseSignalOutput(
+        raw_result=model_output.raw_result,
+        confidence=model_output.confidence,
+        use_case=model_output.raw_result,
+    )
+
+
+def compute_embedding_complexity_signal(
+    model_path: str,
+    user_content: str,
+    anchors: dict[float, list[str]] | None = None,
+) -> ComplexitySignalOutput:
+    """Helper to compute complexity signal with the embedding classifier."""
+    model_output = EmbeddingComplexityClassifier.classify(
+        ClassificationInput(model_path=model_path, user_content=user_content),
+        anchors=anchors,
+    )
+    return ComplexitySignalOutput(
+        raw_result=model_output.raw_result,
+        confidence=model_output.confidence,
+        complexity_score=float(model_output.raw_result),
+    )
@@ -0,0 +1,126 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import partial
+from typing import Any, Callable, Hashable, TypeVar
+
+T = TypeVar("T")
+
+
+class ClassifierOverloadedError(RuntimeError):
+    """Raised when the classification wait queue is full."""
+
+
+@dataclass
+class ExecutorStats:
+    submitted: int = 0
+    completed: int = 0
+    rejected: int = 0
+    queue_depth: int = 0
+    in_flight: int = 0
+    total_wait_seconds: float = 0.0
+    max_wait_seconds: float = 0.0
+    # `run_shared` calls answered by a call already in flight.
+    coalesced: int = 0
+
+    @property
+    def mean_wait_seconds(self) -> float:
+        started = self.submitted - self.rejected - self.queue_depth
+        return self.total_wait_seconds / started if started > 0 else 0.0
+
+
+class ClassificationExecutor:
+    """Run blocking classifier calls on dedicated threads.
+
+    At most `max_concurrency` calls run at once; up to `max_queue_size` more wait
+    for a slot and anything beyond that is rejected with
+    `ClassifierOverloadedError` instead of piling up behind the CPU.
+    `run_shared` additionally folds identical concurrent calls into one.
+    """
+
+    def __init__(self, max_concurrency: int = 1, max_queue_size: int = 64) -> None:
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        self.max_concurrency = max_concurrency
+        self.max_queue_size = max_queue_size
+        self.stats = ExecutorStats()
+        self._threads = ThreadPoolExecutor(
+            max_workers=max_concurrency, thread_name_prefix="classifier"
+        )
+        self._slots = asyncio.Semaphore(max_concurrency)
+        self._shared: dict[Hashable, asyncio.Task[Any]] = {}
+
+    async def run(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        stats = self.stats
+        stats.submitted += 1
+        if self._slots.locked() and stats.queue_depth >= self.max_queue_size:
+            stats.rejected += 1
+            raise ClassifierOverloadedError(
+                f"classifier queue is full ({stats.queue_depth} waiting)"
+            )
+
+        queued_at = time.perf_counter()
+        stats.queue_depth += 1
+        try:
+            await self._slots.acquire()
+        finally:
+            stats.queue_depth -= 1
+        waited = time.perf_counter() - queued_at
+        stats.total_wait_seconds += waited
+        stats.max_wait_seconds = max(stats.max_wait_seconds, waited)
+
+        loop = asyncio.get_running_loop()
+        stats.in_flight += 1
+        try:
+            future = self._threads.submit(partial(fn, *args, **kwargs))
+        except BaseException:
+            # Rejected, e.g. after `shutdown`: nothing will run to free the slot.
+            stats.in_flight -= 1
+            self._slots.release()
+            raise
+        # Free the slot when the thread is actually done, not when the awaiting
+        # request goes away, so cancelled requests cannot oversubscribe the CPU.
+        future.add_done_callback(partial(self._release_from_thread, loop))
+        return await asyncio.wrap_future(future)
+
+    async def run_shared(
+        self, key: Hashable, fn: Callable[..., T], *args: Any, **kwargs: Any
+    ) -> T:
+        """Like `run`, but callers passing an equal `key` while a call is in
+        flight await that call instead of starting their own.
+
+        Every caller gets the same result or exception. A cancelled caller
+        only stops waiting: the call finishes for the others.
+        """
+        task = self._shared.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self.run(fn, *args, **kwargs))
+            self._shared[key] = task
+            task.add_done_callback(partial(self._forget, key))
+        else:
+            self.stats.coalesced += 1
+        return await asyncio.shield(task)
+
+    def _forget(self, key: Hashable, task: asyncio.Task[Any]) -> None:
+        if self._shared.get(key) is task:
+            del self._shared[key]
+        if not task.cancelled():
+            task.exception()  # retrieved here in case every caller was cancelled
+
+    def shutdown(self) -> None:
+        self._threads.shutdown(wait=False, cancel_futures=True)
+
+    def _release_from_thread(self, loop: asyncio.AbstractEventLoop, _: Any) -> None:
+        # A call can outlive the server's loop; there is nothing left to free then.
+        if loop.is_closed():
+            return
+        try:
+            loop.call_soon_threadsafe(self._release)
+        except RuntimeError:
+            pass  # the loop closed since the check
+
+    def _release(self) -> None:
+        self.stats.in_flight -= 1
+        self.stats.completed += 1
+        self._slots.release()
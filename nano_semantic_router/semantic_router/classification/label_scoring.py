@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from .model_pool import model_pool
+from .prefix_cache import get_prefix_state, restore_prefix
+
+if TYPE_CHECKING:
+    from llama_cpp import Llama
+
+
+@dataclass
+class _Node:
+    """A token position shared by the labels below it."""
+
+    children: dict[int, "_Node"] = field(default_factory=dict)
+    labels: list[int] = field(default_factory=list)  # labels ending here
+    path: list[int] = field(default_factory=list)
+
+
+def score_labels(
+    model_path: str, prompt: str, labels: list[str], prefix: str = ""
+) -> list[float]:
+    """Probability of each label as the continuation of `prompt`, summing to 1.
+
+    Labels are tokenized in context (after a space) and put in a token trie.
+    The prompt is evaluated once; only nodes where labels branch need their
+    logits, so labels that differ in their first token cost no extra decode.
+    At each branch the children's logits are softmaxed against each other,
+    and a label's probability is the product along its path.
+    """
+    with model_pool.checkout(model_path) as model:
+        prompt_tokens = model.tokenize(prompt.encode("utf-8"))
+        if prefix:
+            restore_prefix(
+                model, get_prefix_state(model, model_path, prefix), prompt_tokens
+            )
+        context, root = _build_trie(model, prompt, prompt_tokens, labels)
+        log_probs = np.zeros(len(labels), dtype=np.float64)
+        _score_node(model, context, root, log_probs)
+
+    probs = np.exp(log_probs - log_probs.max())
+    return (probs / probs.sum()).tolist()
+
+
+def _build_trie(
+    model: Llama, prompt: str, prompt_tokens: list[int], labels: list[str]
+) -> tuple[list[int], _Node]:
+    continuations: list[list[int]] = []
+    for label in labels:
+        tokens = model.tokenize(f"{prompt} {label}".encode("utf-8"))
+        continuations.append(tokens)
+
+    # The first label token can merge with the end of the prompt; score from
+    # the last position every tokenization still agrees on.
+    shared = len(prompt_tokens)
+    for tokens in continuations:
+        n = 0
+        while n < min(shared, len(tokens)) and tokens[n] == prompt_tokens[n]:
+            n += 1
+        shared = n
+    context = prompt_tokens[:shared]
+
+    root = _Node()
+    for index, tokens in enumerate(continuations):
+        node = root
+        for token in tokens[shared:]:
+            if token not in node.children:
+                node.children[token] = _Node(path=node.path + [token])
+            node = node.children[token]
+        node.labels.append(index)
+    return context, root
+
+
+def _score_node(
+    model: Llama, context: list[int], node: _Node, log_probs: np.ndarray
+) -> None:
+    options = len(node.children) + (1 if node.labels else 0)
+    if options > 1:
+        logits = _next_token_logits(model, context + node.path)
+        candidates = list(node.children)
+        scores = [float(logits[token]) for token in candidates]
+        if node.labels:
+            # A label that is a prefix of another ends here: it competes as
+            # whichever of newline or end-of-sequence the model prefers.
+            scores.append(
+                float(max(logits[model.token_nl()], logits[model.token_eos()]))
+            )
+        values = np.asarray(scores, dtype=np.float64)
+        values = values - np.logaddexp.reduce(values)
+        for token, value in zip(candidates, values):
+            _add_to_subtree(node.children[token], value, log_probs)
+        for index in node.labels:
+            log_probs[index] += values[-1]
+
+    for child in node.children.values():
+        _score_node(model, context, child, log_probs)
+
+
+def _add_to_subtree(node: _Node, value: float, log_probs: np.ndarray) -> None:
+    for index in node.labels:
+        log_probs[index] += value
+    for child in node.children.values():
+        _add_to_subtree(child, value, log_probs)
+
+
+def _next_token_logits(model: Llama, tokens: list[int]) -> np.ndarray:
+    """Logits after `tokens`, reusing whatever leading part the context already holds."""
+    reuse = model.longest_token_prefix(model.input_ids[: model.n_tokens], tokens)
+    reuse = min(reuse, len(tokens) - 1)
+    model.n_tokens = reuse
+    model.eval(tokens[reuse:])
+    return np.ctypeslib.as_array(
+        model._ctx.get_logits_ith(-1), shape=(model.n_vocab(),)
+    ).copy()
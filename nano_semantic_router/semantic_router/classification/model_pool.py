@@ -0,0 +1,204 @@
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Iterator
+
+from nano_semantic_router.config.config import Model, RouterConfig
+
+if TYPE_CHECKING:
+    from llama_cpp import Llama
+
+_N_CTX = 2048
+_WARMUP_TEXT = "Warm up."
+
+
+@dataclass(frozen=True)
+class ModelOptions:
+    """How to load the instances of one classifier model."""
+
+    instances: int = 1
+    n_threads: int = 0  # 0 leaves the choice to llama.cpp
+    n_batch: int = 512
+    use_mmap: bool = True
+    use_mlock: bool = False
+
+    @classmethod
+    def from_model(cls, model: Model) -> "ModelOptions":
+        return cls(
+            instances=max(1, model.instances),
+            n_threads=model.n_threads,
+            n_batch=model.n_batch,
+            use_mmap=model.use_mmap,
+            use_mlock=model.use_mlock,
+        )
+
+
+class _Instances:
+    """The loaded instances of one model in one mode and the ones not checked out."""
+
+    def __init__(self, options: ModelOptions) -> None:
+        self.options = options
+        self.loaded: list[Llama] = []
+        self.idle: list[Llama] = []  # most recently returned last
+        self.loading = 0  # instances being loaded outside the lock
+        self.warmed = False  # all instances loaded and warmed up by `preload`
+        # Notified whenever an instance is returned or a load ends, so waiters
+        # take the instance or, after a failed load, try loading themselves.
+        self.changed = threading.Condition()
+
+    def release(self, model: Llama) -> None:
+        with self.changed:
+            self.idle.append(model)
+            self.changed.notify()
+
+
+class ModelPool:
+    """llama.cpp instances per classifier model, each used by one caller at a time.
+
+    A llama.cpp context is not thread-safe, so callers borrow an instance with
+    `checkout` and concurrent callers get different instances, up to the
+    model's `instances`; beyond that they wait. Instances are loaded on first
+    demand or up front with `preload`, which also runs one warmup inference
+    per instance. With mmap the instances share the weights' pages and only
+    add a KV cache each. Embedding-mode instances are pooled separately.
+    """
+
+    def __init__(self) -> None:
+        self._options: dict[str, ModelOptions] = {}
+        self._pools: dict[tuple[str, bool], _Instances] = {}
+        self._guard = threading.Lock()
+
+    def configure(self, router_config: RouterConfig) -> None:
+        """Take per-model options from the config; affects models not loaded yet."""
+        with self._guard:
+            for model in router_config.models.values():
+                if model.path:
+                    self._options[model.path] = ModelOptions.from_model(model)
+
+    @contextmanager
+    def checkout(self, model_path: str, embedding: bool = False) -> Iterator[Llama]:
+        """Borrow an instance for exclusive use until the block exits."""
+        pool = self._pool(model_path, embedding)
+        model = self._acquire(pool, model_path, embedding)
+        try:
+            yield model
+        finally:
+            pool.release(model)
+
+    def vocab(self, model_path: str, embedding: bool = False) -> Llama:
+        """An instance for vocabulary lookups only (tokenize, detokenize, special tokens).
+
+        These do not touch the context, so the instance is shared without a
+        checkout; it stays loaded as long as the pool does.
+        """
+        pool = self._pool(model_path, embedding)
+        with pool.changed:
+            if pool.loaded:
+                return pool.loaded[0]
+        # Load one instance and give it back straight away.
+        with self.checkout(model_path, embedding) as model:
+            return model
+
+    def preload(
+        self, model_path: str, embedding: bool = False, warm_up: bool = True
+    ) -> None:
+        """Load every instance of the model and run one warmup inference on each.
+
+        Does nothing once done. Without `warm_up` only the weights are loaded,
+        e.g. in a process about to fork: llama.cpp's OpenMP thread pool, started
+        by the first inference, does not survive fork() and can deadlock the
+        children. Loaded instances are reused by a later `preload`.
+        """
+        pool = self._pool(model_path, embedding)
+        if pool.warmed:
+            return
+        checked_out: list[Llama] = []
+        try:
+            for _ in range(pool.options.instances):
+                checked_out.append(self._acquire(pool, model_path, embedding))
+            if not warm_up:
+                return
+            started = time.perf_counter()
+            for model in checked_out:
+                _warm_up(model, embedding)
+            logging.info(
+                f"Warmed up {len(checked_out)} instances of {model_path} "
+                f"in {time.perf_counter() - started:.2f}s"
+            )
+            pool.warmed = True
+        finally:
+            for model in checked_out:
+                pool.release(model)
+
+    def _pool(self, model_path: str, embedding: bool) -> _Instances:
+        key = (model_path, embedding)
+        with self._guard:
+            pool = self._pools.get(key)
+            if pool is None:
+                options = self._options.get(model_path, ModelOptions())
+                pool = self._pools[key] = _Instances(options)
+            return pool
+
+    def _acquire(self, pool: _Instances, model_path: str, embedding: bool) -> Llama:
+        with pool.changed:
+            while True:
+                if pool.idle:
+                    return pool.idle.pop()
+                if len(pool.loaded) + pool.loading < pool.options.instances:
+                    pool.loading += 1
+                    break
+                pool.changed.wait()
+
+        try:
+            model = _load(model_path, pool.options, embedding)
+        except BaseException:
+            with pool.changed:
+                pool.loading -= 1
+                # The slot is free again: a waiter retries the load and gets
+                # the error itself instead of waiting for an instance forever.
+                pool.changed.notify()
+            raise
+        with pool.changed:
+            pool.loading -= 1
+            pool.loaded.append(model)
+        return model
+
+
+def _load(model_path: str, options: ModelOptions, embedding: bool) -> Llama:
+    # Imported on first load: llama_cpp loads the native library on import,
+    # which servers without local classifiers should not pay for at startup.
+    from llama_cpp import Llama
+
+    started = time.perf_counter()
+    model = Llama(
+        model_path=model_path,
+        n_ctx=_N_CTX,
+        n_batch=options.n_batch,
+        n_threads=options.n_threads or None,
+        use_mmap=options.use_mmap,
+        use_mlock=options.use_mlock,
+        embedding=embedding,
+        verbose=False,
+    )
+    mode = "embedding" if embedding else "completion"
+    logging.info(
+        f"Loaded {model_path} ({mode}) in {time.perf_counter() - started:.2f}s"
+    )
+    return model
+
+
+def _warm_up(model: Llama, embedding: bool) -> None:
+    if embedding:
+        model.embed(_WARMUP_TEXT)
+        return
+    model.create_completion(_WARMUP_TEXT, max_tokens=1, temperature=0.0)
+    # Leave an empty context so the first real prompt does not reuse a prefix
+    # of the warmup text.
+    model.reset()
+
+
+model_pool = ModelPool()
@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import TYPE_CHECKING
+
+from nano_semantic_router.config.config import SignalType
+from .base_classifier import (
+    ClassificationInput,
+    ClassificationOutput,
+    complete,
+    Classifier,
+)
+from .complexity_classifier import ComplexitySignalOutput, _extract_score
+from .use_case_classifier import UseCaseSignalOutput, _extract_use_case
+
+if TYPE_CHECKING:
+    from llama_cpp import LlamaGrammar
+
+
+@dataclass
+class SignalField:
+    """One signal requested from the combined prompt, keyed by `key` in the JSON answer."""
+
+    key: str
+    signal_type: SignalType
+    use_cases: list[str] = field(default_factory=list)
+
+
+# Output is constrained by a grammar, so a parsed value is as good as an exact
+# match. Not a measured confidence: signals with a confidence_threshold are
+# never combined.
+_CONSTRAINED_CONFIDENCE = 0.95
+
+
+class MultiSignalClassifier(Classifier):
+    """Ask one model for several signals at once as a JSON object.
+
+    The text is prefilled once instead of once per signal, and a JSON-schema
+    grammar keeps the answer parseable.
+    """
+
+    @staticmethod
+    def _prompt_prefix(fields: list[SignalField]) -> str:
+        descriptions = "\n".join(_describe(f) for f in fields)
+        return (
+            "You are a strict request classifier. "
+            "Given the text, fill in every field of a JSON object. "
+            "Respond with only the JSON object.\n\n"
+            f"Fields:\n{descriptions}\n\n"
+            "Text:\n"
+        )
+
+    @staticmethod
+    def _build_prompt(user_prompt: str, fields: list[SignalField]) -> str:
+        prefix = MultiSignalClassifier._prompt_prefix(fields)
+        return f"{prefix}{user_prompt}\n\nJSON:"
+
+    @staticmethod
+    def classify(
+        input: ClassificationInput, fields: list[SignalField]
+    ) -> list[ClassificationOutput]:
+        """Returns one output per field, in the order of `fields`."""
+
+        if not fields:
+            raise ValueError("fields must be a non-empty list")
+
+        raw_text = complete(
+            input.model_path,
+            MultiSignalClassifier._build_prompt(input.user_content, fields),
+            max_tokens=_max_tokens(fields),
+            stop=[],
+            grammar=_grammar(_schema(fields)),
+            prefix=MultiSignalClassifier._prompt_prefix(fields),
+        )
+        try:
+            answer = json.loads(raw_text)
+        except json.JSONDecodeError as exc:
+            raise ValueError(
+                f"Could not parse combined classifier output: {raw_text!r}"
+            ) from exc
+
+        outputs: list[ClassificationOutput] = []
+        for f in fields:
+            value = str(answer.get(f.key, ""))
+            if f.signal_type == SignalType.COMPLEXITY:
+                score = _extract_score(value)
+                outputs.append(
+                    ComplexitySignalOutput(
+                        raw_result=f"{score}",
+                        confidence=_CONSTRAINED_CONFIDENCE,
+                        complexity_score=score,
+                    )
+                )
+            else:
+                use_case = _extract_use_case(value, f.use_cases)
+                outputs.append(
+                    UseCaseSignalOutput(
+                        raw_result=use_case,
+                        confidence=_CONSTRAINED_CONFIDENCE,
+                        use_case=use_case,
+                    )
+                )
+        return outputs
+
+
+def _describe(f: SignalField) -> str:
+    if f.signal_type == SignalType.COMPLEXITY:
+        return (
+            f"- {f.key}: a number between 0 and 10 where 0 is simple and 10 is complex."
+        )
+    labels = ", ".join(f.use_cases)
+    return f"- {f.key}: exactly one use case label from: {labels}."
+
+
+def _schema(fields: list[SignalField]) -> str:
+    properties: dict[str, dict] = {}
+    for f in fields:
+        if f.signal_type == SignalType.COMPLEXITY:
+            properties[f.key] = {"type": "number", "minimum": 0, "maximum": 10}
+        else:
+            properties[f.key] = {"enum": f.use_cases}
+    return json.dumps(
+        {
+            "type": "object",
+            "properties": properties,
+            "required": [f.key for f in fields],
+            "additionalProperties": False,
+        }
+    )
+
+
+@lru_cache(maxsize=32)
+def _grammar(schema: str) -> LlamaGrammar:
+    from llama_cpp import LlamaGrammar
+
+    return LlamaGrammar.from_json_schema(schema, verbose=False)
+
+
+def _max_tokens(fields: list[SignalField]) -> int:
+    # Braces, quotes and separators plus each key and the longest possible value;
+    # a score gets room for a couple of decimals.
+    budget = 8
+    for f in fields:
+        value = max((len(case) for case in f.use_cases), default=5)
+        budget += len(f.key) + value + 8
+    return budget
+
+
+def compute_multi_signal(
+    model_path: str, fields: list[SignalField], user_content: str
+) -> list[ClassificationOutput]:
+    """Helper to compute several signals with a single prompt."""
+    return MultiSignalClassifier.classify(
+        ClassificationInput(model_path=model_path, user_content=user_content),
+        fields=fields,
+    )
@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+import ctypes
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Callable, Hashable
+
+if TYPE_CHECKING:
+    from llama_cpp import Llama, _internals
+
+# Distinct (model, prefix) pairs kept in memory; one per classifier signal config.
+_MAX_PREFIXES = 32
+
+
+@dataclass
+class PrefixState:
+    """KV cache of a prompt prefix evaluated from position 0 of an empty sequence."""
+
+    tokens: list[int]
+    data: bytes
+
+
+class PrefixStore:
+    """Bounded LRU of prefix states for one KV cache layout.
+
+    Saved sequence state only loads into a context created with the same
+    parameters, so Llama's own context and a batch context keep separate stores.
+    """
+
+    def __init__(self, max_prefixes: int = _MAX_PREFIXES) -> None:
+        self.max_prefixes = max_prefixes
+        self._states: OrderedDict[Hashable, PrefixState] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, evaluate: Callable[[], PrefixState]) -> PrefixState:
+        with self._lock:
+            state = self._states.get(key)
+            if state is not None:
+                self._states.move_to_end(key)
+                return state
+
+        state = evaluate()
+        with self._lock:
+            self._states[key] = state
+            while len(self._states) > self.max_prefixes:
+                self._states.popitem(last=False)
+        return state
+
+
+_model_prefixes = PrefixStore()
+
+
+def get_prefix_state(model: Llama, model_path: str, prefix: str) -> PrefixState:
+    """Return the saved KV state of `prefix`, evaluating it on `model` the first time.
+
+    The caller must hold the model (see `ModelPool.checkout`): computing the state
+    resets the model's context.
+    """
+
+    def evaluate() -> PrefixState:
+        tokens = model.tokenize(prefix.encode("utf-8"))
+        model.reset()
+        model._ctx.kv_cache_clear()
+        model.eval(tokens)
+        return capture_sequence(model._ctx, 0, tokens)
+
+    return _model_prefixes.get((model_path, prefix), evaluate)
+
+
+def restore_prefix(model: Llama, state: PrefixState, prompt_tokens: list[int]) -> None:
+    """Load `state` into the model's own context unless it already holds the prefix.
+
+    `Llama.generate` then matches the restored tokens against the prompt and
+    only evaluates what follows them.
+    """
+    shared = shared_length(state.tokens, prompt_tokens)
+    if shared == 0:
+        return
+    if (
+        model.n_tokens >= shared
+        and list(model.input_ids[:shared]) == state.tokens[:shared]
+    ):
+        return
+
+    model._ctx.kv_cache_clear()
+    _load_sequence(model._ctx, state.data, 0)
+    model.input_ids[: len(state.tokens)] = state.tokens
+    model.n_tokens = len(state.tokens)
+
+
+def load_prefix_into_sequence(
+    context: _internals.LlamaContext,
+    state: PrefixState,
+    seq_id: int,
+    prompt_tokens: list[int],
+) -> int:
+    """Copy the prefix KV into `seq_id` of a batch context; returns the positions filled."""
+    shared = shared_length(state.tokens, prompt_tokens)
+    if shared == 0:
+        return 0
+    _load_sequence(context, state.data, seq_id)
+    if shared < len(state.tokens):
+        context.kv_cache_seq_rm(seq_id, shared, -1)
+    return shared
+
+
+def shared_length(prefix_tokens: list[int], prompt_tokens: list[int]) -> int:
+    """Prefix tokens reusable for `prompt_tokens`.
+
+    Stops at the first mismatch (the boundary token can merge with user text)
+    and always leaves the last prompt token to be evaluated for logits.
+    """
+    limit = min(len(prefix_tokens), len(prompt_tokens) - 1)
+    n = 0
+    while n < limit and prefix_tokens[n] == prompt_tokens[n]:
+        n += 1
+    return n
+
+
+def capture_sequence(
+    context: _internals.LlamaContext, seq_id: int, tokens: list[int]
+) -> PrefixState:
+    """Save the KV cells of `seq_id`, which must hold exactly `tokens`."""
+    import llama_cpp
+
+    size = llama_cpp.llama_state_seq_get_size(context.ctx, seq_id)
+    buffer = (ctypes.c_uint8 * size)()
+    written = llama_cpp.llama_state_seq_get_data(context.ctx, buffer, size, seq_id)
+    return PrefixState(tokens=tokens, data=bytes(buffer[:written]))
+
+
+def _load_sequence(context: _internals.LlamaContext, data: bytes, seq_id: int) -> None:
+    import llama_cpp
+
+    buffer = (ctypes.c_uint8 * len(data)).from_buffer_copy(data)
+    if llama_cpp.llama_state_seq_set_data(context.ctx, buffer, len(data), seq_id) == 0:
+        raise RuntimeError(f"Failed to restore prefix KV state into sequence {seq_id}")
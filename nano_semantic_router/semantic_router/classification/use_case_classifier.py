@@ -1,12 +1,14 @@
 from difflib import get_close_matches
-from typing import Any
+
+from nano_semantic_router.config.config import UseCaseScoring
 
 from .base_classifier import (
     ClassificationInput,
     ClassificationOutput,
-    get_model,
+    complete,
     Classifier,
 )
+from .label_scoring import score_labels
 from dataclasses import dataclass
 
 
@@ -17,38 +19,54 @@ class UseCaseSignalOutput(ClassificationOutput):
 
 class UseCaseClassifier(Classifier):
     @staticmethod
-    def _build_prompt(user_prompt: str, use_cases: list[str]) -> str:
+    def _prompt_prefix(use_cases: list[str]) -> str:
         cases = "\n".join(f"- {case}" for case in use_cases)
         return (
             "You are a strict classifier. "
             "Given the text, choose exactly one use case label from the provided list. "
             "Respond with only the label, nothing else.\n\n"
             f"Available use cases:\n{cases}\n\n"
-            f"Text:\n{user_prompt}\n\n"
-            "Use case:"
+            "Text:\n"
         )
 
+    @staticmethod
+    def _build_prompt(user_prompt: str, use_cases: list[str]) -> str:
+        prefix = UseCaseClassifier._prompt_prefix(use_cases)
+        return f"{prefix}{user_prompt}\n\nUse case:"
+
     @staticmethod
     def classify(
-        input: ClassificationInput, use_cases: list[str]
+        input: ClassificationInput,
+        use_cases: list[str],
+        scoring: UseCaseScoring = UseCaseScoring.GENERATE,
     ) -> ClassificationOutput:
         """Returns the most likely use case label from the provided list."""
 
         if not use_cases:
             raise ValueError("use_cases must be a non-empty list")
 
+        if scoring == UseCaseScoring.LOGPROB:
+            probs = score_labels(
+                input.model_path,
+                UseCaseClassifier._build_prompt(input.user_content, use_cases),
+                use_cases,
+                prefix=UseCaseClassifier._prompt_prefix(use_cases),
+            )
+            best = max(range(len(use_cases)), key=probs.__getitem__)
+            return ClassificationOutput(
+                raw_result=use_cases[best], confidence=probs[best]
+            )
+
         max_tokens = (
             max(len(case) for case in use_cases) + 10
         )  # add some buffer for model output
-        model = get_model(input.model_path)
-        completion: dict[str, Any] = model.create_completion(
-            prompt=UseCaseClassifier._build_prompt(input.user_content, use_cases),
+        raw_text = complete(
+            input.model_path,
+            UseCaseClassifier._build_prompt(input.user_content, use_cases),
             max_tokens=max_tokens,
-            temperature=0.0,
             stop=["\n"],
+            prefix=UseCaseClassifier._prompt_prefix(use_cases),
         )
-
-        raw_text = completion.get("choices", [{}])[0].get("text", "")
         use_case = _extract_use_case(raw_text, use_cases)
         confidence = _score_confidence(raw_text, use_cases)
 
@@ -75,7 +93,7 @@ def _extract_use_case(raw_text: str, use_cases: list[str]) -> str:
 
 
 def _score_confidence(raw_text: str, use_cases: list[str]) -> float:
-    # TODO: use logprobs for better confidence scoring
+    # Heuristic for generate mode; UseCaseScoring.LOGPROB gives a real probability.
     cleaned_raw = _clean(raw_text)
     normalized_keys = [_clean(case) for case in use_cases]
 
@@ -92,11 +110,13 @@ def compute_use_case_signal(
     model_path: str,
     use_cases: list[str],
     user_content: str,
+    scoring: UseCaseScoring = UseCaseScoring.GENERATE,
 ) -> UseCaseSignalOutput:
     """Helper to compute use case signal from request content."""
     model_output = UseCaseClassifier.classify(
         ClassificationInput(model_path=model_path, user_content=user_content),
         use_cases=use_cases,
+        scoring=scoring,
     )
     return UseCaseSignalOutput(
         raw_result=model_output.raw_result,
@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import threading
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+from nano_semantic_router.config.config import ContentWindow
+
+if TYPE_CHECKING:
+    from llama_cpp import Llama
+
+# Upper bound on characters per token, used to cut huge texts before tokenizing.
+_MAX_CHARS_PER_TOKEN = 32
+_ELISION = "\n...\n"
+
+
+@dataclass
+class WindowStats:
+    windowed: int = 0  # texts checked against a budget
+    truncated: int = 0  # texts that exceeded it
+    # Tokens of the truncated texts before windowing; texts too long to
+    # tokenize whole count only the stretches the window was taken from.
+    tokens_in: int = 0
+    tokens_kept: int = 0  # tokens of the truncated texts after windowing
+
+
+_stats: dict[str, WindowStats] = {}
+_stats_guard = threading.Lock()
+
+
+def window_stats() -> dict[str, WindowStats]:
+    """Snapshot of truncation counters per signal type."""
+    with _stats_guard:
+        return {key: WindowStats(**vars(stats)) for key, stats in _stats.items()}
+
+
+def window_content(
+    tokenizer: Llama,
+    text: str,
+    max_tokens: int,
+    window: ContentWindow,
+    stats_key: str = "",
+) -> str:
+    """Cut `text` down to at most `max_tokens` tokens of `tokenizer`.
+
+    Texts within budget come back unchanged. Only the vocabulary is used, so
+    the model's context does not need to be held.
+    """
+    if max_tokens <= 0:
+        return text
+    truncated, tokens_in, tokens_kept = _window(tokenizer, text, max_tokens, window)
+    with _stats_guard:
+        stats = _stats.setdefault(stats_key, WindowStats())
+        stats.windowed += 1
+        if truncated != text:
+            stats.truncated += 1
+            stats.tokens_in += tokens_in
+            stats.tokens_kept += tokens_kept
+    return truncated
+
+
+def _window(
+    tokenizer: Llama, text: str, max_tokens: int, window: ContentWindow
+) -> tuple[str, int, int]:
+    # Every token covers at least one byte.
+    if len(text.encode("utf-8")) <= max_tokens:
+        return text, 0, 0
+
+    # Never tokenize more than the window can keep from either end; a huge
+    # paste would otherwise cost more to tokenize than to classify.
+    reach = max_tokens * _MAX_CHARS_PER_TOKEN
+    if len(text) > 2 * reach:
+        head_text, tail_text = text[:reach], text[-reach:]
+        tokens_in = -1  # unknown without tokenizing everything
+    else:
+        head_text = tail_text = text
+        tokens_in = 0
+
+    head = _tokenize(tokenizer, head_text)
+    tail = head if tail_text is head_text else _tokenize(tokenizer, tail_text)
+    if tokens_in == 0:
+        if len(head) <= max_tokens:
+            return text, 0, 0
+        tokens_in = len(head)
+    else:
+        tokens_in = len(head) + len(tail)
+
+    if window == ContentWindow.HEAD:
+        kept = _detokenize(tokenizer, head[:max_tokens])
+    elif window == ContentWindow.TAIL:
+        kept = _detokenize(tokenizer, tail[-max_tokens:])
+    else:
+        budget = max(max_tokens - len(_tokenize(tokenizer, _ELISION)), 2)
+        half = budget // 2
+        kept = (
+            _detokenize(tokenizer, head[:half])
+            + _ELISION
+            + _detokenize(tokenizer, tail[-(budget - half) :])
+        )
+    return kept, tokens_in, max_tokens
+
+
+def _tokenize(tokenizer: Llama, text: str) -> list[int]:
+    return tokenizer.tokenize(text.encode("utf-8"), add_bos=False, special=False)
+
+
+def _detokenize(tokenizer: Llama, tokens: list[int]) -> str:
+    return tokenizer.detokenize(tokens).decode("utf-8", errors="ignore").strip()
@@ -0,0 +1,205 @@
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from dataclasses import dataclass, field
+
+from nano_semantic_router.config.config import (
+    ConditionOperator,
+    DecisionConfig,
+    SignalOperator,
+    SignalType,
+)
+from nano_semantic_router.semantic_router.decision.decision import DecisionResult
+from nano_semantic_router.semantic_router.signal.signal import (
+    ComplexitySignal,
+    Signal,
+    UseCaseSignal,
+)
+
+# (decision index, condition index) of one compiled condition.
+_Ref = tuple[int, int]
+
+
+@dataclass
+class _Thresholds:
+    """GT/LT conditions on one numeric signal, sorted by threshold."""
+
+    values: list[float] = field(default_factory=list)
+    refs: list[_Ref] = field(default_factory=list)
+
+    def add(self, value: float, ref: _Ref) -> None:
+        at = bisect_right(self.values, value)
+        self.values.insert(at, value)
+        self.refs.insert(at, ref)
+
+
+@dataclass
+class _ValueIndex:
+    """EQ/NEQ conditions on one signal, hashed by the value they compare against."""
+
+    eq: dict[object, list[_Ref]] = field(default_factory=lambda: defaultdict(list))
+    neq: dict[object, list[_Ref]] = field(default_factory=lambda: defaultdict(list))
+    neq_all: list[_Ref] = field(default_factory=list)
+
+    def add(self, operator: SignalOperator, value: object, ref: _Ref) -> None:
+        if operator == SignalOperator.EQ:
+            self.eq[value].append(ref)
+        else:
+            self.neq[value].append(ref)
+            self.neq_all.append(ref)
+
+    def matches(self, value: object) -> list[_Ref]:
+        excluded = set(self.neq.get(value, ()))
+        neq = [ref for ref in self.neq_all if ref not in excluded]
+        return self.eq.get(value, []) + neq
+
+
+class DecisionTable:
+    """Decisions compiled once into per-signal-type indexes.
+
+    Complexity thresholds sit in sorted arrays, so the GT/LT conditions a score
+    satisfies are one bisect away; EQ/NEQ conditions are hashed by value. Only
+    matched conditions are touched per request, and `decide` returns the same
+    `DecisionResult` as `make_routing_decision`.
+    """
+
+    def __init__(self, decisions: list[DecisionConfig]) -> None:
+        self.decisions = decisions
+        self._rule_names: list[list[str]] = []
+        self._required: list[int] = []  # matches needed for an AND decision
+        self._greater_than = _Thresholds()  # complexity score > threshold
+        self._less_than = _Thresholds()  # complexity score < threshold
+        self._scores = _ValueIndex()
+        self._use_cases = _ValueIndex()
+        # AND decisions without rules always match, with confidence 0.
+        self._vacuous: list[int] = []
+        # Per decision, how many of its conditions each signal type can satisfy.
+        self._type_counts: list[dict[SignalType, int]] = []
+
+        for d, decision in enumerate(decisions):
+            self._rule_names.append(
+                [
+                    f"{c.signal.signal_type} {c.operator} {c.signal}"
+                    for c in decision.rules
+                ]
+            )
+            self._required.append(len(decision.rules))
+            if not decision.rules and decision.operator == ConditionOperator.AND:
+                self._vacuous.append(d)
+            counts: dict[SignalType, int] = defaultdict(int)
+            for c, condition in enumerate(decision.rules):
+                if self._add(condition.signal, condition.operator, (d, c)):
+                    counts[condition.signal.signal_type] += 1
+            self._type_counts.append(dict(counts))
+
+    def _add(self, target: Signal, operator: SignalOperator, ref: _Ref) -> bool:
+        """Index one condition; False if no signal can ever satisfy it."""
+        if isinstance(target, ComplexitySignal):
+            if operator == SignalOperator.GT:
+                self._greater_than.add(target.score, ref)
+            elif operator == SignalOperator.LT:
+                self._less_than.add(target.score, ref)
+            else:
+                self._scores.add(operator, target.score, ref)
+            return True
+        if isinstance(target, UseCaseSignal):
+            if operator in (SignalOperator.EQ, SignalOperator.NEQ):
+                self._use_cases.add(operator, target.use_case, ref)
+                return True
+        return False
+
+    def referenced_types(self) -> set[SignalType]:
+        """Signal types that at least one decision rule can match on."""
+        return {t for counts in self._type_counts for t in counts}
+
+    def open_signal_types(
+        self, signals: list[Signal], pending: list[SignalType]
+    ) -> set[SignalType]:
+        """Types among `pending` whose signals could still change `decide`'s winner.
+
+        `signals` are the signals computed so far and `pending` the types of
+        those not computed yet; each pending signal may match every condition
+        of its type or none. Empty once the winning decision (or the absence
+        of one) is fixed.
+        """
+        hits: dict[int, int] = defaultdict(int)
+        for signal in signals:
+            for d, _ in self._matches(signal):
+                hits[d] += 1
+
+        # (index, surely matched, lowest and highest possible confidence)
+        candidates: list[tuple[int, bool, float, float]] = []
+        for d, decision in enumerate(self.decisions):
+            known = hits.get(d, 0)
+            extra = sum(self._type_counts[d].get(t, 0) for t in pending)
+            required = self._required[d]
+            if decision.operator == ConditionOperator.AND:
+                if not known <= required <= known + extra:
+                    continue
+                # Every match counts, so a further match would overshoot.
+                sure = known == required and extra == 0
+                confidence = 1.0 if required else 0.0
+                candidates.append((d, sure, confidence, confidence))
+            elif decision.operator == ConditionOperator.OR:
+                if known + extra == 0:
+                    continue
+                candidates.append(
+                    (d, known > 0, known / required, (known + extra) / required)
+                )
+
+        sure = [c for c in candidates if c[1]]
+        winner = max(sure, key=lambda c: (c[2], -c[0]), default=None)
+        open_types: set[SignalType] = set()
+        for d, _, _, highest in candidates:
+            if winner is not None:
+                if d == winner[0] or highest < winner[2]:
+                    continue
+                if highest == winner[2] and d > winner[0]:
+                    continue
+            open_types.update(t for t in pending if t in self._type_counts[d])
+        return open_types
+
+    def _matches(self, signal: Signal) -> list[_Ref]:
+        if isinstance(signal, ComplexitySignal):
+            score = signal.score
+            gt = self._greater_than
+            lt = self._less_than
+            return (
+                gt.refs[: bisect_left(gt.values, score)]
+                + lt.refs[bisect_right(lt.values, score) :]
+                + self._scores.matches(score)
+            )
+        if isinstance(signal, UseCaseSignal):
+            return self._use_cases.matches(signal.use_case)
+        return []
+
+    def decide(self, signals: list[Signal]) -> DecisionResult | None:
+        """Best matching decision for `signals`, ties going to the earlier decision."""
+        # decision -> (condition index, signal index) of every match
+        hits: dict[int, list[tuple[int, int]]] = defaultdict(list)
+        for s, signal in enumerate(signals):
+            for d, c in self._matches(signal):
+                hits[d].append((c, s))
+
+        best: int | None = None
+        best_confidence = -1.0
+        best_hits: list[tuple[int, int]] = []
+        for d in sorted(set(hits) | set(self._vacuous)):
+            matched = hits.get(d, [])
+            required = self._required[d]
+            if self.decisions[d].operator == ConditionOperator.AND:
+                if len(matched) != required:
+                    continue
+            elif not matched:
+                continue
+            confidence = len(matched) / required if required else 0.0
+            if confidence > best_confidence:
+                best, best_confidence, best_hits = d, confidence, matched
+
+        if best is None:
+            return None
+        names = self._rule_names[best]
+        return DecisionResult(
+            decision=self.decisions[best],
+            confidence=best_confidence,
+            matched_rules=[names[c] for c, _ in sorted(best_hits)],
+        )
@@ -0,0 +1,9 @@
+from nano_semantic_router.semantic_router.observability.metrics import (
+    Counter,
+    Gauge,
+    Histogram,
+    render,
+)
+from nano_semantic_router.semantic_router.observability.watchdog import LoopWatchdog
+
+__all__ = ["Counter", "Gauge", "Histogram", "LoopWatchdog", "render"]
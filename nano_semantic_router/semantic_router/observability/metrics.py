@@ -0,0 +1,173 @@
+import threading
+from bisect import bisect_left
+from dataclasses import dataclass, field
+
+# Upper bounds in seconds; fine at the low end for parsing and decision stages.
+_BUCKETS = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+)
+
+_Labels = tuple[tuple[str, str], ...]
+
+
+@dataclass
+class _Series:
+    counts: list[int]
+    total: float = 0.0
+    count: int = 0
+
+
+class Counter:
+    """Monotonic count per label set."""
+
+    def __init__(self, name: str, help: str) -> None:
+        self.name = name
+        self.help = help
+        self._values: dict[_Labels, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            values = list(self._values.items())
+        lines.extend(f"{self.name}{_format(key)} {value:g}" for key, value in values)
+        return lines
+
+
+class Histogram:
+    """Cumulative-bucket latency histogram per label set."""
+
+    def __init__(
+        self, name: str, help: str, buckets: tuple[float, ...] = _BUCKETS
+    ) -> None:
+        self.name = name
+        self.help = help
+        self.buckets = buckets
+        self._series: dict[_Labels, _Series] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = tuple(sorted(labels.items()))
+        at = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = _Series(counts=[0] * len(self.buckets))
+            if at < len(self.buckets):
+                series.counts[at] += 1
+            series.total += value
+            series.count += 1
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            snapshot = [
+                (key, list(s.counts), s.total, s.count)
+                for key, s in self._series.items()
+            ]
+        for key, counts, total, count in snapshot:
+            cumulative = 0
+            for bound, bucket in zip(self.buckets, counts):
+                cumulative += bucket
+                le = key + (("le", f"{bound:g}"),)
+                lines.append(f"{self.name}_bucket{_format(le)} {cumulative}")
+            lines.append(
+                f"{self.name}_bucket{_format(key + (('le', '+Inf'),))} {count}"
+            )
+            lines.append(f"{self.name}_sum{_format(key)} {total:g}")
+            lines.append(f"{self.name}_count{_format(key)} {count}")
+        return lines
+
+
+@dataclass
+class Gauge:
+    """Values read from elsewhere when metrics are rendered, set at scrape time.
+
+    `metric_type` is "counter" for cumulative totals kept by other components.
+    """
+
+    name: str
+    help: str
+    metric_type: str = "gauge"
+    values: dict[_Labels, float] = field(default_factory=dict)
+
+    def set(self, value: float, **labels: str) -> None:
+        self.values[tuple(sorted(labels.items()))] = value
+
+    def render(self) -> list[str]:
+        lines = [
+            f"# HELP {self.name} {self.help}",
+            f"# TYPE {self.name} {self.metric_type}",
+        ]
+        lines.extend(
+            f"{self.name}{_format(key)} {value:g}" for key, value in self.values.items()
+        )
+        return lines
+
+
+def _format(labels: _Labels) -> str:
+    if not labels:
+        return ""
+    pairs = ",".join(f'{name}="{_escape(value)}"' for name, value in labels)
+    return "{" + pairs + "}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+# Process-wide metrics. With several workers, each process reports its own.
+stage_seconds = Histogram(
+    "router_stage_seconds",
+    "Time spent in each stage of handling a request.",
+)
+signal_seconds = Histogram(
+    "router_signal_seconds",
+    "Time spent classifying each signal; 'combined' for a shared prompt.",
+)
+decisions_total = Counter(
+    "router_decisions_total",
+    "Routed requests by decision ('none' for the default model) and target model.",
+)
+loop_lag_seconds = Histogram(
+    "router_event_loop_lag_seconds",
+    "How late the event loop ran a timer that was due.",
+)
+upstream_responses_total = Counter(
+    "router_upstream_responses_total",
+    "Upstream responses by status code.",
+)
+
+
+def render(gauges: list[Gauge]) -> str:
+    """Prometheus text exposition of the process-wide metrics and `gauges`."""
+    lines: list[str] = []
+    for metric in (
+        stage_seconds,
+        signal_seconds,
+        decisions_total,
+        upstream_responses_total,
+        loop_lag_seconds,
+        *gauges,
+    ):
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
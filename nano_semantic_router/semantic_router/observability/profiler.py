@@ -0,0 +1,106 @@
+import asyncio
+import cProfile
+import io
+import marshal
+import pstats
+import sys
+import threading
+from collections import Counter
+
+# Stack frames kept per sample; deeper stacks are cut at the root end.
+_MAX_DEPTH = 128
+
+
+class Profile:
+    """One profiling run over the live server, until a time or request budget is spent.
+
+    "sample" mode records the stack of every thread (event loop and
+    classifier threads alike) every `interval` seconds and renders them as
+    collapsed stacks for flamegraph tools. "deterministic" mode runs cProfile,
+    which since Python 3.12 hooks every thread, so classifier calls are
+    included, and renders pstats data.
+    """
+
+    def __init__(
+        self, mode: str, seconds: float, requests: int, interval: float = 0.005
+    ) -> None:
+        if mode not in ("sample", "deterministic"):
+            raise ValueError(f"unknown profiling mode: {mode}")
+        self.mode = mode
+        self.seconds = seconds
+        self.requests = requests
+        self.interval = interval
+        self._remaining = requests
+        self._done = asyncio.Event()
+        self._samples: Counter[str] = Counter()
+        self._sampler: threading.Thread | None = None
+        self._stopped = threading.Event()
+        self._profile = cProfile.Profile()
+
+    async def collect(self) -> None:
+        """Profile until `requests` requests have finished or `seconds` have passed."""
+        self._start()
+        try:
+            await asyncio.wait_for(self._done.wait(), timeout=self.seconds)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            self._stop()
+
+    def request_done(self) -> None:
+        if self.requests <= 0:
+            return
+        self._remaining -= 1
+        if self._remaining <= 0:
+            self._done.set()
+
+    def collapsed(self) -> str:
+        """Samples in the collapsed-stack format read by flamegraph.pl and speedscope."""
+        return "".join(
+            f"{stack} {count}\n" for stack, count in self._samples.most_common()
+        )
+
+    def pstats_dump(self) -> bytes:
+        """The profile in the binary format `pstats.Stats` and snakeviz load."""
+        self._profile.create_stats()
+        return marshal.dumps(self._profile.stats)  # type: ignore[attr-defined]
+
+    def pstats_text(self, limit: int = 100) -> str:
+        out = io.StringIO()
+        pstats.Stats(self._profile, stream=out).sort_stats("cumulative").print_stats(
+            limit
+        )
+        return out.getvalue()
+
+    def _start(self) -> None:
+        if self.mode == "sample":
+            self._sampler = threading.Thread(
+                target=self._sample, name="profiler", daemon=True
+            )
+            self._sampler.start()
+        else:
+            self._profile.enable()  # ValueError if another profiler is active
+
+    def _stop(self) -> None:
+        self._stopped.set()
+        if self._sampler is not None:
+            self._sampler.join()
+        else:
+            self._profile.disable()
+
+    def _sample(self) -> None:
+        me = threading.get_ident()
+        while not self._stopped.wait(self.interval):
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == me:
+                    continue
+                stack: list[str] = []
+                while frame is not None and len(stack) < _MAX_DEPTH:
+                    code = frame.f_code
+                    stack.append(
+                        f"{code.co_qualname} ({code.co_filename}:{code.co_firstlineno})"
+                    )
+                    frame = frame.f_back
+                stack.append(names.get(ident, str(ident)))
+                self._samples[";".join(reversed(stack))] += 1
@@ -0,0 +1,62 @@
+import json
+import logging
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from nano_semantic_router.semantic_router.server.context import RouterContext
+
+# Stages spent in the router itself, before the request goes upstream.
+_ROUTER_STAGES = ("read_body", "parse", "classify", "decide")
+
+# Separate from the root logger so traces can be shipped or silenced on their own.
+trace_logger = logging.getLogger("nano_semantic_router.trace")
+
+
+def timing_headers(ctx: "RouterContext") -> dict[str, str]:
+    """Server-Timing and x-router-* headers for the stages timed so far.
+
+    Durations are in milliseconds. "router" is the time spent before the
+    request went upstream and "upstream_ttfb" the wait for the upstream's
+    response headers; "total" is only known for responses sent in one piece.
+    """
+    entries = [
+        f"router;dur={_ms(sum(ctx.timings.get(s, 0.0) for s in _ROUTER_STAGES))}"
+    ]
+    entries.extend(
+        f"{stage};dur={_ms(seconds)}" for stage, seconds in ctx.timings.items()
+    )
+    entries.extend(
+        f"signal.{name};dur={_ms(seconds)}"
+        for name, seconds in ctx.signal_timings.items()
+    )
+    headers = {"Server-Timing": ", ".join(entries)}
+    if ctx.target_model:
+        headers["x-router-decision"] = ctx.decision or "none"
+        headers["x-router-model"] = ctx.target_model
+    if ctx.signal_timings:
+        headers["x-router-signal-ms"] = ", ".join(
+            f"{name}={_ms(seconds)}" for name, seconds in ctx.signal_timings.items()
+        )
+    return headers
+
+
+def log_trace(
+    ctx: "RouterContext", method: str, path: str, request_id: str, status: int
+) -> None:
+    """Write one JSON record with the request's routing outcome and timings."""
+    record = {
+        "request_id": request_id,
+        "method": method,
+        "path": path,
+        "status": status,
+        "decision": ctx.decision or None,
+        "model": ctx.target_model or None,
+        "upstream": ctx.upstream_base,
+        "stages_ms": {stage: _ms(s) for stage, s in ctx.timings.items()},
+        "signals_ms": {name: _ms(s) for name, s in ctx.signal_timings.items()},
+    }
+    trace_logger.info(json.dumps(record))
+
+
+def _ms(seconds: float) -> float:
+    return round(seconds * 1000, 3)
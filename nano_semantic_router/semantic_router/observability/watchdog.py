@@ -0,0 +1,103 @@
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+
+from nano_semantic_router.semantic_router.observability.metrics import (
+    Gauge,
+    loop_lag_seconds,
+)
+
+_QUANTILES = (0.5, 0.9, 0.99, 1.0)
+
+
+class LoopWatchdog:
+    """Measure event-loop lag and report the stack of code that blocks the loop.
+
+    A task on the loop sleeps for `interval` over and over; how late it wakes
+    up is the loop's lag. A separate thread checks that the task keeps
+    waking up. Once it has not for `threshold` seconds past its interval, the
+    thread logs the loop thread's current stack, i.e. the code blocking it,
+    once per blocking episode.
+    """
+
+    def __init__(
+        self, threshold: float, interval: float = 0.05, window: int = 2048
+    ) -> None:
+        self.threshold = threshold
+        self.interval = interval
+        self.blocked = 0  # blocking episodes reported
+        self._lags: deque[float] = deque(maxlen=window)
+        self._heartbeat = time.monotonic()
+        self._reported = 0.0  # heartbeat of the last episode reported
+        self._loop_thread = 0
+        self._task: asyncio.Task[None] | None = None
+        self._thread: threading.Thread | None = None
+        self._stopped = threading.Event()
+
+    def start(self) -> None:
+        """Start watching the running loop; call from a coroutine on it."""
+        self._loop_thread = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        self._stopped.clear()
+        self._task = asyncio.get_running_loop().create_task(self._tick())
+        self._thread = threading.Thread(
+            target=self._watch, name="loop-watchdog", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    async def _tick(self) -> None:
+        while True:
+            expected = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            lag = max(0.0, now - expected)
+            self._lags.append(lag)
+            loop_lag_seconds.observe(lag)
+            self._heartbeat = now
+
+    def _watch(self) -> None:
+        check = min(self.interval, self.threshold / 2)
+        while not self._stopped.wait(check):
+            heartbeat = self._heartbeat
+            stalled = time.monotonic() - heartbeat - self.interval
+            if stalled < self.threshold or heartbeat == self._reported:
+                continue
+            self._reported = heartbeat
+            self.blocked += 1
+            frame = sys._current_frames().get(self._loop_thread)
+            stack = "".join(traceback.format_stack(frame)) if frame else "unavailable"
+            logging.warning(
+                f"Event loop blocked for over {stalled * 1000:.0f}ms; "
+                f"loop thread stack:\n{stack}"
+            )
+
+    def gauges(self) -> list[Gauge]:
+        """Lag quantiles over the recent window and the blocking episode count."""
+        quantiles = Gauge(
+            "router_event_loop_lag_quantile_seconds",
+            "Event-loop lag quantiles over the most recent samples.",
+        )
+        lags = sorted(self._lags)
+        for q in _QUANTILES:
+            value = lags[min(len(lags) - 1, int(q * len(lags)))] if lags else 0.0
+            quantiles.set(value, quantile=f"{q:g}")
+        blocked = Gauge(
+            "router_event_loop_blocked_total",
+            "Times the event loop was blocked for longer than the threshold.",
+            metric_type="counter",
+        )
+        blocked.set(self.blocked)
+        return [quantiles, blocked]
@@ -0,0 +1,115 @@
+import logging
+import math
+import random
+import time
+from dataclasses import dataclass
+
+from nano_semantic_router.config.config import BalanceStrategy, Model
+
+# Seconds over which the latency EWMA forgets; an endpoint that got slow is
+# tried again once its estimate has decayed.
+_EWMA_DECAY = 10.0
+
+
+@dataclass
+class EndpointState:
+    url: str
+    weight: float
+    outstanding: int = 0  # requests sent and not finished
+    latency: float = 0.0  # peak EWMA of time to response headers, seconds
+    updated: float = 0.0  # monotonic time `latency` was last updated
+    failures: int = 0  # consecutive failed requests
+    ejected_until: float = 0.0
+    ejections: int = 0
+
+    def decayed_latency(self, now: float) -> float:
+        return self.latency * math.exp(-(now - self.updated) / _EWMA_DECAY)
+
+
+class EndpointBalancer:
+    """Spread one model's requests over its endpoints and stop using failing ones.
+
+    Each pick draws two endpoints at random in proportion to their weights and
+    takes the less loaded one, the first drawn on a tie: requests in flight
+    per weight, or with `BalanceStrategy.EWMA` the expected wait (requests in
+    flight times the endpoint's recent latency) per weight. With
+    least-outstanding, idle endpoints tie, so light traffic follows the
+    weights; with EWMA, light traffic goes to the replica with the lowest
+    latency per weight until requests pile up on it. Comparing
+    two random endpoints rather than all of them keeps concurrent picks from
+    herding onto whichever one looked best a moment ago.
+
+    Health is tracked passively: `eject_failures` failed requests in a row
+    take an endpoint out of rotation for `eject_seconds`. If every endpoint is
+    ejected, all of them are used again rather than failing every request.
+    """
+
+    def __init__(self, model: Model, eject_failures: int, eject_seconds: float) -> None:
+        for endpoint in model.endpoints:
+            if endpoint.weight <= 0:
+                raise ValueError(
+                    f"endpoint {endpoint.url} of model {model.name} needs a positive weight"
+                )
+        self.model = model.name
+        self.strategy = model.balance
+        self.eject_failures = eject_failures
+        self.eject_seconds = eject_seconds
+        self.endpoints = [EndpointState(e.url, e.weight) for e in model.endpoints]
+
+    def pick(self) -> EndpointState:
+        """Choose the endpoint for one request; pass it to `release` when done."""
+        now = time.monotonic()
+        candidates = [e for e in self.endpoints if e.ejected_until <= now]
+        if not candidates:
+            candidates = self.endpoints
+        if len(candidates) == 1:
+            chosen = candidates[0]
+        else:
+            first = random.choices(candidates, [e.weight for e in candidates])[0]
+            rest = [e for e in candidates if e is not first]
+            second = random.choices(rest, [e.weight for e in rest])[0]
+            chosen = min(first, second, key=lambda e: self._load(e, now))
+        chosen.outstanding += 1
+        return chosen
+
+    def release(
+        self, endpoint: EndpointState, latency: float | None, failed: bool
+    ) -> None:
+        """Record how a request sent to `endpoint` went.
+
+        `latency` is the time to response headers, None if none arrived.
+        """
+        endpoint.outstanding -= 1
+        now = time.monotonic()
+        # A fast error says nothing about how fast the endpoint serves, so
+        # only successful requests feed the latency estimate.
+        if latency is not None and not failed:
+            # Peak EWMA: a slowdown counts at once, recovery is gradual.
+            decayed = endpoint.decayed_latency(now)
+            if latency >= decayed:
+                endpoint.latency = latency
+            else:
+                keep = math.exp(-(now - endpoint.updated) / _EWMA_DECAY)
+                endpoint.latency = endpoint.latency * keep + latency * (1 - keep)
+            endpoint.updated = now
+        if not failed:
+            endpoint.failures = 0
+            return
+        if endpoint.ejected_until > now:
+            return  # sent before the ejection; already accounted for
+        endpoint.failures += 1
+        if 0 < self.eject_failures <= endpoint.failures:
+            endpoint.failures = 0
+            endpoint.ejected_until = now + self.eject_seconds
+            endpoint.ejections += 1
+            logging.warning(
+                f"Ejecting endpoint {endpoint.url} of model {self.model} for "
+                f"{self.eject_seconds:g}s after {self.eject_failures} failed requests"
+            )
+
+    def _load(self, endpoint: EndpointState, now: float) -> float:
+        if self.strategy == BalanceStrategy.EWMA:
+            # Endpoints without a measurement yet cost nothing, so they get tried.
+            wait = (endpoint.outstanding + 1) * endpoint.decayed_latency(now)
+            return wait / endpoint.weight
+        return endpoint.outstanding / endpoint.weight
@@ -1,9 +1,44 @@
-from dataclasses import dataclass
-from aiohttp import ClientSession, web
+from dataclasses import dataclass, field
+from aiohttp import web
+
+from nano_semantic_router.semantic_router.cache.classification_cache import (
+    ClassificationCache,
+)
+from nano_semantic_router.semantic_router.cache.semantic_cache import (
+    CacheKey,
+    SemanticCache,
+)
+from nano_semantic_router.semantic_router.decision.table import DecisionTable
+from nano_semantic_router.semantic_router.classification.executor import (
+    ClassificationExecutor,
+)
+from nano_semantic_router.semantic_router.server.balancer import EndpointBalancer
+from nano_semantic_router.semantic_router.server.upstream import UpstreamPool
 
 
 @dataclass
 class RouterContext:
+    """Per-request routing state. Created for every incoming request."""
+
     upstream_base: str
-    client: ClientSession
+    pool: UpstreamPool
+    classifier: ClassificationExecutor
     original_request: web.Request | None = None
+    cache: SemanticCache | None = None
+    # Set when the response to this request should be stored in `cache`.
+    cache_key: CacheKey | None = None
+    classification_cache: ClassificationCache | None = None
+    # Compiled form of the router's decisions; rebuilt from the config if unset.
+    decision_table: DecisionTable | None = None
+    # Seconds spent in each stage of this request, by stage name.
+    timings: dict[str, float] = field(default_factory=dict)
+    # Seconds each signal took to classify, by signal type; cached signals are absent.
+    signal_timings: dict[str, float] = field(default_factory=dict)
+    # Routing outcome: the matched decision ("" for the default model) and target.
+    decision: str = ""
+    target_model: str = ""
+    # Set when the target model has several endpoints; the proxy picks one of
+    # them as `upstream_base` right before sending.
+    balancer: EndpointBalancer | None = None
+    # Status of the upstream's response, 0 until its headers arrive.
+    upstream_status: int = 0
@@ -1,25 +1,48 @@
-import copy
+from __future__ import annotations
+
+import hashlib
 import json
+import time
 from dataclasses import dataclass
-from typing import Any, TypeGuard, Union, cast
+from typing import TYPE_CHECKING, Any, TypeGuard, Union, cast
 
 from aiohttp import web
 from multidict import CIMultiDict
-from openai.types.chat.completion_create_params import (
-    CompletionCreateParamsNonStreaming,
-    CompletionCreateParamsStreaming,
-)
-from openai.types.responses.response_create_params import (
-    ResponseCreateParamsNonStreaming,
-    ResponseCreateParamsStreaming,
-)
-from nano_semantic_router.config.config import Model, RouterConfig
+from nano_semantic_router.config.config import CacheConfig, Model, RouterConfig
+from nano_semantic_router.config.utils import get_model_by_ref
 import logging
+from nano_semantic_router.semantic_router.cache.semantic_cache import (
+    CachedResponse,
+    CacheKey,
+    SemanticCache,
+)
+from nano_semantic_router.semantic_router.classification.embedding import embed
 from nano_semantic_router.semantic_router.signal.signal import (
-    get_signals_from_content,
+    get_signals_concurrently,
 )
+from nano_semantic_router.semantic_router.signal.lazy import get_signals_lazily
 from nano_semantic_router.semantic_router.server.context import RouterContext
-from nano_semantic_router.semantic_router.decision.decision import make_routing_decision
+from nano_semantic_router.semantic_router.server.rewrite import rewrite_model
+from nano_semantic_router.semantic_router.decision.table import DecisionTable
+
+# The openai SDK types are only used for type checking; importing them takes
+# most of a second.
+if TYPE_CHECKING:
+    from openai.types.chat.completion_create_params import (
+        CompletionCreateParamsNonStreaming,
+        CompletionCreateParamsStreaming,
+    )
+    from openai.types.responses.response_create_params import (
+        ResponseCreateParamsNonStreaming,
+        ResponseCreateParamsStreaming,
+    )
+
+    ParsedOpenAIRequest = Union[
+        CompletionCreateParamsNonStreaming,
+        CompletionCreateParamsStreaming,
+        ResponseCreateParamsNonStreaming,
+        ResponseCreateParamsStreaming,
+    ]
 
 
 @dataclass
@@ -28,38 +51,86 @@ class ProcessedRequest:
     path_and_query: str
     headers: CIMultiDict[str]
     body: bytes
-
-
-ParsedOpenAIRequest = Union[
-    CompletionCreateParamsNonStreaming,
-    CompletionCreateParamsStreaming,
-    ResponseCreateParamsNonStreaming,
-    ResponseCreateParamsStreaming,
-]
+    stream: bool = False
+    # Set when the semantic cache already holds a response; nothing is proxied.
+    cached: CachedResponse | None = None
 
 
 async def process(
     request: web.Request, router_config: RouterConfig, ctx: RouterContext
 ) -> ProcessedRequest:
+    started = time.perf_counter()
     body = await request.read()
     # TODO: check headers, parse request metadata (request id) and classify.
-    print(f"body ({len(body)} bytes): {body!r}")
+    ctx.timings["read_body"] = time.perf_counter() - started
 
+    # The only copy of the incoming headers; routing edits it in place and the
+    # proxy sends it as is.
     headers = CIMultiDict(request.headers)
     path_and_query = request.rel_url.human_repr()
+    started = time.perf_counter()
     parsed_request = parse_openai_request(body)
     user_content, _ = extract_user_content(parsed_request)
+    ctx.timings["parse"] = time.perf_counter() - started
     if user_content == "":
         logging.warning(
             "No user content extracted from request; routing may be inaccurate. "
         )
 
-    # use user_content to do routing.
-    signals = get_signals_from_content(
-        active_signals=router_config.signals,
-        user_content=user_content,
-    )
-    decision = make_routing_decision(signals, router_config.decisions)
+    stream = bool(parsed_request.get("stream"))
+    # Cached bodies are complete JSON responses, so streaming requests bypass the cache.
+    if (
+        ctx.cache is not None
+        and user_content
+        and not stream
+        and _is_cacheable(cast(dict, parsed_request), router_config.cache)
+    ):
+        cache_key, cached = await ctx.classifier.run(
+            _lookup_cache,
+            ctx.cache,
+            get_model_by_ref(
+                router_config.cache.embedding_model_ref, router_config
+            ).path,
+            path_and_query,
+            cast(dict, parsed_request),
+            _caller_identity(headers),
+            user_content,
+        )
+        if cached is not None:
+            logging.info("Semantic cache hit; skipping classification and upstream")
+            return ProcessedRequest(
+                request.method, path_and_query, headers, body, cached=cached
+            )
+        ctx.cache_key = cache_key
+
+    # use user_content to do routing. Classification is CPU-bound, so it runs on
+    # the classifier threads to keep the event loop serving other requests, one
+    # job per classifier model so different models can run side by side.
+    table = ctx.decision_table or DecisionTable(router_config.decisions)
+    started = time.perf_counter()
+    if router_config.lazy_signals:
+        signals = await get_signals_lazily(
+            active_signals=router_config.signals,
+            user_content=user_content,
+            router_config=router_config,
+            executor=ctx.classifier,
+            table=table,
+            cache=ctx.classification_cache,
+            timings=ctx.signal_timings,
+        )
+    else:
+        signals = await get_signals_concurrently(
+            active_signals=router_config.signals,
+            user_content=user_content,
+            router_config=router_config,
+            executor=ctx.classifier,
+            cache=ctx.classification_cache,
+            timings=ctx.signal_timings,
+        )
+    ctx.timings["classify"] = time.perf_counter() - started
+    started = time.perf_counter()
+    decision = table.decide(signals)
+    ctx.timings["decide"] = time.perf_counter() - started
 
     # get default model from router config
     default_model = iter(
@@ -82,6 +153,8 @@ async def process(
             f"Routing decision: {decision.decision.name} (confidence: {decision.confidence:.2f}, matched_rules: {decision.matched_rules}) -> target model: {model}"
         )
 
+    ctx.decision = decision.decision.name if decision else ""
+    ctx.target_model = model.name
     rewritten_body, rewritten_headers, rewritten_path = _apply_routing(
         body,
         headers,
@@ -96,19 +169,105 @@ async def process(
         rewritten_path,
         rewritten_headers,
         rewritten_body,
+        stream=stream,
     )
 
 
+# Request headers that identify the caller; a cached response is only served
+# to the same caller.
+_IDENTITY_HEADERS = ("Authorization", "OpenAI-Organization", "OpenAI-Project")
+
+
+def _is_cacheable(payload: dict[str, Any], cache_config: CacheConfig) -> bool:
+    """Whether a response to `payload` may be replayed for similar requests.
+
+    Sampled requests (a temperature other than 0, which is also the API's
+    default of 1 when absent, or several choices) expect varied answers and
+    are only cached when the config allows it.
+    """
+    if cache_config.cache_sampled:
+        return True
+    return payload.get("temperature", 1) == 0 and payload.get("n", 1) == 1
+
+
+def _caller_identity(headers: CIMultiDict[str]) -> str:
+    identity = "\x00".join(
+        value for name in _IDENTITY_HEADERS for value in headers.getall(name, ())
+    )
+    return hashlib.sha256(identity.encode("utf-8")).hexdigest()
+
+
+def _cache_namespace(
+    path_and_query: str, payload: dict[str, Any], identity: str
+) -> str:
+    """Everything that must match exactly for a cached response to apply.
+
+    Similarity is only measured on the user content, so the namespace holds
+    the whole request except that text (model, parameters, tools, earlier
+    turns, instructions) and the caller's identity.
+    """
+    scoped = json.dumps(
+        _without_user_content(payload),
+        sort_keys=True,
+        separators=(",", ":"),
+        default=str,
+    )
+    context = hashlib.sha256(scoped.encode("utf-8")).hexdigest()
+    return f"{path_and_query}#{identity}#{context}"
+
+
+def _without_user_content(payload: dict[str, Any]) -> dict[str, Any]:
+    """`payload` without the text `extract_user_content` returns for it."""
+    if "messages" in payload:
+        messages = list(payload["messages"])
+        for index in range(len(messages) - 1, -1, -1):
+            message = messages[index]
+            if isinstance(message, dict) and message.get("role") == "user":
+                content = message.get("content", "")
+                if isinstance(content, list):
+                    # Keep images and other non-text parts: they must match too.
+                    content = [
+                        part
+                        for part in content
+                        if not (isinstance(part, dict) and part.get("type") == "text")
+                    ]
+                else:
+                    content = None
+                messages[index] = {**message, "content": content}
+                break
+        return {**payload, "messages": messages}
+    if "input" in payload:
+        input_data = payload["input"]
+        if isinstance(input_data, list):
+            input_data = [item for item in input_data if not isinstance(item, str)]
+        else:
+            input_data = None
+        return {**payload, "input": input_data}
+    return payload
+
+
+def _lookup_cache(
+    cache: SemanticCache,
+    model_path: str,
+    path_and_query: str,
+    payload: dict[str, Any],
+    identity: str,
+    user_content: str,
+) -> tuple[CacheKey, CachedResponse | None]:
+    # Runs on a classifier thread: serializing a large payload for the
+    # namespace would otherwise block the event loop.
+    namespace = _cache_namespace(path_and_query, payload, identity)
+    key = CacheKey(namespace=namespace, embedding=embed(model_path, user_content))
+    return key, cache.lookup(key)
+
+
 def parse_openai_request(body: bytes) -> ParsedOpenAIRequest:
     """Parse an incoming OpenAI request into the typed SDK structures."""
 
     try:
-        raw_json = body.decode("utf-8")
+        payload = json.loads(body)
     except UnicodeDecodeError as exc:  # pragma: no cover - defensive
         raise ValueError("Request body must be valid UTF-8") from exc
-
-    try:
-        payload = json.loads(raw_json)
     except json.JSONDecodeError as exc:
         raise ValueError("Request body must be valid JSON") from exc
 
@@ -122,14 +281,14 @@ def parse_openai_request(body: bytes) -> ParsedOpenAIRequest:
             raise ValueError("messages must be a non-empty list")
 
         if payload.get("stream"):
-            return cast(CompletionCreateParamsStreaming, payload)
-        return cast(CompletionCreateParamsNonStreaming, payload)
+            return cast("CompletionCreateParamsStreaming", payload)
+        return cast("CompletionCreateParamsNonStreaming", payload)
 
     if "input" in payload:
         _require_keys(payload, ["model", "input"])
         if payload.get("stream"):
-            return cast(ResponseCreateParamsStreaming, payload)
-        return cast(ResponseCreateParamsNonStreaming, payload)
+            return cast("ResponseCreateParamsStreaming", payload)
+        return cast("ResponseCreateParamsNonStreaming", payload)
 
     raise ValueError(
         "Unsupported OpenAI payload; expected chat completions or responses request"
@@ -149,27 +308,32 @@ def _apply_routing(
     path_and_query: str,
     ctx: RouterContext,
 ) -> tuple[bytes, CIMultiDict[str], str]:
-    """Update payload, headers, and upstream base according to the selected model."""
+    """Update payload, headers, and the request's upstream base according to the selected model.
 
-    new_headers = CIMultiDict(headers)
+    `headers` is modified in place and returned.
+    """
 
-    if model_ref.endpoint:
+    if model_ref.endpoints:
+        ctx.balancer = ctx.pool.balancer_for(model_ref)
+    elif model_ref.endpoint:
         ctx.upstream_base = model_ref.endpoint
 
     auth_header = _build_auth_header(model_ref)
     if auth_header:
         header_name, header_value = auth_header
-        new_headers[header_name] = header_value
+        headers[header_name] = header_value
 
-    updated_payload = _rewrite_model(parsed_request, model_ref.model)
-    rewritten_body = json.dumps(updated_payload).encode("utf-8")
+    rewritten_body = rewrite_model(body, cast(dict, parsed_request), model_ref.name)
+    if rewritten_body is not body:
+        # The client's length no longer matches; aiohttp sets it from the body.
+        headers.popall("Content-Length", None)
 
     rewritten_path = _rewrite_path(path_and_query, model_ref)
 
-    return rewritten_body, new_headers, rewritten_path
+    return rewritten_body, headers, rewritten_path
 
 
-def _build_auth_header(model_ref: ModelRef) -> tuple[str, str] | None:
+def _build_auth_header(model_ref: Model) -> tuple[str, str] | None:
     token = model_ref.access_key.strip()
     if token == "":
         return None
@@ -187,16 +351,7 @@ def _build_auth_header(model_ref: ModelRef) -> tuple[str, str] | None:
     return header_name, header_value
 
 
-def _rewrite_model(
-    parsed_request: ParsedOpenAIRequest, target_model: str
-) -> ParsedOpenAIRequest:
-    updated = copy.deepcopy(parsed_request)
-    if isinstance(updated, dict):
-        updated["model"] = target_model
-    return updated
-
-
-def _rewrite_path(current_path: str, model_ref: ModelRef) -> str:
+def _rewrite_path(current_path: str, model_ref: Model) -> str:
     # Placeholder to let us customize path by provider in the future.
     return current_path
 
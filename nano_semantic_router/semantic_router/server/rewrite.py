@@ -0,0 +1,111 @@
+import json
+from typing import Any
+
+_MODEL_KEY = b'"model"'
+_OPEN = frozenset(b"{[")
+_CLOSE = frozenset(b"}]")
+_WHITESPACE = frozenset(b" \t\r\n")
+_OBJECT, _COLON, _COMMA, _BACKSLASH = b"{:,\\"
+
+
+def rewrite_model(body: bytes, payload: dict[str, Any], target_model: str) -> bytes:
+    """Return `body` with its top-level "model" set to `target_model`.
+
+    Only the bytes of the old value are replaced; the rest of the body is
+    copied once by the splice, or not at all when the model already matches.
+    Bodies whose "model" is not a plain string literal fall back to a shallow
+    re-serialisation of `payload`.
+    """
+    if payload.get("model") == target_model:
+        return body
+
+    span = model_value_span(body)
+    if span is None:
+        return json.dumps({**payload, "model": target_model}).encode("utf-8")
+    start, end = span
+    view = memoryview(body)  # slices of a view do not copy
+    return b"".join(
+        (view[:start], json.dumps(target_model).encode("utf-8"), view[end:])
+    )
+
+
+def model_value_span(body: bytes) -> tuple[int, int] | None:
+    """Byte span of the string value of the top-level "model" key, if there is one.
+
+    Walks from quote to quote with `bytes.find`, so the contents of long
+    strings are skipped in C; only the short stretches between strings are
+    looked at byte by byte. Keys spelled with escapes are decoded before
+    comparing. A body with more than one "model" key has no span: parsers
+    disagree on which one wins, so it must be re-serialised.
+    """
+    span: tuple[int, int] | None = None
+    seen_model_key = False
+    depth = 0
+    expect_key = False  # the next string at depth 1 is a key
+    key_matched = False  # the current depth-1 key is "model"
+    after_colon = False  # the next token is a depth-1 value
+    pos = 0
+    while True:
+        quote = body.find(b'"', pos)
+        for char in body[pos : len(body) if quote == -1 else quote]:
+            if char in _OPEN:
+                if after_colon:
+                    key_matched = False  # "model" holds an object or array
+                depth += 1
+                expect_key = depth == 1 and char == _OBJECT
+                after_colon = False
+            elif char in _CLOSE:
+                depth -= 1
+                after_colon = False
+            elif char == _COLON:
+                after_colon = depth == 1
+            elif char == _COMMA:
+                expect_key = depth == 1
+                after_colon = False
+                if depth == 1:
+                    key_matched = False
+            elif char not in _WHITESPACE:
+                after_colon = False  # a number, true, false or null
+        if quote == -1:
+            return span
+
+        end = _string_end(body, quote)
+        if end == -1:
+            return None
+        if depth == 1 and expect_key:
+            key_matched = _is_model_key(body[quote:end])
+            if key_matched:
+                if seen_model_key:
+                    return None
+                seen_model_key = True
+            expect_key = False
+        elif after_colon and key_matched:
+            span = (quote, end)
+            key_matched = False
+        after_colon = False
+        pos = end
+
+
+def _is_model_key(key: bytes) -> bool:
+    if b"\\" not in key:
+        return key == _MODEL_KEY
+    # An escaped key such as "mod\u0065l" is still "model" to every parser.
+    try:
+        return json.loads(key) == "model"
+    except ValueError:
+        return False
+
+
+def _string_end(body: bytes, quote: int) -> int:
+    """Index just past the string literal opening at `quote`; -1 if unterminated."""
+    pos = quote + 1
+    while True:
+        pos = body.find(b'"', pos)
+        if pos == -1:
+            return -1
+        backslashes = 0
+        while body[pos - 1 - backslashes] == _BACKSLASH:
+            backslashes += 1
+        if backslashes % 2 == 0:
+            return pos + 1
+        pos += 1
@@ -1,4 +1,10 @@
-from nano_semantic_router.config.config import ModelRef, RouterConfig
+from nano_semantic_router.config.config import Model, RouterConfig
+from nano_semantic_router.semantic_router.cache.classification_cache import (
+    ClassificationCache,
+)
+from nano_semantic_router.semantic_router.cache.semantic_cache import SemanticCache
+from nano_semantic_router.semantic_router.classification.model_pool import model_pool
+from nano_semantic_router.semantic_router.decision.table import DecisionTable
 
 
 class Classifier:
@@ -6,23 +12,28 @@ class Classifier:
         pass
 
 
-class CacheBackend:
-    def __init__(self) -> None:
-        pass
-
-
 class Router:
     def __init__(self, config: RouterConfig | None = None) -> None:
         if config is None:
             config = RouterConfig(
-                default_model=ModelRef(
-                    model="gpt-4o-mini",
-                    endpoint="https://api.openai.com",
-                    access_key="",
-                    model_type="openai",
-                )
+                models={
+                    "gpt-4o-mini": Model(
+                        name="gpt-4o-mini",
+                        endpoint="https://api.openai.com",
+                        access_key="",
+                        model_type="openai",
+                        is_default=True,
+                    )
+                }
             )
 
         self.config = config
+        model_pool.configure(config)
         self.classifier = Classifier()
-        self.cache = CacheBackend()
+        self.decision_table = DecisionTable(config.decisions)
+        self.cache = SemanticCache(config.cache) if config.cache.enabled else None
+        self.classification_cache = (
+            ClassificationCache(config.classification_cache)
+            if config.classification_cache.enabled
+            else None
+        )
@@ -1,18 +1,41 @@
 import asyncio
+import hmac
+import time
 from dataclasses import dataclass
 from typing import Optional
 
-from aiohttp import ClientSession, ClientTimeout, TCPConnector, web
-from multidict import CIMultiDict
+from aiohttp import ClientError, ClientResponse, ClientTimeout, web
+from multidict import CIMultiDict, CIMultiDictProxy
 from yarl import URL
 
 import logging
+from nano_semantic_router.config.config import RouterConfig
+from nano_semantic_router.semantic_router.cache.semantic_cache import CachedResponse
+from nano_semantic_router.semantic_router.classification.batching import (
+    PromptBatcher,
+    batch_concurrency,
+    start_batchers,
+    stop_batchers,
+)
+from nano_semantic_router.semantic_router.classification.executor import (
+    ClassificationExecutor,
+    ClassifierOverloadedError,
+)
+from nano_semantic_router.semantic_router.classification.windowing import window_stats
+from nano_semantic_router.semantic_router.observability import LoopWatchdog, metrics
+from nano_semantic_router.semantic_router.observability.profiler import Profile
+from nano_semantic_router.semantic_router.observability.trace import (
+    log_trace,
+    timing_headers,
+)
 from nano_semantic_router.semantic_router.server.context import RouterContext
 from nano_semantic_router.semantic_router.server.process import (
     ProcessedRequest,
     process,
 )
 from nano_semantic_router.semantic_router.server.router import Router
+from nano_semantic_router.semantic_router.server.upstream import UpstreamPool
+from nano_semantic_router.semantic_router.signal.signal import preload_classifiers
 
 
 @dataclass
@@ -21,6 +44,67 @@ class Config:
     port: int = 8080
     secure: bool = False
     request_timeout: float = 30.0
+    # Upper bound on bytes buffered per upstream response before reads pause.
+    stream_read_bufsize: int = 2**16
+    # Limits for each per-endpoint connection pool; 0 means unlimited.
+    upstream_max_connections: int = 100
+    upstream_max_connections_per_host: int = 0
+    # Seconds to cache DNS lookups; 0 disables the cache.
+    upstream_dns_cache_ttl: int = 300
+    # Seconds an idle keep-alive connection is kept open.
+    upstream_keepalive_timeout: float = 15.0
+    # A model endpoint that fails this many requests in a row (5xx, connection
+    # error or timeout) gets no traffic for `upstream_eject_seconds`; 0 never
+    # ejects.
+    upstream_eject_failures: int = 3
+    upstream_eject_seconds: float = 10.0
+    # Number of worker processes sharing the port via SO_REUSEPORT.
+    workers: int = 1
+    # Load every classifier model instance, run a warmup inference on each and
+    # build embedding heads at startup, so the first requests do not pay for
+    # it. With workers the weights are loaded before forking so they share the
+    # pages copy-on-write, and each worker warms up after the fork. Warmup
+    # happens once the server is listening, and /readyz answers 503 until it
+    # is done. A failed preload is retried a few times with backoff, then the
+    # server shuts down and exits with an error.
+    preload_classifiers: bool = True
+    # Seconds in-flight requests get to finish after a shutdown signal.
+    shutdown_timeout: float = 30.0
+    # Classifications running at once, and how many more may wait for a slot
+    # before requests are rejected with 503. With micro-batching enabled on a
+    # classifier model, concurrency bounds how many prompts can share a batch,
+    # so it is raised to at least max_batch_size * instances of that model.
+    classifier_concurrency: int = 1
+    classifier_queue_size: int = 64
+    # Add Server-Timing and x-router-* headers to every response and log a
+    # trace record of the same breakdown for every request.
+    request_timing: bool = False
+    # Log the event loop's stack whenever it is blocked for longer than this
+    # many milliseconds, and export loop lag metrics; 0 disables the watchdog.
+    loop_block_threshold_ms: float = 100.0
+    # Bearer token for the /admin endpoints; they are not served when empty.
+    admin_token: str = ""
+
+
+# Headers describing the upstream framing; streamed and cached responses re-frame the body.
+_REFRAMED_DROP_HEADERS = (
+    "Content-Length",
+    "Content-Encoding",
+    "Transfer-Encoding",
+    "Connection",
+    "Keep-Alive",
+)
+
+
+# The only upstream headers stored with a cached response. Everything else
+# (cookies, request ids, rate-limit state) belongs to the request that
+# produced it and must not be replayed to other clients.
+_CACHED_HEADERS = ("Content-Type",)
+
+# Preload attempts before a server that cannot load its classifier models
+# gives up, and the wait before the first retry, doubled after each failure.
+_PRELOAD_ATTEMPTS = 3
+_PRELOAD_RETRY_SECONDS = 1.0
 
 
 class Server:
@@ -30,19 +114,36 @@ class Server:
         self.config = config or Config()
         self.router = router or Router()
         self._runner: Optional[web.AppRunner] = None
-        self._session: Optional[ClientSession] = None
+        self._pool: Optional[UpstreamPool] = None
+        self._classifier: Optional[ClassificationExecutor] = None
+        self._batchers: list[PromptBatcher] = []
+        self._stopped: Optional[asyncio.Event] = None
+        self._watchdog: Optional[LoopWatchdog] = None
+        self._profile: Optional[Profile] = None
+        self._not_ready = "starting"  # why /readyz fails; empty once ready
+        self._preload: Optional[asyncio.Task[None]] = None
+        self._preload_error: Optional[BaseException] = None
 
     async def start(self) -> None:
-        connector = TCPConnector(ssl=self.config.secure)
-        timeout = ClientTimeout(total=self.config.request_timeout)
-        self._session = ClientSession(connector=connector, timeout=timeout)
-        ctx = RouterContext(self.config.upstream_base, self._session)
+        self._pool = UpstreamPool(self.config, self.router.config.models)
+        self._classifier = ClassificationExecutor(
+            max_concurrency=_classifier_concurrency(self.config, self.router.config),
+            max_queue_size=self.config.classifier_queue_size,
+        )
+        self._batchers = start_batchers(self.router.config)
 
         app = web.Application()
-        app["ctx"] = ctx
+        # Registered before the catch-all so it is answered here, not proxied.
+        app.router.add_get("/metrics", self._handle_metrics)
+        app.router.add_get("/healthz", self._handle_healthz)
+        app.router.add_get("/readyz", self._handle_readyz)
+        if self.config.admin_token:
+            app.router.add_post("/admin/profile", self._handle_profile)
         app.router.add_route("*", "/{tail:.*}", self._handle_request)
+        if self.config.request_timing:
+            app.on_response_prepare.append(_add_timing_headers)
 
-        self._runner = web.AppRunner(app)
+        self._runner = web.AppRunner(app, shutdown_timeout=self.config.shutdown_timeout)
         await self._runner.setup()
 
         site = web.TCPSite(
@@ -50,6 +151,7 @@ class Server:
             host="0.0.0.0",
             port=self.config.port,
             ssl_context=None,
+            reuse_port=self.config.workers > 1,
         )
 
         logging.info(
@@ -59,60 +161,421 @@ class Server:
 
         await site.start()
         logging.info("Server started successfully.")
+        if self.config.preload_classifiers:
+            self._not_ready = "loading classifier models"
+            self._preload = asyncio.create_task(self._preload_classifiers())
+        else:
+            self._not_ready = ""
+        if self.config.loop_block_threshold_ms > 0:
+            self._watchdog = LoopWatchdog(self.config.loop_block_threshold_ms / 1000)
+            self._watchdog.start()
+        self._stopped = asyncio.Event()
         try:
-            await asyncio.Event().wait()
+            await self._stopped.wait()
         finally:
             await self.close()
+        if self._preload_error is not None:
+            raise RuntimeError(
+                "Classifier models failed to load"
+            ) from self._preload_error
+
+    def stop(self) -> None:
+        """Ask a running `start()` to stop accepting requests and shut down."""
+        self._not_ready = "shutting down"
+        if self._stopped is not None:
+            self._stopped.set()
 
     async def close(self) -> None:
+        self._not_ready = "shutting down"
+        if self._preload is not None:
+            # The thread loading models cannot be interrupted; it finishes on
+            # its own and the process exits after it.
+            self._preload.cancel()
+            self._preload = None
+        if self._watchdog is not None:
+            self._watchdog.stop()
+            self._watchdog = None
         if self._runner is not None:
             await self._runner.cleanup()
             self._runner = None
-        if self._session is not None and not self._session.closed:
-            await self._session.close()
-            self._session = None
+        if self._pool is not None:
+            await self._pool.close()
+            self._pool = None
+        if self._classifier is not None:
+            self._classifier.shutdown()
+            self._classifier = None
+        stop_batchers(self._batchers)
+        self._batchers = []
+        if self.router.classification_cache is not None:
+            self.router.classification_cache.close()
+
+    async def _preload_classifiers(self) -> None:
+        started = time.perf_counter()
+        delay = _PRELOAD_RETRY_SECONDS
+        for attempt in range(1, _PRELOAD_ATTEMPTS + 1):
+            try:
+                await asyncio.to_thread(preload_classifiers, self.router.config)
+                break
+            except Exception as err:  # noqa: BLE001
+                if attempt == _PRELOAD_ATTEMPTS:
+                    # Never becoming ready while /healthz passes would leave
+                    # the process up for good; exit so it gets restarted.
+                    logging.exception(
+                        f"Preloading classifier models failed {attempt} times; "
+                        "shutting down"
+                    )
+                    self._preload_error = err
+                    self.stop()
+                    return
+                logging.exception(
+                    f"Preloading classifier models failed; retrying in {delay:g}s"
+                )
+                self._not_ready = "classifier models failed to load, retrying"
+                await asyncio.sleep(delay)
+                delay *= 2
+                if self._not_ready != "classifier models failed to load, retrying":
+                    return  # shutting down
+                self._not_ready = "loading classifier models"
+        logging.info(f"Classifier models ready in {time.perf_counter() - started:.2f}s")
+        if self._not_ready == "loading classifier models":
+            self._not_ready = ""
+
+    async def _handle_healthz(self, request: web.Request) -> web.Response:
+        """Liveness: the process is up and its event loop answers."""
+        return web.Response(text="ok\n")
 
-    async def _handle_request(self, request: web.Request) -> web.Response:
-        ctx: RouterContext = request.app["ctx"]
+    async def _handle_readyz(self, request: web.Request) -> web.Response:
+        """Readiness: classifier models are loaded and the server is not draining."""
+        if self._not_ready:
+            return web.Response(status=503, text=f"not ready: {self._not_ready}\n")
+        return web.Response(text="ready\n")
+
+    async def _handle_request(self, request: web.Request) -> web.StreamResponse:
+        assert self._pool is not None, "Upstream pool should be initialized"
+        assert self._classifier is not None, "Classifier should be initialized"
+        # process function may modify the request.
+        ctx = RouterContext(
+            upstream_base=self.config.upstream_base,
+            pool=self._pool,
+            classifier=self._classifier,
+            original_request=request.clone(),
+            cache=self.router.cache,
+            classification_cache=self.router.classification_cache,
+            decision_table=self.router.decision_table,
+        )
+        if self.config.request_timing:
+            request[_CONTEXT_KEY] = ctx
+        started = time.perf_counter()
+        response: web.StreamResponse | None = None
+        try:
+            response = await self._route(request, ctx)
+            return response
+        finally:
+            ctx.timings["total"] = time.perf_counter() - started
+            _record_metrics(ctx)
+            if self._profile is not None:
+                self._profile.request_done()
+            if self.config.request_timing:
+                log_trace(
+                    ctx,
+                    request.method,
+                    request.rel_url.path,
+                    request.headers.get("x-request-id", ""),
+                    response.status if response is not None else 500,
+                )
+
+    async def _route(
+        self, request: web.Request, ctx: RouterContext
+    ) -> web.StreamResponse:
         try:
-            # process function may modify the request.
-            ctx.original_request = request.clone()
             processed = await process(request, self.router.config, ctx)
+        except ClassifierOverloadedError as err:
+            logging.warning(f"rejecting request: {err}")
+            return web.Response(status=503, text="Service Unavailable")
         except Exception as err:  # noqa: BLE001
             logging.error(f"processing error: {err}")
             return web.Response(status=500, text="Bad Gateway")
 
+        if processed.cached is not None:
+            return web.Response(
+                status=processed.cached.status,
+                headers=processed.cached.headers,
+                body=processed.cached.body,
+            )
+
         try:
-            return await self.proxy_to_upstream(processed, ctx)
+            return await self.proxy_to_upstream(request, processed, ctx)
         except Exception as err:  # noqa: BLE001
-            print(f"router proxy error: {err}")
+            logging.error(f"router proxy error: {err}")
             return web.Response(status=502, text="Bad Gateway")
 
     async def proxy_to_upstream(
-        self, processed: ProcessedRequest, ctx: RouterContext
-    ) -> web.Response:
+        self, request: web.Request, processed: ProcessedRequest, ctx: RouterContext
+    ) -> web.StreamResponse:
+        if ctx.balancer is None:
+            return await self._send_upstream(request, processed, ctx)
+
+        endpoint = ctx.balancer.pick()
+        ctx.upstream_base = endpoint.url
+        try:
+            return await self._send_upstream(request, processed, ctx)
+        finally:
+            # Only the upstream's answer counts towards its health: an error
+            # after the headers arrived is as likely the client going away.
+            ttfb = ctx.timings.get("upstream_ttfb")
+            failed = ttfb is None or ctx.upstream_status >= 500
+            ctx.balancer.release(endpoint, ttfb, failed)
+
+    async def _send_upstream(
+        self, request: web.Request, processed: ProcessedRequest, ctx: RouterContext
+    ) -> web.StreamResponse:
         target_base = URL(ctx.upstream_base)
         target = target_base.join(URL(processed.path_and_query))
 
-        headers = CIMultiDict(processed.headers)
+        # `process` built these headers for this request alone; no copy needed.
+        headers = processed.headers
         if target.host:
             authority = target.host
             if target.port:
                 authority = f"{authority}:{target.port}"
             headers["Host"] = authority
 
-        assert self._session is not None, "Client session should be initialized"
+        request_kwargs = {}
+        if processed.stream:
+            # A generation may legitimately outlive the total timeout; only bound
+            # the gap between chunks.
+            request_kwargs["timeout"] = ClientTimeout(
+                total=None, sock_read=self.config.request_timeout
+            )
 
-        async with ctx.client.request(
+        client = ctx.pool.session_for(ctx.upstream_base)
+        started = time.perf_counter()
+        async with client.request(
             processed.method,
             target,
             data=processed.body,
             headers=headers,
+            **request_kwargs,
         ) as upstream_resp:
+            ctx.timings["upstream_ttfb"] = time.perf_counter() - started
+            ctx.upstream_status = upstream_resp.status
+            metrics.upstream_responses_total.inc(status=str(upstream_resp.status))
+            if processed.stream or _is_event_stream(upstream_resp):
+                return await self._stream_response(request, upstream_resp)
+
             body = await upstream_resp.read()
             response_headers = CIMultiDict(upstream_resp.headers)
+            if (
+                ctx.cache is not None
+                and ctx.cache_key is not None
+                and upstream_resp.status == 200
+            ):
+                ctx.cache.store(
+                    ctx.cache_key,
+                    CachedResponse(
+                        status=upstream_resp.status,
+                        headers=_cached_headers(upstream_resp.headers),
+                        body=body,
+                    ),
+                )
             return web.Response(
                 status=upstream_resp.status,
                 headers=response_headers,
                 body=body,
             )
+
+    async def _handle_metrics(self, request: web.Request) -> web.Response:
+        queue_depth = metrics.Gauge(
+            "router_classifier_queue_depth", "Classifier calls waiting for a slot."
+        )
+        in_flight = metrics.Gauge(
+            "router_classifier_in_flight", "Classifier calls running."
+        )
+        rejected = metrics.Gauge(
+            "router_classifier_rejected_total",
+            "Classifier calls rejected because the queue was full.",
+            metric_type="counter",
+        )
+        coalesced = metrics.Gauge(
+            "router_classifier_coalesced_total",
+            "Classifier calls answered by an identical call in flight.",
+            metric_type="counter",
+        )
+        if self._classifier is not None:
+            stats = self._classifier.stats
+            queue_depth.set(stats.queue_depth)
+            in_flight.set(stats.in_flight)
+            rejected.set(stats.rejected)
+            coalesced.set(stats.coalesced)
+
+        windowed = metrics.Gauge(
+            "router_window_checked_total",
+            "Texts checked against a signal's token budget.",
+            metric_type="counter",
+        )
+        truncated = metrics.Gauge(
+            "router_window_truncated_total",
+            "Texts cut down to a signal's token budget.",
+            metric_type="counter",
+        )
+        for signal, window in window_stats().items():
+            windowed.set(window.windowed, signal=signal)
+            truncated.set(window.truncated, signal=signal)
+
+        ready = metrics.Gauge(
+            "router_ready", "1 once classifier models are loaded, as /readyz."
+        )
+        ready.set(0 if self._not_ready else 1)
+
+        gauges = [
+            queue_depth,
+            in_flight,
+            rejected,
+            coalesced,
+            windowed,
+            truncated,
+            ready,
+        ]
+        if self._pool is not None:
+            gauges.extend(self._pool.gauges())
+        if self._watchdog is not None:
+            gauges.extend(self._watchdog.gauges())
+        body = metrics.render(gauges)
+        return web.Response(
+            text=body, content_type="text/plain", headers={"Cache-Control": "no-store"}
+        )
+
+    async def _handle_profile(self, request: web.Request) -> web.Response:
+        """Profile the live server and return the result.
+
+        Query parameters: mode=sample (collapsed stacks, the default) or
+        deterministic (pstats); seconds=N (default 10, at most 300);
+        requests=N to stop early once N proxied requests have finished;
+        format=pstats (binary, the default for deterministic) or text.
+        """
+        expected = f"Bearer {self.config.admin_token}"
+        supplied = request.headers.get("Authorization", "")
+        if not hmac.compare_digest(supplied.encode(), expected.encode()):
+            return web.Response(status=401, text="Unauthorized")
+        if self._profile is not None:
+            return web.Response(status=409, text="A profile is already running")
+
+        query = request.query
+        try:
+            profile = Profile(
+                mode=query.get("mode", "sample"),
+                seconds=min(float(query.get("seconds", 10)), _MAX_PROFILE_SECONDS),
+                requests=int(query.get("requests", 0)),
+            )
+        except ValueError as err:
+            return web.Response(status=400, text=str(err))
+
+        logging.info(
+            f"Profiling ({profile.mode}) for up to {profile.seconds:g}s"
+            + (f" or {profile.requests} requests" if profile.requests else "")
+        )
+        self._profile = profile
+        try:
+            await profile.collect()
+        except ValueError as err:  # another profiler holds the interpreter hook
+            return web.Response(status=409, text=str(err))
+        finally:
+            self._profile = None
+
+        if profile.mode == "sample":
+            return web.Response(text=profile.collapsed(), content_type="text/plain")
+        if query.get("format") == "text":
+            return web.Response(text=profile.pstats_text(), content_type="text/plain")
+        return web.Response(
+            body=profile.pstats_dump(),
+            content_type="application/octet-stream",
+            headers={"Content-Disposition": 'attachment; filename="router.prof"'},
+        )
+
+    async def _stream_response(
+        self, request: web.Request, upstream_resp: ClientResponse
+    ) -> web.StreamResponse:
+        """Forward upstream chunks to the client as soon as they arrive.
+
+        Buffering is bounded by the session's ``read_bufsize``: once it fills, aiohttp
+        stops reading from the upstream socket until ``write`` has drained the
+        client side, so a slow client applies backpressure to the upstream.
+        """
+
+        response = web.StreamResponse(
+            status=upstream_resp.status,
+            headers=_reframed_headers(upstream_resp.headers),
+        )
+        await response.prepare(request)
+
+        try:
+            async for chunk in upstream_resp.content.iter_any():
+                await response.write(chunk)
+        except ConnectionResetError:
+            # Client went away; leaving the context manager closes the upstream
+            # connection so the generation is not read to the end.
+            logging.info("client disconnected while streaming upstream response")
+            return response
+        except (ClientError, asyncio.TimeoutError) as err:
+            # Headers are already sent, so the best we can do is end the stream.
+            logging.warning(f"upstream stream interrupted: {err!r}")
+
+        await response.write_eof()
+        return response
+
+
+_CONTEXT_KEY = "router_context"
+_MAX_PROFILE_SECONDS = 300.0
+
+
+async def _add_timing_headers(
+    request: web.Request, response: web.StreamResponse
+) -> None:
+    """Called by aiohttp just before a response's headers are sent."""
+    ctx = request.get(_CONTEXT_KEY)
+    if ctx is None:
+        return
+    headers = timing_headers(ctx)
+    upstream_timing = response.headers.get("Server-Timing")
+    if upstream_timing:
+        headers["Server-Timing"] = f"{upstream_timing}, {headers['Server-Timing']}"
+    response.headers.update(headers)
+
+
+def _record_metrics(ctx: RouterContext) -> None:
+    for stage, seconds in ctx.timings.items():
+        metrics.stage_seconds.observe(seconds, stage=stage)
+    if ctx.target_model:
+        metrics.decisions_total.inc(
+            decision=ctx.decision or "none", model=ctx.target_model
+        )
+
+
+def _classifier_concurrency(config: Config, router_config: RouterConfig) -> int:
+    concurrency = config.classifier_concurrency
+    needed = batch_concurrency(router_config)
+    if needed > concurrency:
+        # With fewer calls in flight than a batch holds, batches never fill.
+        logging.info(
+            f"Raising classifier concurrency from {concurrency} to {needed} "
+            "so classifier batches can fill"
+        )
+        return needed
+    return concurrency
+
+
+def _is_event_stream(upstream_resp: ClientResponse) -> bool:
+    return upstream_resp.content_type == "text/event-stream"
+
+
+def _cached_headers(headers: CIMultiDictProxy[str]) -> CIMultiDict[str]:
+    return CIMultiDict(
+        (name, value) for name in _CACHED_HEADERS for value in headers.getall(name, ())
+    )
+
+
+def _reframed_headers(headers: CIMultiDictProxy[str]) -> CIMultiDict[str]:
+    reframed = CIMultiDict(headers)
+    for name in _REFRAMED_DROP_HEADERS:
+        reframed.popall(name, None)
+    return reframed
@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import logging
+import time
+from typing import TYPE_CHECKING
+
+from aiohttp import ClientSession, ClientTimeout, TCPConnector
+from yarl import URL
+
+from nano_semantic_router.semantic_router.observability.metrics import Gauge
+from nano_semantic_router.semantic_router.server.balancer import EndpointBalancer
+
+if TYPE_CHECKING:
+    from nano_semantic_router.config.config import Model
+    from nano_semantic_router.semantic_router.server.server import Config
+
+
+class UpstreamPool:
+    """Keep-alive client sessions keyed by upstream origin.
+
+    Every endpoint gets its own connector, so a provider that saturates its
+    connection limit cannot starve requests routed to another one. Models
+    served by several endpoints get an `EndpointBalancer` each.
+    """
+
+    def __init__(self, config: Config, models: dict[str, Model] | None = None) -> None:
+        self.config = config
+        self._sessions: dict[str, ClientSession] = {}
+        # Keyed by `Model.name`, which routing knows the target by; the keys
+        # of `models` are config refs and may differ from it.
+        self._balancers: dict[str, EndpointBalancer] = {}
+        for model in (models or {}).values():
+            if not model.endpoints:
+                continue
+            if model.name in self._balancers:
+                raise ValueError(
+                    f"models with endpoints need distinct names: {model.name}"
+                )
+            self._balancers[model.name] = EndpointBalancer(
+                model, config.upstream_eject_failures, config.upstream_eject_seconds
+            )
+
+    def balancer_for(self, model: Model) -> EndpointBalancer:
+        """The balancer of a model configured with `endpoints`."""
+        balancer = self._balancers.get(model.name)
+        if balancer is None:
+            raise ValueError(f"no balancer for the endpoints of model {model.name}")
+        return balancer
+
+    def session_for(self, upstream_base: str) -> ClientSession:
+        key = _pool_key(upstream_base)
+        session = self._sessions.get(key)
+        if session is None or session.closed:
+            session = self._new_session()
+            self._sessions[key] = session
+            logging.info(f"Opened upstream connection pool for {key}")
+        return session
+
+    def gauges(self) -> list[Gauge]:
+        """Load and health of every balanced model endpoint."""
+        if not self._balancers:
+            return []
+        outstanding = Gauge(
+            "router_upstream_endpoint_outstanding",
+            "Requests in flight to a model endpoint.",
+        )
+        latency = Gauge(
+            "router_upstream_endpoint_latency_seconds",
+            "Decaying peak EWMA of a model endpoint's time to response headers.",
+        )
+        ejected = Gauge(
+            "router_upstream_endpoint_ejected",
+            "1 while a model endpoint is out of rotation after failures.",
+        )
+        ejections = Gauge(
+            "router_upstream_endpoint_ejections_total",
+            "Times a model endpoint was taken out of rotation.",
+            metric_type="counter",
+        )
+        now = time.monotonic()
+        for balancer in self._balancers.values():
+            for endpoint in balancer.endpoints:
+                labels = {"model": balancer.model, "endpoint": endpoint.url}
+                outstanding.set(endpoint.outstanding, **labels)
+                latency.set(endpoint.decayed_latency(now), **labels)
+                ejected.set(1 if endpoint.ejected_until > now else 0, **labels)
+                ejections.set(endpoint.ejections, **labels)
+        return [outstanding, latency, ejected, ejections]
+
+    async def close(self) -> None:
+        sessions, self._sessions = self._sessions, {}
+        for session in sessions.values():
+            if not session.closed:
+                await session.close()
+
+    def _new_session(self) -> ClientSession:
+        connector = TCPConnector(
+            ssl=self.config.secure,
+            limit=self.config.upstream_max_connections,
+            limit_per_host=self.config.upstream_max_connections_per_host,
+            use_dns_cache=self.config.upstream_dns_cache_ttl > 0,
+            ttl_dns_cache=self.config.upstream_dns_cache_ttl or None,
+            keepalive_timeout=self.config.upstream_keepalive_timeout,
+        )
+        timeout = ClientTimeout(total=self.config.request_timeout)
+        return ClientSession(
+            connector=connector,
+            timeout=timeout,
+            read_bufsize=self.config.stream_read_bufsize,
+        )
+
+
+def _pool_key(upstream_base: str) -> str:
+    # Scheme, host and port identify a connection; paths share the same pool.
+    return str(URL(upstream_base).origin())
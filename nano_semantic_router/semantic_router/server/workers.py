@@ -0,0 +1,130 @@
+import asyncio
+import logging
+import os
+import signal
+import time
+
+from nano_semantic_router.semantic_router.server.router import Router
+from nano_semantic_router.semantic_router.server.server import Config, Server
+from nano_semantic_router.semantic_router.signal.signal import preload_classifiers
+
+# A worker that dies sooner than this after starting is treated as crash-looping.
+_MIN_WORKER_UPTIME = 1.0
+_MAX_RESTART_BACKOFF = 30.0
+
+
+def serve(config: Config, router: Router | None = None) -> None:
+    """Run the router in this process, or fork `config.workers` processes."""
+    router = router or Router()
+    if config.workers <= 1:
+        # The server preloads classifiers itself once it is listening, so
+        # /healthz answers while /readyz waits for the models.
+        asyncio.run(_run_server(config, router))
+        return
+    Supervisor(config, router).run()
+
+
+class Supervisor:
+    """Fork worker processes that share the listening port and keep them alive.
+
+    Every worker runs its own event loop and `web.TCPSite` bound with
+    SO_REUSEPORT, so the kernel spreads connections across processes. A worker
+    that exits unexpectedly is restarted; SIGTERM/SIGINT are forwarded to all
+    workers, which drain in-flight requests before exiting.
+    """
+
+    def __init__(self, config: Config, router: Router) -> None:
+        self.config = config
+        self.router = router
+        self._workers: dict[int, float] = {}  # pid -> start time
+        self._backoff = 0.0
+        self._stopping = False
+
+    def run(self) -> None:
+        if self.config.preload_classifiers:
+            # Weights only: no inference may run before fork (see
+            # ModelPool.preload). Each worker warms up after forking.
+            logging.info("Loading classifier weights before fork")
+            preload_classifiers(self.router.config, warm_up=False)
+
+        signal.signal(signal.SIGTERM, self._request_stop)
+        signal.signal(signal.SIGINT, self._request_stop)
+
+        logging.info(
+            f"Starting {self.config.workers} workers on port {self.config.port}"
+        )
+        for _ in range(self.config.workers):
+            self._spawn()
+
+        while self._workers:
+            pid, status = os.waitpid(-1, os.WNOHANG)
+            if pid == 0:
+                time.sleep(0.2)
+                continue
+            started = self._workers.pop(pid, None)
+            if started is None:
+                continue
+            if self._stopping:
+                continue
+            logging.warning(
+                f"Worker {pid} exited with status {os.waitstatus_to_exitcode(status)}; restarting"
+            )
+            self._throttle(time.monotonic() - started)
+            self._spawn()
+
+        signal.alarm(0)
+        logging.info("All workers stopped.")
+
+    def _spawn(self) -> None:
+        pid = os.fork()
+        if pid == 0:
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            code = 0
+            try:
+                asyncio.run(_run_server(self.config, self.router))
+            except BaseException:  # noqa: BLE001
+                logging.exception("Worker crashed")
+                code = 1
+            finally:
+                os._exit(code)
+        self._workers[pid] = time.monotonic()
+        logging.info(f"Started worker {pid}")
+
+    def _throttle(self, uptime: float) -> None:
+        if uptime >= _MIN_WORKER_UPTIME:
+            self._backoff = 0.0
+            return
+        self._backoff = min(max(self._backoff * 2, 0.5), _MAX_RESTART_BACKOFF)
+        logging.warning(f"Worker crash-looping; waiting {self._backoff:.1f}s")
+        time.sleep(self._backoff)
+
+    def _request_stop(self, signum: int, frame: object) -> None:
+        if self._stopping:
+            return
+        self._stopping = True
+        logging.info(f"Received signal {signum}; stopping workers")
+        for pid in list(self._workers):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        deadline = self.config.shutdown_timeout + 5.0
+        signal.signal(signal.SIGALRM, self._kill_stragglers)
+        signal.alarm(int(deadline))
+
+    def _kill_stragglers(self, signum: int, frame: object) -> None:
+        for pid in list(self._workers):
+            logging.warning(f"Worker {pid} did not stop in time; killing it")
+            try:
+                os.kill(pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+
+
+async def _run_server(config: Config, router: Router) -> None:
+    server = Server(config, router)
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(signum, server.stop)
+    await server.start()
@@ -0,0 +1,160 @@
+import logging
+import threading
+import time
+from dataclasses import dataclass
+
+from nano_semantic_router.config.config import (
+    ClassifierType,
+    RouterConfig,
+    SignalConfig,
+    UseCaseScoring,
+    UseCaseSignalConfig,
+)
+from nano_semantic_router.semantic_router.cache.classification_cache import (
+    ClassificationCache,
+)
+from nano_semantic_router.semantic_router.classification.executor import (
+    ClassificationExecutor,
+)
+from nano_semantic_router.semantic_router.decision.table import DecisionTable
+from nano_semantic_router.semantic_router.signal.signal import (
+    Signal,
+    SignalGroup,
+    is_combinable,
+    in_config_order,
+    compute_signal_group,
+    group_key,
+    group_signals_by_model,
+)
+
+# Seconds a classification is assumed to take before one has been measured.
+_EMBEDDING_PRIOR = 0.005
+_LOGPROB_PRIOR = 0.05
+_GENERATE_PRIOR = 0.2
+_COST_SMOOTHING = 0.2
+
+_unit_costs: dict[tuple[str, tuple[int, ...]], float] = {}
+_unit_costs_guard = threading.Lock()
+
+
+@dataclass
+class _Unit:
+    """Signals that cost one classifier call: a single signal or one combined prompt."""
+
+    group: SignalGroup
+    key: tuple[str, tuple[int, ...]]
+
+
+async def get_signals_lazily(
+    active_signals: list[SignalConfig],
+    user_content: str,
+    router_config: RouterConfig,
+    executor: ClassificationExecutor,
+    table: DecisionTable,
+    cache: ClassificationCache | None = None,
+    timings: dict[str, float] | None = None,
+) -> list[Signal]:
+    """Compute only the signals that can still change the routing decision.
+
+    Classifier calls run one at a time, cheapest first by measured latency.
+    After each one the decision table reports which signal types could still
+    change the winner; signals of other types are never computed. `timings`,
+    if given, receives the seconds each classified signal took.
+    """
+    units = _units(active_signals, router_config)
+    results: dict[int, Signal | None] = {}
+    while units:
+        pending = [
+            signal.signal_type for unit in units for _, signal in unit.group.signals
+        ]
+        computed = [signal for signal in results.values() if signal is not None]
+        open_types = table.open_signal_types(computed, pending)
+        runnable = [
+            unit
+            for unit in units
+            if any(signal.signal_type in open_types for _, signal in unit.group.signals)
+        ]
+        if not runnable:
+            break
+
+        unit = min(runnable, key=_expected_cost)
+        units.remove(unit)
+        partial, unit_timings, elapsed = await executor.run_shared(
+            group_key(_timed_group, unit.group, user_content),
+            _timed_group,
+            unit.group,
+            user_content,
+            cache,
+        )
+        _record_cost(unit, elapsed)
+        results.update(partial)
+        if timings is not None:
+            for name, seconds in unit_timings.items():
+                timings[name] = timings.get(name, 0.0) + seconds
+
+    skipped = len(active_signals) - len(results)
+    if skipped:
+        logging.info(f"Skipped {skipped} signals that could not change the decision")
+    return in_config_order(results)
+
+
+def _units(
+    active_signals: list[SignalConfig], router_config: RouterConfig
+) -> list[_Unit]:
+    units: list[_Unit] = []
+    for group in group_signals_by_model(active_signals, router_config):
+        combined = [item for item in group.signals if is_combinable(item[1])]
+        if not group.model.combine_signals or len(combined) < 2:
+            combined = []
+        if combined:
+            units.append(_unit(group, combined))
+        for item in group.signals:
+            if item not in combined:
+                units.append(_unit(group, [item]))
+    return units
+
+
+def _unit(group: SignalGroup, signals: list[tuple[int, SignalConfig]]) -> _Unit:
+    return _Unit(
+        group=SignalGroup(model=group.model, signals=signals),
+        key=(group.model.path, tuple(index for index, _ in signals)),
+    )
+
+
+def _prior(signal: SignalConfig) -> float:
+    if signal.classifier.classifier_type == ClassifierType.EMBEDDING:
+        return _EMBEDDING_PRIOR
+    if (
+        isinstance(signal, UseCaseSignalConfig)
+        and signal.scoring == UseCaseScoring.LOGPROB
+    ):
+        return _LOGPROB_PRIOR
+    return _GENERATE_PRIOR
+
+
+def _expected_cost(unit: _Unit) -> float:
+    with _unit_costs_guard:
+        cost = _unit_costs.get(unit.key)
+    if cost is None:
+        # A combined prompt costs about as much as its most expensive signal.
+        cost = max(_prior(signal) for _, signal in unit.group.signals)
+    return cost
+
+
+def _record_cost(unit: _Unit, elapsed: float) -> None:
+    with _unit_costs_guard:
+        previous = _unit_costs.get(unit.key)
+        _unit_costs[unit.key] = (
+            elapsed
+            if previous is None
+            else previous + _COST_SMOOTHING * (elapsed - previous)
+        )
+
+
+def _timed_group(
+    group: SignalGroup, user_content: str, cache: ClassificationCache | None
+) -> tuple[dict[int, Signal | None], dict[str, float], float]:
+    start = time.perf_counter()
+    timings: dict[str, float] = {}
+    partial = compute_signal_group(group, user_content, cache, timings)
+    return partial, timings, time.perf_counter() - start
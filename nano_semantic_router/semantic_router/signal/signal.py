@@ -1,22 +1,57 @@
+import asyncio
+import json
+import time
+from typing import Any, Callable, Hashable
+
 from nano_semantic_router.config.config import (
+    ClassifierType,
     Condition,
+    Model,
     RouterConfig,
     SignalConfig,
     ComplexitySignalConfig,
     SignalOperator,
     UseCaseSignalConfig,
+    UseCaseScoring,
     SignalType,
 )
 import logging
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
 from nano_semantic_router.config.utils import get_model_by_ref
+from nano_semantic_router.semantic_router.cache.classification_cache import (
+    ClassificationCache,
+    classification_cache_key,
+)
+from nano_semantic_router.semantic_router.classification.base_classifier import (
+    ClassificationOutput,
+)
+from nano_semantic_router.semantic_router.classification.embedding_classifier import (
+    compute_embedding_complexity_signal,
+    compute_embedding_use_case_signal,
+    get_anchor_head,
+    get_centroid_head,
+)
+from nano_semantic_router.semantic_router.classification.executor import (
+    ClassificationExecutor,
+)
+from nano_semantic_router.semantic_router.classification.model_pool import model_pool
+from nano_semantic_router.semantic_router.classification.multi_signal_classifier import (
+    SignalField,
+    compute_multi_signal,
+)
 from nano_semantic_router.semantic_router.classification.use_case_classifier import (
+    UseCaseSignalOutput,
     compute_use_case_signal,
 )
 from nano_semantic_router.semantic_router.classification.complexity_classifier import (
+    ComplexitySignalOutput,
     compute_complexity_signal,
 )
+from nano_semantic_router.semantic_router.classification.windowing import (
+    window_content,
+)
+from nano_semantic_router.semantic_router.observability.metrics import signal_seconds
 
 
 @dataclass
@@ -48,43 +83,335 @@ def get_signals_from_content(
     active_signals: list[SignalConfig], user_content: str, router_config: RouterConfig
 ) -> list[Signal]:
     """Return a list of matched signals."""
-    signal_analysis_result = []
     if not active_signals:
         logging.warning("No active signals configured; returning empty signal set.")
         return []
 
-    for signal in active_signals:
-        classifier_model_path = get_model_by_ref(
-            signal.classifier.model_ref, router_config
-        ).path
-        if isinstance(signal, ComplexitySignalConfig):
-            complexity_score = compute_complexity_signal(
-                model_path=classifier_model_path,
-                user_content=user_content,
+    results: dict[int, Signal | None] = {}
+    for group in group_signals_by_model(active_signals, router_config):
+        results.update(compute_signal_group(group, user_content))
+    return in_config_order(results)
+
+
+async def get_signals_concurrently(
+    active_signals: list[SignalConfig],
+    user_content: str,
+    router_config: RouterConfig,
+    executor: ClassificationExecutor,
+    cache: ClassificationCache | None = None,
+    timings: dict[str, float] | None = None,
+) -> list[Signal]:
+    """Like `get_signals_from_content`, but each classifier model runs as its own executor job.
+
+    `timings`, if given, receives the seconds each classified signal took.
+    """
+    if not active_signals:
+        logging.warning("No active signals configured; returning empty signal set.")
+        return []
+
+    groups = group_signals_by_model(active_signals, router_config)
+    partials = await asyncio.gather(
+        *(
+            executor.run_shared(
+                group_key(_timed_group, group, user_content),
+                _timed_group,
+                group,
+                user_content,
+                cache,
+            )
+            for group in groups
+        )
+    )
+    results: dict[int, Signal | None] = {}
+    for partial, group_timings in partials:
+        results.update(partial)
+        if timings is not None:
+            for name, seconds in group_timings.items():
+                timings[name] = timings.get(name, 0.0) + seconds
+    return in_config_order(results)
+
+
+@dataclass
+class SignalGroup:
+    """Signals answered by the same classifier model, with their position in the config."""
+
+    model: Model
+    signals: list[tuple[int, SignalConfig]] = field(default_factory=list)
+
+
+def group_key(
+    fn: Callable[..., Any], group: SignalGroup, user_content: str
+) -> Hashable:
+    """Key under which identical classifications of a group share one executor call.
+
+    Signal configs live as long as the router, so their identity stands in
+    for their contents. The function itself is part of the key: helpers in
+    different modules share a name but not a return shape.
+    """
+    return (
+        fn,
+        group.model.path,
+        tuple(id(signal) for _, signal in group.signals),
+        user_content,
+    )
+
+
+def group_signals_by_model(
+    active_signals: list[SignalConfig], router_config: RouterConfig
+) -> list[SignalGroup]:
+    groups: dict[str, SignalGroup] = {}
+    for index, signal in enumerate(active_signals):
+        model = get_model_by_ref(signal.classifier.model_ref, router_config)
+        group = groups.setdefault(model.path, SignalGroup(model=model))
+        group.signals.append((index, signal))
+    return list(groups.values())
+
+
+def _timed_group(
+    group: SignalGroup, user_content: str, cache: ClassificationCache | None
+) -> tuple[dict[int, Signal | None], dict[str, float]]:
+    timings: dict[str, float] = {}
+    return compute_signal_group(group, user_content, cache, timings), timings
+
+
+def compute_signal_group(
+    group: SignalGroup,
+    user_content: str,
+    cache: ClassificationCache | None = None,
+    timings: dict[str, float] | None = None,
+) -> dict[int, Signal | None]:
+    """Classify every signal of a group, with one combined prompt when the model allows it.
+
+    With a cache, only signals whose output is not cached reach the model.
+    Their classification times are added to `timings` by signal type, or
+    under "combined" for a shared prompt.
+    """
+    combinable = [
+        (index, signal) for index, signal in group.signals if is_combinable(signal)
+    ]
+    combined = group.model.combine_signals and len(combinable) >= 2
+    mode = "combined" if combined else "single"
+
+    results: dict[int, Signal | None] = {}
+    keys: dict[int, str] = {}
+    misses: list[tuple[int, SignalConfig]] = []
+    for index, signal in group.signals:
+        if cache is not None:
+            keys[index] = _cache_key(signal, group.model.path, user_content, mode)
+            output = cache.get(keys[index])
+            if output is not None:
+                results[index] = _to_signal(signal, output)
+                continue
+        misses.append((index, signal))
+
+    pending = [item for item in misses if item in combinable] if combined else []
+    for index, signal in misses:
+        if (index, signal) in pending:
+            continue
+        started = time.perf_counter()
+        output = compute_signal_output(signal, group.model.path, user_content)
+        _record_time(timings, str(signal.signal_type), started)
+        if output is not None and cache is not None:
+            cache.put(keys[index], output)
+        results[index] = _to_signal(signal, output) if output is not None else None
+
+    if pending:
+        fields = _signal_fields([signal for _, signal in pending])
+        # One prompt serves every pending signal, so it gets the tightest budget.
+        tightest = min(
+            (signal for _, signal in pending),
+            key=lambda signal: signal.max_content_tokens or float("inf"),
+        )
+        started = time.perf_counter()
+        content = windowed_content(tightest, group.model.path, user_content)
+        outputs = compute_multi_signal(group.model.path, fields, content)
+        _record_time(timings, "combined", started)
+        logging.info(f"Computed combined signals: {outputs}")
+        for (index, signal), output in zip(pending, outputs):
+            if cache is not None:
+                cache.put(keys[index], output)
+            results[index] = _to_signal(signal, output)
+    return results
+
+
+def _record_time(timings: dict[str, float] | None, name: str, started: float) -> None:
+    elapsed = time.perf_counter() - started
+    signal_seconds.observe(elapsed, signal=name)
+    if timings is not None:
+        timings[name] = timings.get(name, 0.0) + elapsed
+
+
+def compute_signal(
+    signal: SignalConfig, model_path: str, user_content: str
+) -> Signal | None:
+    """Classify a single signal; None if it is unknown or below its confidence threshold."""
+    output = compute_signal_output(signal, model_path, user_content)
+    if output is None:
+        return None
+    return _to_signal(signal, output)
+
+
+def compute_signal_output(
+    signal: SignalConfig, model_path: str, user_content: str
+) -> ClassificationOutput | None:
+    """Run the classifier for a single signal; None if the signal type is unknown."""
+    user_content = windowed_content(signal, model_path, user_content)
+    if signal.classifier.classifier_type == ClassifierType.EMBEDDING:
+        return _compute_embedding_output(signal, model_path, user_content)
+    if isinstance(signal, ComplexitySignalConfig):
+        return compute_complexity_signal(
+            model_path=model_path,
+            user_content=user_content,
+        )
+    if isinstance(signal, UseCaseSignalConfig):
+        output = compute_use_case_signal(
+            model_path=model_path,
+            use_cases=signal.use_cases,
+            user_content=user_content,
+            scoring=signal.scoring,
+        )
+        logging.info(f"Computed use case signals: {output}")
+        return output
+    logging.warning(f"Unknown signal type: {signal.signal_type}")
+    return None
+
+
+def _compute_embedding_output(
+    signal: SignalConfig, model_path: str, user_content: str
+) -> ClassificationOutput | None:
+    if isinstance(signal, ComplexitySignalConfig):
+        return compute_embedding_complexity_signal(
+            model_path=model_path,
+            user_content=user_content,
+            anchors=signal.anchors,
+        )
+    if isinstance(signal, UseCaseSignalConfig):
+        return compute_embedding_use_case_signal(
+            model_path=model_path,
+            use_cases=signal.use_cases,
+            user_content=user_content,
+            examples=signal.examples,
+        )
+    logging.warning(f"Unknown signal type: {signal.signal_type}")
+    return None
+
+
+def windowed_content(signal: SignalConfig, model_path: str, user_content: str) -> str:
+    """`user_content` cut to the signal's token budget with its classifier's tokenizer."""
+    if signal.max_content_tokens <= 0:
+        return user_content
+    embedding = signal.classifier.classifier_type == ClassifierType.EMBEDDING
+    return window_content(
+        model_pool.vocab(model_path, embedding=embedding),
+        user_content,
+        signal.max_content_tokens,
+        signal.window,
+        stats_key=str(signal.signal_type),
+    )
+
+
+def is_combinable(signal: SignalConfig) -> bool:
+    if signal.classifier.classifier_type != ClassifierType.GENERATIVE:
+        return False
+    # Combined answers carry no measured confidence, so a signal that filters
+    # on confidence keeps its own prompt.
+    if signal.confidence_threshold > 0:
+        return False
+    # Log-prob scored use cases keep their own prompt for a real confidence.
+    if isinstance(signal, UseCaseSignalConfig):
+        return signal.scoring != UseCaseScoring.LOGPROB
+    return isinstance(signal, ComplexitySignalConfig)
+
+
+def _cache_key(
+    signal: SignalConfig, model_path: str, user_content: str, mode: str
+) -> str:
+    labels = list(getattr(signal, "use_cases", []))
+    mode = f"{mode}:{signal.window}{signal.max_content_tokens}"
+    if signal.classifier.classifier_type == ClassifierType.EMBEDDING:
+        mode = f"{mode}:{ClassifierType.EMBEDDING}"
+        references = getattr(signal, "examples", None) or getattr(signal, "anchors", {})
+        labels.append(json.dumps(references, sort_keys=True))
+    elif isinstance(signal, UseCaseSignalConfig):
+        mode = f"{mode}:{signal.scoring}"
+    return classification_cache_key(
+        user_content,
+        signal_type=str(signal.signal_type),
+        labels=labels,
+        model_path=model_path,
+        mode=mode,
+    )
+
+
+def _to_signal(signal: SignalConfig, output: ClassificationOutput) -> Signal | None:
+    if output.confidence < signal.confidence_threshold:
+        return None
+    if isinstance(output, ComplexitySignalOutput):
+        return ComplexitySignal(score=output.complexity_score)
+    if isinstance(output, UseCaseSignalOutput):
+        return UseCaseSignal(use_case=output.use_case)
+    return None
+
+
+def _signal_fields(signals: list[SignalConfig]) -> list[SignalField]:
+    fields: list[SignalField] = []
+    seen: dict[str, int] = {}
+    for signal in signals:
+        key = str(signal.signal_type)
+        seen[key] = seen.get(key, 0) + 1
+        if seen[key] > 1:
+            key = f"{key}_{seen[key]}"
+        fields.append(
+            SignalField(
+                key=key,
+                signal_type=signal.signal_type,
+                use_cases=getattr(signal, "use_cases", []),
+            )
+        )
+    return fields
+
+
+def in_config_order(results: dict[int, Signal | None]) -> list[Signal]:
+    return [
+        signal
+        for _, signal in sorted(results.items(), key=lambda item: item[0])
+        if signal is not None
+    ]
+
+
+def preload_classifiers(router_config: RouterConfig, warm_up: bool = True) -> None:
+    """Load and warm up every classifier model instance and build embedding heads.
+
+    Without `warm_up` only the weights are loaded; building heads runs
+    inference, so it is left for the warm-up too.
+    """
+    model_pool.configure(router_config)
+    preloaded: set[tuple[str, bool]] = set()
+    for signal in router_config.signals:
+        model = get_model_by_ref(signal.classifier.model_ref, router_config)
+        if not model.path:
+            continue
+        embedding = signal.classifier.classifier_type == ClassifierType.EMBEDDING
+        if (model.path, embedding) not in preloaded:
+            preloaded.add((model.path, embedding))
+            logging.info(
+                f"Preloading {model.instances} instances of classifier model "
+                f"{model.path}"
             )
-            if complexity_score.confidence >= signal.confidence_threshold:
-                signal_analysis_result.append(
-                    ComplexitySignal(score=complexity_score.complexity_score)
-                )
-        elif isinstance(signal, UseCaseSignalConfig):
-            use_case_result = compute_use_case_signal(
-                model_path=classifier_model_path,
-                use_cases=signal.use_cases,
-                user_content=user_content,
+            model_pool.preload(model.path, embedding=embedding, warm_up=warm_up)
+        if embedding and warm_up:
+            logging.info(
+                f"Building embedding head for {signal.signal_type} on {model.name}"
             )
-            logging.info(f"Computed use case signals: {use_case_result}")
-            if use_case_result.confidence >= signal.confidence_threshold:
-                signal_analysis_result.append(
-                    UseCaseSignal(use_case=use_case_result.use_case)
-                )
-        else:
-            logging.warning(f"Unknown signal type: {signal.signal_type}")
-    return signal_analysis_result
+            if isinstance(signal, UseCaseSignalConfig):
+                get_centroid_head(model.path, signal.use_cases, signal.examples)
+            elif isinstance(signal, ComplexitySignalConfig):
+                get_anchor_head(model.path, signal.anchors)
 
 
 def signal_matches_condition(signal: Signal, condition: Condition) -> bool:
-    """Check if a signal matches a routing condition. Placeholder for future implementation."""
-    if condition.signal.signal_type != SignalConfig.signal_type:
+    """Check if a signal matches a routing condition."""
+    if condition.signal.signal_type != signal.signal_type:
         return False
     if isinstance(signal, ComplexitySignal):
         assert isinstance(condition.signal, ComplexitySignal)
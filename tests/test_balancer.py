@@ -0,0 +1,163 @@
+import random
+from collections import Counter
+
+import pytest
+
+from nano_semantic_router.config.config import BalanceStrategy, Endpoint, Model
+from nano_semantic_router.semantic_router.server import balancer as balancer_module
+from nano_semantic_router.semantic_router.server.balancer import EndpointBalancer
+from nano_semantic_router.semantic_router.server.server import Config
+from nano_semantic_router.semantic_router.server.upstream import UpstreamPool
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture(autouse=True)
+def clock(monkeypatch: pytest.MonkeyPatch) -> Clock:
+    random.seed(0)
+    clock = Clock()
+    monkeypatch.setattr(balancer_module.time, "monotonic", clock)
+    return clock
+
+
+def _model(
+    weights: dict[str, float],
+    balance: BalanceStrategy = BalanceStrategy.LEAST_OUTSTANDING,
+    name: str = "llama-70b",
+) -> Model:
+    return Model(
+        name=name,
+        endpoint="",
+        access_key="",
+        model_type="openai",
+        endpoints=[Endpoint(url, weight) for url, weight in weights.items()],
+        balance=balance,
+    )
+
+
+def _balancer(weights: dict[str, float], **kwargs) -> EndpointBalancer:
+    return EndpointBalancer(
+        _model(weights, **kwargs), eject_failures=3, eject_seconds=10
+    )
+
+
+def _picks(balancer: EndpointBalancer, count: int) -> Counter[str]:
+    """URLs picked by `count` requests sent one after another."""
+    picked: Counter[str] = Counter()
+    for _ in range(count):
+        endpoint = balancer.pick()
+        picked[endpoint.url] += 1
+        balancer.release(endpoint, 0.01, failed=False)
+    return picked
+
+
+def test_idle_traffic_follows_weights() -> None:
+    picked = _picks(_balancer({"a": 3, "b": 1}), 4000)
+    assert 2.5 < picked["a"] / picked["b"] < 3.5
+
+
+def test_least_outstanding_avoids_busy_endpoint() -> None:
+    balancer = _balancer({"a": 1, "b": 1})
+    busy = [e for e in balancer.endpoints if e.url == "a"][0]
+    busy.outstanding = 5
+    for _ in range(50):
+        endpoint = balancer.pick()
+        assert endpoint.url == "b"
+        balancer.release(endpoint, 0.01, failed=False)
+
+
+def test_outstanding_counts_until_release() -> None:
+    balancer = _balancer({"a": 1})
+    first, second = balancer.pick(), balancer.pick()
+    assert first.outstanding == 2
+    balancer.release(first, 0.01, failed=False)
+    balancer.release(second, None, failed=True)
+    assert first.outstanding == 0
+
+
+def test_failing_endpoint_is_ejected_and_recovers(clock: Clock) -> None:
+    balancer = _balancer({"a": 1, "bad": 1})
+    bad = [e for e in balancer.endpoints if e.url == "bad"][0]
+    for _ in range(3):
+        bad.outstanding += 1
+        balancer.release(bad, None, failed=True)
+    assert bad.ejections == 1
+    assert "bad" not in _picks(balancer, 200)
+
+    clock.now += 11
+    assert _picks(balancer, 200)["bad"] > 0
+
+
+def test_successes_reset_the_failure_count() -> None:
+    balancer = _balancer({"a": 1})
+    endpoint = balancer.endpoints[0]
+    for failed in (True, True, False, True, True):
+        endpoint.outstanding += 1
+        balancer.release(endpoint, 0.01, failed=failed)
+    assert endpoint.ejections == 0
+
+
+def test_failures_sent_before_ejection_do_not_extend_it(clock: Clock) -> None:
+    balancer = _balancer({"a": 1, "bad": 1})
+    bad = [e for e in balancer.endpoints if e.url == "bad"][0]
+    bad.outstanding = 6
+    for _ in range(6):
+        balancer.release(bad, None, failed=True)
+    assert bad.ejections == 1
+    assert bad.ejected_until == clock.now + 10
+
+
+def test_all_endpoints_ejected_still_serves() -> None:
+    balancer = _balancer({"a": 1, "b": 1})
+    for endpoint in balancer.endpoints:
+        for _ in range(3):
+            endpoint.outstanding += 1
+            balancer.release(endpoint, None, failed=True)
+    assert sum(_picks(balancer, 20).values()) == 20
+
+
+def test_ewma_prefers_the_faster_endpoint() -> None:
+    balancer = _balancer({"fast": 1, "slow": 1}, balance=BalanceStrategy.EWMA)
+    for endpoint in balancer.endpoints:
+        endpoint.outstanding += 1
+        balancer.release(
+            endpoint, 0.01 if endpoint.url == "fast" else 0.5, failed=False
+        )
+    picked: Counter[str] = Counter()
+    for _ in range(100):
+        picked[balancer.pick().url] += 1  # held, so load builds up on "fast"
+    assert picked["fast"] > picked["slow"] > 0
+
+
+def test_ewma_scales_cost_by_weight() -> None:
+    balancer = _balancer({"big": 3, "small": 1}, balance=BalanceStrategy.EWMA)
+    for endpoint in balancer.endpoints:
+        endpoint.outstanding += 1
+        balancer.release(endpoint, 0.1, failed=False)
+    big = [e for e in balancer.endpoints if e.url == "big"][0]
+    # Twice the requests in flight at the same latency is still cheaper on a
+    # replica with three times the weight.
+    big.outstanding = 1
+    for _ in range(50):
+        endpoint = balancer.pick()
+        assert endpoint.url == "big"
+        balancer.release(endpoint, 0.1, failed=False)
+
+
+def test_rejects_non_positive_weight() -> None:
+    with pytest.raises(ValueError):
+        _balancer({"a": 1, "b": 0})
+
+
+def test_pool_finds_balancer_by_model_name_not_config_ref() -> None:
+    model = _model({"http://replica-1": 1, "http://replica-2": 1})
+    pool = UpstreamPool(Config(), {"large": model})
+    assert pool.balancer_for(model).model == "llama-70b"
+    with pytest.raises(ValueError):
+        pool.balancer_for(_model({"http://x": 1}, name="unknown"))
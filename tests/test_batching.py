@@ -0,0 +1,140 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from nano_semantic_router.config.config import (
+    ClassifierConfig,
+    ComplexitySignalConfig,
+    Model,
+    RouterConfig,
+)
+from nano_semantic_router.semantic_router.classification import batching
+from nano_semantic_router.semantic_router.classification.base_classifier import (
+    complete,
+)
+from nano_semantic_router.semantic_router.classification.batching import (
+    PromptBatcher,
+    start_batchers,
+    stop_batchers,
+)
+from nano_semantic_router.semantic_router.classification.executor import (
+    ClassificationExecutor,
+)
+from nano_semantic_router.semantic_router.server.server import (
+    Config,
+    _classifier_concurrency,
+)
+
+_N_CTX = 16
+_POISON = "poison"
+
+
+class FakeModel:
+    """Tokenizes one token per byte; decoding is replaced by `decode`."""
+
+    def tokenize(self, text: bytes) -> list[int]:
+        return list(text)
+
+    def n_ctx(self) -> int:
+        return _N_CTX
+
+
+class FakePool:
+    def vocab(self, model_path: str) -> FakeModel:
+        return FakeModel()
+
+
+@pytest.fixture
+def decodes(monkeypatch: pytest.MonkeyPatch) -> list[int]:
+    """Replace decoding with an echo that fails on the poison prompt.
+
+    Returns the number of sequences passed to each decode.
+    """
+    sizes: list[int] = []
+
+    def decode(model, context, batch, sequences):
+        sizes.append(len(sequences))
+        for seq in sequences:
+            if bytes(seq.tokens).decode() == _POISON:
+                raise RuntimeError("llama_decode returned 1")
+        for seq in sequences:
+            seq.text = bytes(seq.tokens).decode().upper()
+
+    monkeypatch.setattr(batching, "model_pool", FakePool())
+    monkeypatch.setattr(batching, "_decode_greedy", decode)
+    monkeypatch.setattr(PromptBatcher, "_ensure_context", lambda self, model: None)
+    return sizes
+
+
+def _complete_together(prompts: list[str]) -> list[str | Exception]:
+    batcher = PromptBatcher("classifier.gguf", max_batch_size=4, max_wait_ms=200)
+
+    def complete(prompt: str) -> str | Exception:
+        try:
+            return batcher.complete(prompt, max_tokens=4, stop=[])
+        except Exception as err:  # noqa: BLE001
+            return err
+
+    try:
+        with ThreadPoolExecutor(len(prompts)) as executor:
+            return list(executor.map(complete, prompts))
+    finally:
+        batcher.close()
+
+
+def test_prompts_are_decoded_in_one_batch(decodes) -> None:
+    assert _complete_together(["a", "b", "c"]) == ["A", "B", "C"]
+    assert decodes == [3]
+
+
+def test_prompt_longer_than_the_context_fails_alone(decodes) -> None:
+    results = _complete_together(["a", "x" * _N_CTX, "c"])
+    assert results[0] == "A" and results[2] == "C"
+    assert isinstance(results[1], ValueError)
+    assert decodes == [2]
+
+
+def test_failed_batch_is_retried_one_prompt_at_a_time(decodes) -> None:
+    results = _complete_together(["a", _POISON, "c"])
+    assert results[0] == "A" and results[2] == "C"
+    assert isinstance(results[1], RuntimeError)
+    assert decodes == [3, 1, 1, 1]
+
+
+def test_default_executor_fills_a_batch(decodes) -> None:
+    router_config = RouterConfig(
+        models={
+            "classifier": Model(
+                name="classifier",
+                endpoint="",
+                access_key="",
+                model_type="local",
+                path="classifier.gguf",
+                max_batch_size=4,
+                batch_wait_ms=200,
+            )
+        },
+        signals=[
+            ComplexitySignalConfig(classifier=ClassifierConfig(model_ref="classifier"))
+        ],
+    )
+    executor = ClassificationExecutor(
+        max_concurrency=_classifier_concurrency(Config(), router_config)
+    )
+    batchers = start_batchers(router_config)
+
+    async def classify_together() -> list[str]:
+        return await asyncio.gather(
+            *(
+                executor.run(complete, "classifier.gguf", prompt, 4, [])
+                for prompt in "abcd"
+            )
+        )
+
+    try:
+        assert asyncio.run(classify_together()) == ["A", "B", "C", "D"]
+    finally:
+        stop_batchers(batchers)
+        executor.shutdown()
+    assert decodes == [4]
@@ -0,0 +1,42 @@
+import json
+
+from nano_semantic_router.config.config import (
+    ClassifierConfig,
+    ComplexitySignalConfig,
+    SignalType,
+    UseCaseScoring,
+    UseCaseSignalConfig,
+)
+from nano_semantic_router.semantic_router.classification.multi_signal_classifier import (
+    SignalField,
+    _schema,
+)
+from nano_semantic_router.semantic_router.signal.signal import is_combinable
+
+
+def test_complexity_is_requested_as_a_number() -> None:
+    schema = json.loads(_schema([SignalField("complexity", SignalType.COMPLEXITY)]))
+    assert schema["properties"]["complexity"]["type"] == "number"
+
+
+def test_generative_signals_are_combinable() -> None:
+    classifier = ClassifierConfig(model_ref="classifier")
+    assert is_combinable(ComplexitySignalConfig(classifier=classifier))
+    assert is_combinable(UseCaseSignalConfig(classifier=classifier, use_cases=["a"]))
+
+
+def test_signals_that_filter_on_confidence_keep_their_own_prompt() -> None:
+    classifier = ClassifierConfig(model_ref="classifier")
+    assert not is_combinable(
+        ComplexitySignalConfig(classifier=classifier, confidence_threshold=0.5)
+    )
+    assert not is_combinable(
+        UseCaseSignalConfig(
+            classifier=classifier, use_cases=["a"], confidence_threshold=0.5
+        )
+    )
+    assert not is_combinable(
+        UseCaseSignalConfig(
+            classifier=classifier, use_cases=["a"], scoring=UseCaseScoring.LOGPROB
+        )
+    )
@@ -0,0 +1,110 @@
+import random
+
+import pytest
+
+from nano_semantic_router.config.config import (
+    Condition,
+    ConditionOperator,
+    DecisionConfig,
+    SignalOperator,
+)
+from nano_semantic_router.semantic_router.decision.decision import (
+    DecisionResult,
+    make_routing_decision,
+)
+from nano_semantic_router.semantic_router.decision.table import DecisionTable
+from nano_semantic_router.semantic_router.signal.signal import (
+    ComplexitySignal,
+    Signal,
+    UseCaseSignal,
+)
+
+_USE_CASES = ["code", "chat", "math", "translation"]
+# Few distinct thresholds, so scores land exactly on them as well as between.
+_SCORES = [0.0, 2.5, 5.0, 6.5, 10.0]
+
+
+def _decision(
+    name: str, rules: list[Condition], operator: ConditionOperator
+) -> DecisionConfig:
+    return DecisionConfig(name=name, model_ref="large", rules=rules, operator=operator)
+
+
+def _random_decisions(rng: random.Random, count: int) -> list[DecisionConfig]:
+    decisions = []
+    for i in range(count):
+        rules = []
+        for _ in range(rng.randint(0, 3)):
+            if rng.random() < 0.5:
+                target: Signal = ComplexitySignal(rng.choice(_SCORES))
+                operator = rng.choice(list(SignalOperator))
+            else:
+                target = UseCaseSignal(rng.choice(_USE_CASES))
+                operator = rng.choice([SignalOperator.EQ, SignalOperator.NEQ])
+            rules.append(Condition(signal=target, operator=operator))
+        decisions.append(_decision(f"d{i}", rules, rng.choice(list(ConditionOperator))))
+    return decisions
+
+
+def _random_signals(rng: random.Random) -> list[Signal]:
+    signals: list[Signal] = []
+    if rng.random() < 0.8:
+        signals.append(ComplexitySignal(rng.choice(_SCORES + [rng.uniform(0, 10)])))
+    if rng.random() < 0.8:
+        signals.append(UseCaseSignal(rng.choice(_USE_CASES + ["other"])))
+    rng.shuffle(signals)
+    return signals
+
+
+def _outcome(result: DecisionResult | None) -> tuple | None:
+    if result is None:
+        return None
+    return (
+        result.decision.name,
+        result.confidence,
+        list(result.matched_rules),
+    )
+
+
+@pytest.mark.parametrize("seed", range(50))
+def test_decide_matches_make_routing_decision(seed: int) -> None:
+    rng = random.Random(seed)
+    decisions = _random_decisions(rng, rng.randint(1, 30))
+    table = DecisionTable(decisions)
+    for _ in range(20):
+        signals = _random_signals(rng)
+        assert _outcome(table.decide(signals)) == _outcome(
+            make_routing_decision(signals, decisions)
+        )
+
+
+def test_highest_confidence_decision_wins() -> None:
+    simple = _decision(
+        "simple",
+        [Condition(ComplexitySignal(3.0), SignalOperator.LT)],
+        ConditionOperator.AND,
+    )
+    hard_code = _decision(
+        "hard-code",
+        [
+            Condition(ComplexitySignal(6.5), SignalOperator.GT),
+            Condition(UseCaseSignal("code"), SignalOperator.EQ),
+        ],
+        ConditionOperator.AND,
+    )
+    table = DecisionTable([simple, hard_code])
+
+    result = table.decide([ComplexitySignal(7.0), UseCaseSignal("code")])
+    assert result is not None and result.decision is hard_code
+
+    assert table.decide([ComplexitySignal(7.0), UseCaseSignal("chat")]) is None
+    result = table.decide([ComplexitySignal(1.0)])
+    assert result is not None and result.decision is simple
+
+
+def test_no_decisions_or_signals() -> None:
+    assert DecisionTable([]).decide([ComplexitySignal(5.0)]) is None
+    decisions = _random_decisions(random.Random(0), 10)
+    assert _outcome(DecisionTable(decisions).decide([])) == _outcome(
+        make_routing_decision([], decisions)
+    )
@@ -0,0 +1,150 @@
+import asyncio
+import logging
+import threading
+import time
+
+import pytest
+
+from nano_semantic_router.semantic_router.classification.executor import (
+    ClassificationExecutor,
+    ClassifierOverloadedError,
+)
+
+
+class Gate:
+    """A blocking call that holds its thread until opened, counting overlap."""
+
+    def __init__(self) -> None:
+        self.opened = threading.Event()
+        self.calls = 0
+        self.running = 0
+        self.peak = 0
+        self._guard = threading.Lock()
+
+    def __call__(self, value: int = 0) -> int:
+        with self._guard:
+            self.calls += 1
+            self.running += 1
+            self.peak = max(self.peak, self.running)
+        self.opened.wait(timeout=2)
+        with self._guard:
+            self.running -= 1
+        return value
+
+
+async def _until(condition) -> None:
+    for _ in range(200):
+        if condition():
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError("condition not reached")
+
+
+def test_concurrency_never_exceeds_the_limit() -> None:
+    async def main() -> None:
+        executor = ClassificationExecutor(max_concurrency=2)
+        gate = Gate()
+        calls = [asyncio.ensure_future(executor.run(gate, i)) for i in range(6)]
+        await _until(lambda: gate.running == 2)
+        await asyncio.sleep(0.05)  # give a third call the chance to start
+        assert gate.running == 2
+        gate.opened.set()
+        assert await asyncio.gather(*calls) == list(range(6))
+        assert gate.peak == 2
+        assert executor.stats.completed == 6
+        executor.shutdown()
+
+    asyncio.run(main())
+
+
+def test_calls_beyond_the_queue_are_rejected() -> None:
+    async def main() -> None:
+        executor = ClassificationExecutor(max_concurrency=1, max_queue_size=2)
+        gate = Gate()
+        running = asyncio.ensure_future(executor.run(gate))
+        await _until(lambda: gate.running == 1)
+        queued = [asyncio.ensure_future(executor.run(gate)) for _ in range(2)]
+        await asyncio.sleep(0)
+        with pytest.raises(ClassifierOverloadedError):
+            await executor.run(gate)
+        assert executor.stats.rejected == 1
+        gate.opened.set()
+        await asyncio.gather(running, *queued)
+        assert gate.calls == 3
+        # With the queue drained, calls are accepted again.
+        assert await executor.run(gate, 7) == 7
+        executor.shutdown()
+
+    asyncio.run(main())
+
+
+def test_run_shared_folds_concurrent_identical_calls() -> None:
+    async def main() -> None:
+        executor = ClassificationExecutor(max_concurrency=4)
+        gate = Gate()
+        calls = [
+            asyncio.ensure_future(executor.run_shared(key, gate, value))
+            for key, value in [("a", 1), ("a", 1), ("a", 1), ("b", 2)]
+        ]
+        await _until(lambda: gate.running == 2)
+        gate.opened.set()
+        assert await asyncio.gather(*calls) == [1, 1, 1, 2]
+        assert gate.calls == 2
+        assert executor.stats.coalesced == 2
+        # Once the call is done, the same key runs again.
+        assert await executor.run_shared("a", gate, 3) == 3
+        assert gate.calls == 3
+        executor.shutdown()
+
+    asyncio.run(main())
+
+
+def test_run_shared_caller_cancelling_does_not_cancel_the_others() -> None:
+    async def main() -> None:
+        executor = ClassificationExecutor(max_concurrency=1)
+        gate = Gate()
+        first = asyncio.ensure_future(executor.run_shared("a", gate, 1))
+        second = asyncio.ensure_future(executor.run_shared("a", gate, 1))
+        await _until(lambda: gate.running == 1)
+        first.cancel()
+        gate.opened.set()
+        assert await second == 1
+        executor.shutdown()
+
+    asyncio.run(main())
+
+
+def test_failed_submit_gives_its_slot_back() -> None:
+    async def main() -> None:
+        # No queue: a slot that leaked would turn the next call into an
+        # overload rejection instead of the executor's own error.
+        executor = ClassificationExecutor(max_concurrency=1, max_queue_size=0)
+        executor.shutdown()
+        for _ in range(3):
+            with pytest.raises(RuntimeError) as raised:
+                await asyncio.wait_for(executor.run(lambda: None), timeout=2)
+            assert not isinstance(raised.value, ClassifierOverloadedError)
+        assert executor.stats.in_flight == 0
+        assert executor.stats.rejected == 0
+
+    asyncio.run(main())
+
+
+def test_call_finishing_after_the_loop_closed_is_not_an_error(
+    caplog: pytest.LogCaptureFixture,
+) -> None:
+    executor = ClassificationExecutor(max_concurrency=1)
+    gate = Gate()
+
+    async def main() -> None:
+        call = asyncio.ensure_future(executor.run(gate))
+        await _until(lambda: gate.running == 1)
+        call.cancel()
+
+    asyncio.run(main())
+    with caplog.at_level(logging.ERROR, logger="concurrent.futures"):
+        gate.opened.set()
+        time.sleep(0.1)  # the completion callback runs on the classifier thread
+    assert gate.running == 0
+    assert not caplog.records
+    executor.shutdown()
@@ -0,0 +1,197 @@
+import asyncio
+import random
+import time
+
+import pytest
+
+from nano_semantic_router.config.config import (
+    ClassifierConfig,
+    ComplexitySignalConfig,
+    Condition,
+    ConditionOperator,
+    DecisionConfig,
+    Model,
+    RouterConfig,
+    SignalConfig,
+    SignalOperator,
+    UseCaseSignalConfig,
+)
+from nano_semantic_router.semantic_router.classification.executor import (
+    ClassificationExecutor,
+)
+from nano_semantic_router.semantic_router.decision.table import DecisionTable
+from nano_semantic_router.semantic_router.signal import lazy, signal
+from nano_semantic_router.semantic_router.signal.signal import (
+    ComplexitySignal,
+    Signal,
+    SignalGroup,
+    UseCaseSignal,
+    get_signals_concurrently,
+)
+from tests.test_decision_table import _SCORES, _USE_CASES, _random_decisions
+
+
+class FakeClassifier:
+    """Answers each signal config with a preset value and records what it computed."""
+
+    def __init__(self, values: dict[int, Signal | None]) -> None:
+        self.values = values
+        self.computed: list[int] = []
+
+    def __call__(
+        self, group: SignalGroup, user_content, cache=None, timings=None
+    ) -> dict[int, Signal | None]:
+        self.computed.extend(index for index, _ in group.signals)
+        return {index: self.values[index] for index, _ in group.signals}
+
+
+def _router_config(
+    signals: list[SignalConfig], decisions: list[DecisionConfig]
+) -> RouterConfig:
+    # One classifier model per signal, so every signal is its own executor job.
+    models = {
+        f"m{i}": Model(
+            name=f"m{i}",
+            endpoint="",
+            access_key="",
+            model_type="local",
+            path=f"m{i}.gguf",
+        )
+        for i in range(len(signals))
+    }
+    return RouterConfig(models=models, signals=signals, decisions=decisions)
+
+
+def _random_signal_values(
+    rng: random.Random,
+) -> tuple[list[SignalConfig], dict[int, Signal | None]]:
+    configs: list[SignalConfig] = []
+    values: dict[int, Signal | None] = {}
+    for i in range(rng.randint(1, 4)):
+        classifier = ClassifierConfig(model_ref=f"m{i}")
+        if rng.random() < 0.5:
+            configs.append(ComplexitySignalConfig(classifier=classifier))
+            value: Signal = ComplexitySignal(rng.choice(_SCORES + [rng.uniform(0, 10)]))
+        else:
+            configs.append(
+                UseCaseSignalConfig(classifier=classifier, use_cases=_USE_CASES)
+            )
+            value = UseCaseSignal(rng.choice(_USE_CASES + ["other"]))
+        # Below its confidence threshold a signal comes back as None.
+        values[i] = None if rng.random() < 0.1 else value
+    return configs, values
+
+
+def _classify(
+    monkeypatch: pytest.MonkeyPatch,
+    values: dict[int, Signal | None],
+    router_config: RouterConfig,
+    table: DecisionTable | None,
+) -> tuple[list[Signal], list[int]]:
+    """Signals from the lazy path if `table` is given, else from the eager one."""
+    fake = FakeClassifier(values)
+    monkeypatch.setattr(lazy, "compute_signal_group", fake)
+    monkeypatch.setattr(signal, "compute_signal_group", fake)
+    executor = ClassificationExecutor(max_concurrency=2)
+    try:
+        if table is None:
+            coroutine = get_signals_concurrently(
+                router_config.signals, "text", router_config, executor
+            )
+        else:
+            coroutine = lazy.get_signals_lazily(
+                router_config.signals, "text", router_config, executor, table
+            )
+        return asyncio.run(coroutine), fake.computed
+    finally:
+        executor.shutdown()
+
+
+@pytest.mark.parametrize("seed", range(200))
+def test_lazy_and_eager_pick_the_same_decision(
+    monkeypatch: pytest.MonkeyPatch, seed: int
+) -> None:
+    rng = random.Random(seed)
+    decisions = _random_decisions(rng, rng.randint(1, 12))
+    configs, values = _random_signal_values(rng)
+    router_config = _router_config(configs, decisions)
+    table = DecisionTable(decisions)
+
+    eager, _ = _classify(monkeypatch, values, router_config, None)
+    lazy_signals, computed = _classify(monkeypatch, values, router_config, table)
+
+    expected = table.decide(eager)
+    result = table.decide(lazy_signals)
+    assert (result and result.decision.name) == (expected and expected.decision.name)
+    assert len(computed) <= len(configs)
+
+
+def test_signal_that_cannot_change_the_decision_is_never_computed(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    decisions = [
+        DecisionConfig(
+            name="code",
+            model_ref="large",
+            rules=[Condition(signal=UseCaseSignal("code"), operator=SignalOperator.EQ)],
+            operator=ConditionOperator.OR,
+        )
+    ]
+    configs: list[SignalConfig] = [
+        ComplexitySignalConfig(classifier=ClassifierConfig(model_ref="m0")),
+        UseCaseSignalConfig(
+            classifier=ClassifierConfig(model_ref="m1"), use_cases=_USE_CASES
+        ),
+    ]
+    values: dict[int, Signal | None] = {
+        0: ComplexitySignal(9.0),
+        1: UseCaseSignal("code"),
+    }
+    router_config = _router_config(configs, decisions)
+
+    signals, computed = _classify(
+        monkeypatch, values, router_config, DecisionTable(decisions)
+    )
+    assert computed == [1]  # no rule looks at complexity
+    assert DecisionTable(decisions).decide(signals).decision.name == "code"
+
+
+def test_lazy_and_eager_calls_in_flight_together_are_not_folded(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    configs: list[SignalConfig] = [
+        ComplexitySignalConfig(classifier=ClassifierConfig(model_ref="m0"))
+    ]
+    decisions = [
+        DecisionConfig(
+            name="hard",
+            model_ref="large",
+            rules=[Condition(signal=ComplexitySignal(5.0), operator=SignalOperator.GT)],
+            operator=ConditionOperator.OR,
+        )
+    ]
+    router_config = _router_config(configs, decisions)
+    fake = FakeClassifier({0: ComplexitySignal(9.0)})
+
+    def slow(*args, **kwargs):
+        time.sleep(0.05)  # keeps the first call in flight while the second starts
+        return fake(*args, **kwargs)
+
+    monkeypatch.setattr(lazy, "compute_signal_group", slow)
+    monkeypatch.setattr(signal, "compute_signal_group", slow)
+
+    async def both() -> list[list[Signal]]:
+        executor = ClassificationExecutor(max_concurrency=2)
+        try:
+            return await asyncio.gather(
+                get_signals_concurrently(configs, "text", router_config, executor),
+                lazy.get_signals_lazily(
+                    configs, "text", router_config, executor, DecisionTable(decisions)
+                ),
+            )
+        finally:
+            executor.shutdown()
+
+    eager, lazy_signals = asyncio.run(both())
+    assert eager == lazy_signals == [ComplexitySignal(9.0)]
+    assert fake.computed == [0, 0]
@@ -0,0 +1,155 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from nano_semantic_router.config.config import Model, RouterConfig
+from nano_semantic_router.semantic_router.classification import model_pool
+from nano_semantic_router.semantic_router.classification.model_pool import ModelPool
+
+_PATH = "classifier.gguf"
+
+
+class FakeModel:
+    """Stands in for a loaded Llama; the pool only hands instances around."""
+
+
+def _pool(instances: int) -> ModelPool:
+    pool = ModelPool()
+    pool.configure(
+        RouterConfig(
+            models={
+                "classifier": Model(
+                    name="classifier",
+                    endpoint="",
+                    access_key="",
+                    model_type="local",
+                    path=_PATH,
+                    instances=instances,
+                )
+            }
+        )
+    )
+    return pool
+
+
+@pytest.fixture
+def loads(monkeypatch: pytest.MonkeyPatch) -> list[FakeModel]:
+    """Replace model loading with fakes; returns the instances loaded so far."""
+    loaded: list[FakeModel] = []
+
+    def load(model_path, options, embedding):
+        time.sleep(0.01)
+        model = FakeModel()
+        loaded.append(model)
+        return model
+
+    monkeypatch.setattr(model_pool, "_load", load)
+    monkeypatch.setattr(model_pool, "_warm_up", lambda model, embedding: None)
+    return loaded
+
+
+def test_concurrent_checkouts_never_share_an_instance(loads) -> None:
+    pool = _pool(instances=2)
+    in_use: set[int] = set()
+    peak = 0
+    guard = threading.Lock()
+
+    def classify(_: int) -> None:
+        nonlocal peak
+        with pool.checkout(_PATH) as model:
+            with guard:
+                assert id(model) not in in_use
+                in_use.add(id(model))
+                peak = max(peak, len(in_use))
+            time.sleep(0.005)
+            with guard:
+                in_use.remove(id(model))
+
+    with ThreadPoolExecutor(8) as executor:
+        list(executor.map(classify, range(40)))
+    assert len(loads) == 2
+    assert peak == 2
+
+
+def test_instances_are_reused_and_modes_pooled_apart(loads) -> None:
+    pool = _pool(instances=1)
+    with pool.checkout(_PATH) as first:
+        pass
+    with pool.checkout(_PATH) as second:
+        assert second is first
+    assert pool.vocab(_PATH) is first
+    with pool.checkout(_PATH, embedding=True) as embedding:
+        assert embedding is not first
+    assert len(loads) == 2
+
+
+def test_preload_loads_every_instance_once(loads) -> None:
+    pool = _pool(instances=3)
+    pool.preload(_PATH)
+    pool.preload(_PATH)
+    assert len(loads) == 3
+    with pool.checkout(_PATH) as model:
+        assert model in loads
+
+
+def test_failed_load_reaches_every_waiter(monkeypatch: pytest.MonkeyPatch) -> None:
+    def load(model_path, options, embedding):
+        time.sleep(0.05)  # long enough for the second caller to start waiting
+        raise ValueError(f"Model path does not exist: {model_path}")
+
+    monkeypatch.setattr(model_pool, "_load", load)
+    pool = _pool(instances=1)
+
+    errors: list[BaseException] = []
+
+    def classify() -> None:
+        try:
+            with pool.checkout(_PATH):
+                pass
+        except ValueError as err:
+            errors.append(err)
+
+    # Daemon threads, so a caller stuck waiting fails the test instead of
+    # hanging it.
+    threads = [threading.Thread(target=classify, daemon=True) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=2)
+    assert not any(thread.is_alive() for thread in threads)
+    assert len(errors) == 2
+
+
+def test_load_succeeds_after_a_failure(monkeypatch: pytest.MonkeyPatch) -> None:
+    attempts = 0
+
+    def load(model_path, options, embedding):
+        nonlocal attempts
+        attempts += 1
+        if attempts == 1:
+            raise OSError("transient")
+        return FakeModel()
+
+    monkeypatch.setattr(model_pool, "_load", load)
+    pool = _pool(instances=1)
+    with pytest.raises(OSError):
+        with pool.checkout(_PATH):
+            pass
+    with pool.checkout(_PATH) as model:
+        assert isinstance(model, FakeModel)
+
+
+def test_preload_without_warm_up_only_loads(monkeypatch, loads) -> None:
+    warmed: list[FakeModel] = []
+    monkeypatch.setattr(
+        model_pool, "_warm_up", lambda model, embedding: warmed.append(model)
+    )
+    pool = _pool(instances=2)
+    pool.preload(_PATH, warm_up=False)
+    assert len(loads) == 2 and not warmed
+    # A later preload, e.g. in a forked worker, warms the loaded instances.
+    pool.preload(_PATH)
+    assert len(loads) == 2
+    assert sorted(map(id, warmed)) == sorted(map(id, loads))
@@ -0,0 +1,82 @@
+import json
+
+import pytest
+
+from nano_semantic_router.semantic_router.server.rewrite import (
+    model_value_span,
+    rewrite_model,
+)
+
+
+def _rewrite(body: bytes, target: str = "routed") -> bytes:
+    return rewrite_model(body, json.loads(body), target)
+
+
+@pytest.mark.parametrize(
+    "body",
+    [
+        b'{"model": "gpt-4o", "messages": []}',
+        b'{"messages":[{"role":"user","content":"hi"}],"model":"gpt-4o"}',
+        b'{\n  "model" :\t"gpt-4o",\n  "stream": true\n}',
+        # "model" inside nested objects and strings must be left alone.
+        b'{"messages":[{"model":"x","content":"\\"model\\": \\"y\\""}],"model":"m"}',
+        b'{"metadata":{"model":"inner"},"model":"outer"}',
+        b'{"model":"a\\"b\\\\","n":1}',
+        # An escaped spelling of the key is still the model.
+        b'{"mod\\u0065l":"gpt-4o","messages":[]}',
+        # Escaped keys that are not "model" are left alone.
+        b'{"mode\\u006c_hint":"x","model":"gpt-4o"}',
+        '{"model":"modèle","messages":[{"content":"☃"}]}'.encode(),
+    ],
+)
+def test_only_the_top_level_model_changes(body: bytes) -> None:
+    rewritten = _rewrite(body)
+    expected = {**json.loads(body), "model": "routed"}
+    assert json.loads(rewritten) == expected
+    start, end = model_value_span(body)
+    # Everything outside the old value is kept byte for byte.
+    assert rewritten == body[:start] + b'"routed"' + body[end:]
+
+
+def test_unchanged_model_returns_the_same_body() -> None:
+    body = b'{"model": "routed", "messages": []}'
+    assert _rewrite(body) is body
+
+
+def test_target_is_json_escaped() -> None:
+    body = b'{"model":"a"}'
+    assert json.loads(_rewrite(body, 'we"ird\\')) == {"model": 'we"ird\\'}
+
+
+@pytest.mark.parametrize(
+    "body",
+    [
+        b'{"messages": []}',
+        b'{"model": null}',
+        b'{"model": {"name": "x"}}',
+        b'{"model": ["x"]}',
+        # Duplicate keys: parsers disagree on which one wins.
+        b'{"model":"first","model":"second"}',
+        b'{"model":"first","model":null}',
+        b'{"model":"gpt-4o","mod\\u0065l":"o1-pro","messages":[]}',
+    ],
+)
+def test_non_string_or_missing_model_is_reserialized(body: bytes) -> None:
+    assert model_value_span(body) is None
+    assert json.loads(_rewrite(body)) == {**json.loads(body), "model": "routed"}
+
+
+def test_model_key_as_a_value_is_not_matched() -> None:
+    body = b'{"role":"model","content":"model","model":"m"}'
+    assert json.loads(_rewrite(body)) == {
+        "role": "model",
+        "content": "model",
+        "model": "routed",
+    }
+
+
+def test_escaped_duplicate_model_key_cannot_bypass_routing() -> None:
+    body = b'{"model":"gpt-4o","mod\\u0065l":"o1-pro","messages":[]}'
+    rewritten = _rewrite(body)
+    assert b"o1-pro" not in rewritten
+    assert json.loads(rewritten) == {"model": "routed", "messages": []}
@@ -0,0 +1,50 @@
+import numpy as np
+from multidict import CIMultiDict
+
+from nano_semantic_router.config.config import CacheConfig
+from nano_semantic_router.semantic_router.cache.semantic_cache import (
+    CachedResponse,
+    CacheKey,
+    SemanticCache,
+)
+
+_EMBEDDING = np.array([1.0, 0.0], dtype=np.float32)
+
+
+def _key(namespace: str) -> CacheKey:
+    return CacheKey(namespace=namespace, embedding=_EMBEDDING)
+
+
+def _response(body: str) -> CachedResponse:
+    return CachedResponse(status=200, headers=CIMultiDict(), body=body.encode())
+
+
+def test_lookup_only_matches_its_own_namespace() -> None:
+    cache = SemanticCache(CacheConfig(enabled=True))
+    cache.store(_key("a"), _response("a"))
+    assert cache.lookup(_key("a")).body == b"a"
+    assert cache.lookup(_key("b")) is None
+
+
+def test_namespaces_are_dropped_with_their_last_entry() -> None:
+    cache = SemanticCache(CacheConfig(enabled=True, max_entries=4))
+    for i in range(1000):
+        cache.store(_key(f"conversation-{i}"), _response(str(i)))
+    assert cache.stats.entries == 4
+    assert len(cache._namespace_ids) == 4
+    # The newest conversations still hit; evicted ones do not, even though
+    # their namespace ids were handed to newer conversations.
+    assert cache.lookup(_key("conversation-999")).body == b"999"
+    assert cache.lookup(_key("conversation-996")).body == b"996"
+    assert cache.lookup(_key("conversation-995")) is None
+    assert cache.lookup(_key("conversation-0")) is None
+
+
+def test_expired_entry_frees_its_namespace() -> None:
+    cache = SemanticCache(CacheConfig(enabled=True, ttl_seconds=0))
+    cache.store(_key("a"), _response("a"))
+    assert cache.lookup(_key("a")) is None
+    assert cache.stats.entries == 0
+    assert not cache._namespace_ids
+    cache.store(_key("b"), _response("b"))
+    assert cache.lookup(_key("a")) is None
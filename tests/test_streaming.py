@@ -0,0 +1,124 @@
+import asyncio
+import contextlib
+import socket
+from collections.abc import AsyncIterator
+
+from aiohttp import ClientSession, web
+from aiohttp.test_utils import TestServer
+
+from nano_semantic_router.config.config import Model, RouterConfig
+from nano_semantic_router.semantic_router.server.router import Router
+from nano_semantic_router.semantic_router.server.server import Config, Server
+
+_CHAT = {"model": "m", "stream": True, "messages": [{"role": "user", "content": "hi"}]}
+
+
+class FakeUpstream:
+    """An SSE upstream that sends its first event, then waits to be told to go on.
+
+    After that it sends `events` more, or keeps going until the reader goes
+    away if `events` is None.
+    """
+
+    def __init__(self, events: int | None = 20) -> None:
+        self.events = events
+        self.resume = asyncio.Event()
+        self.closed = asyncio.Event()  # the handler has stopped writing
+        self.app = web.Application()
+        self.app.router.add_post("/v1/chat/completions", self.handle)
+
+    async def handle(self, request: web.Request) -> web.StreamResponse:
+        response = web.StreamResponse(headers={"Content-Type": "text/event-stream"})
+        await response.prepare(request)
+        try:
+            await response.write(b"data: first\n\n")
+            await self.resume.wait()
+            await response.write(b"data: second\n\n")
+            i = 0
+            while self.events is None or i < self.events:
+                await response.write(f"data: {i}\n\n".encode())
+                await asyncio.sleep(0.01)
+                i += 1
+            await response.write(b"data: [DONE]\n\n")
+            await response.write_eof()
+        finally:
+            self.closed.set()
+        return response
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@contextlib.asynccontextmanager
+async def _router(upstream: FakeUpstream) -> AsyncIterator[str]:
+    """Run the router in front of `upstream`; yields the chat completions URL."""
+    async with TestServer(upstream.app) as upstream_server:
+        base = str(upstream_server.make_url("/")).rstrip("/")
+        model = Model(
+            name="m",
+            endpoint=base,
+            access_key="k",
+            model_type="openai",
+            is_default=True,
+        )
+        port = _free_port()
+        server = Server(
+            Config(
+                upstream_base=base,
+                port=port,
+                preload_classifiers=False,
+                loop_block_threshold_ms=0,
+                shutdown_timeout=1,
+            ),
+            Router(RouterConfig(models={"m": model})),
+        )
+        task = asyncio.ensure_future(server.start())
+        url = f"http://127.0.0.1:{port}"
+        async with ClientSession() as session:
+            for _ in range(200):
+                with contextlib.suppress(OSError):
+                    async with session.get(f"{url}/healthz"):
+                        break
+                await asyncio.sleep(0.01)
+        try:
+            yield f"{url}/v1/chat/completions"
+        finally:
+            server.stop()
+            await task
+
+
+def test_events_are_forwarded_as_they_arrive() -> None:
+    async def main() -> None:
+        upstream = FakeUpstream()
+        async with _router(upstream) as url, ClientSession() as session:
+            async with session.post(url, json=_CHAT) as response:
+                assert response.headers["Content-Type"] == "text/event-stream"
+                # The upstream holds back everything else until this arrives,
+                # so a buffering router would never deliver it.
+                first = await asyncio.wait_for(response.content.readline(), 2)
+                assert first == b"data: first\n"
+                upstream.resume.set()
+                body = await asyncio.wait_for(response.content.read(), 10)
+            assert body.startswith(b"\ndata: second\n\n")
+            assert body.endswith(b"data: [DONE]\n\n")
+
+    asyncio.run(main())
+
+
+def test_client_disconnect_releases_the_upstream() -> None:
+    async def main() -> None:
+        upstream = FakeUpstream(events=None)
+        async with _router(upstream) as url, ClientSession() as session:
+            response = await session.post(url, json=_CHAT)
+            await asyncio.wait_for(response.content.readline(), 2)
+            upstream.resume.set()
+            await asyncio.wait_for(response.content.readline(), 2)
+            response.close()  # drop the connection mid-stream
+            # The router closes its upstream connection instead of reading
+            # the generation to the end, so the upstream's writes fail.
+            await asyncio.wait_for(upstream.closed.wait(), 2)
+
+    asyncio.run(main())